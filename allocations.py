@@ -0,0 +1,131 @@
+'''
+File:   allocations.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Enumerate legal portfolio allocations
+
+An allocation of n assets at step size f_step is a composition of
+1/f_step integer units into n parts (stars and bars), so the weights sum to
+exactly 1.0 without comparing floats.  Per-asset min/max weights and a
+maximum number of non-zero positions are applied while the compositions are
+generated, and the result is streamed in fixed-size NumPy blocks.
+'''
+
+import numpy as np
+
+# number of integer units for a step size, 0.1 -> 10, 0.01 -> 100
+def step_units(f_step):
+    f_units = 1.0 / f_step
+    i_units = int(round(f_units))
+    if i_units < 1 or abs(f_units - i_units) > 1e-9 * f_units:
+        raise ValueError("step size %s does not divide 1.0" % f_step)
+    return i_units
+
+# per-asset bounds in units from scalar or per-asset weight bounds
+def unit_bounds(i_assets, i_units, lf_min=0.0, lf_max=1.0):
+    na_min = np.broadcast_to(np.asarray(lf_min, dtype=float), (i_assets,))
+    na_max = np.broadcast_to(np.asarray(lf_max, dtype=float), (i_assets,))
+    na_lo = np.ceil(na_min * i_units - 1e-9).astype(int)
+    na_hi = np.floor(na_max * i_units + 1e-9).astype(int)
+    return np.maximum(na_lo, 0), np.minimum(na_hi, i_units)
+
+# ways[k][u, p] = number of ways assets k..n-1 can hold u units using at most
+# p non-zero positions.  Counts are floats: they size the blocks and prune
+# dead branches, they do not need to be exact for huge spaces.
+def count_table(na_lo, na_hi, i_units, i_max_positions):
+    i_assets = len(na_lo)
+    ways = [None] * (i_assets + 1)
+    ways[i_assets] = np.zeros((i_units + 1, i_max_positions + 1))
+    ways[i_assets][0, :] = 1.0
+
+    for k in range(i_assets - 1, -1, -1):
+        na_next = ways[k + 1]
+        na_ways = np.zeros_like(na_next)
+        for v in range(na_lo[k], na_hi[k] + 1):
+            if v == 0:
+                na_ways += na_next
+            else:
+                na_ways[v:, 1:] += na_next[:i_units + 1 - v, :-1]
+        ways[k] = na_ways
+    return ways
+
+# number of allocations that satisfy the constraints
+def count_allocations(i_assets, f_step=0.1, lf_min=0.0, lf_max=1.0, i_max_positions=None):
+    i_units = step_units(f_step)
+    if i_max_positions is None:
+        i_max_positions = i_assets
+    na_lo, na_hi = unit_bounds(i_assets, i_units, lf_min, lf_max)
+    ways = count_table(na_lo, na_hi, i_units, i_max_positions)
+    return ways[0][i_units, i_max_positions]
+
+# all feasible unit rows for assets k..n-1 holding u units with at most p
+# positions, built one asset at a time over every partial row and every
+# candidate value at once
+def _expand(ways, na_lo, na_hi, k, u, p):
+    i_assets = len(na_lo)
+    na_rows = np.zeros((1, 0), dtype=int)
+    na_u = np.array([u])
+    na_p = np.array([p])
+
+    for j in range(k, i_assets - 1):
+        na_v = np.arange(na_lo[j], min(na_hi[j], u) + 1)
+        na_used = (na_v > 0).astype(int)
+        na_u_left = na_u[:, np.newaxis] - na_v
+        na_p_left = na_p[:, np.newaxis] - na_used
+        na_ok = (na_u_left >= 0) & (na_p_left >= 0)
+        na_ok[na_ok] = ways[j + 1][na_u_left[na_ok], na_p_left[na_ok]] > 0
+
+        # rows stay grouped by parent and ordered by value: lexicographic order
+        na_parent, na_choice = np.nonzero(na_ok)
+        na_rows = np.hstack((na_rows[na_parent], na_v[na_choice][:, np.newaxis]))
+        na_u = na_u_left[na_parent, na_choice]
+        na_p = na_p_left[na_parent, na_choice]
+
+    # the last asset takes whatever is left
+    if k < i_assets:
+        na_ok = (na_u >= na_lo[-1]) & (na_u <= na_hi[-1]) & ((na_u == 0) | (na_p > 0))
+        na_rows = np.hstack((na_rows[na_ok], na_u[na_ok][:, np.newaxis]))
+    return na_rows
+
+# unit rows in lexicographic order, as (prefix, suffix block) pieces small
+# enough to materialize
+def _pieces(ways, na_lo, na_hi, i_block, k, u, p, l_prefix):
+    if k == len(na_lo) or ways[k][u, p] <= i_block:
+        yield l_prefix, _expand(ways, na_lo, na_hi, k, u, p)
+        return
+    na_next = ways[k + 1]
+    for v in range(na_lo[k], min(na_hi[k], u) + 1):
+        i_used = 1 if v > 0 else 0
+        if p < i_used or na_next[u - v, p - i_used] <= 0:
+            continue
+        for piece in _pieces(ways, na_lo, na_hi, i_block, k + 1, u - v, p - i_used, l_prefix + [v]):
+            yield piece
+
+# stream allocations as (rows x assets) float arrays of at most i_block rows.
+# lf_min/lf_max are scalar or per-asset weight bounds, i_max_positions caps the
+# number of non-zero weights.
+def iter_allocations(i_assets, f_step=0.1, lf_min=0.0, lf_max=1.0, i_max_positions=None, i_block=65536):
+    i_units = step_units(f_step)
+    if i_max_positions is None:
+        i_max_positions = i_assets
+    na_lo, na_hi = unit_bounds(i_assets, i_units, lf_min, lf_max)
+    ways = count_table(na_lo, na_hi, i_units, i_max_positions)
+    if ways[0][i_units, i_max_positions] <= 0:
+        return
+
+    na_block = np.empty((i_block, i_assets), dtype=int)
+    i_fill = 0
+    for l_prefix, na_suffix in _pieces(ways, na_lo, na_hi, i_block, 0, i_units, i_max_positions, []):
+        i_start = 0
+        while i_start < len(na_suffix):
+            i_take = min(i_block - i_fill, len(na_suffix) - i_start)
+            na_block[i_fill:i_fill + i_take, :len(l_prefix)] = l_prefix
+            na_block[i_fill:i_fill + i_take, len(l_prefix):] = na_suffix[i_start:i_start + i_take]
+            i_fill += i_take
+            i_start += i_take
+            if i_fill == i_block:
+                yield na_block / float(i_units)
+                i_fill = 0
+    if i_fill > 0:
+        yield na_block[:i_fill] / float(i_units)
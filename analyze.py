@@ -5,23 +5,29 @@ Author: Boris Litinsky
 Date: 10/16/2014
 '''
 
-import pandas as pd
+import lazyimport
 import numpy as np
 import math
 import copy
-import QSTK.qstkutil.qsdateutil as du
 import datetime as dt
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import metrics
 import sys
 import csv
-import matplotlib.pyplot as plt
 
-print "Pandas Version", pd.__version__
+pd = lazyimport.module('pandas')
+tsu = lazyimport.module('QSTK.qstkutil.tsutil')
+ep = lazyimport.module('QSTK.qstkstudy.EventProfiler')
+plt = lazyimport.module('matplotlib.pyplot')
 
 # get command line options
 def get_cmdline_options():
+    if '-h' in sys.argv[1:]:
+        print "analyze.py <label> <values.csv> <benchmark[,benchmark...]>"
+        print "the first argument is not used; the defaults are values.csv and $SPX"
+        sys.exit()
     try:
         infile = sys.argv[2]
     except:
@@ -47,93 +53,65 @@ def read_csvfile(infile):
         f.close()
     return np.asarray(values)   
 
-# normalize prices
-def normalize_data(prices):
-    return prices / prices[0, :]
-
-# given an array of prices, compute daily return for all stocks
-def daily_return(prices):
-    return tsu.returnize0(prices)
-
-# given daily return and allocations, compute average daily return for portfolio
-def avg_daily_return(daily_rets):
-    avg = daily_rets.mean()
-    return avg
-
-# given an array of prices, compute standard deviation of portfolio
-def std_dev(daily_rets):
-    std = daily_rets.std()
-    return std
-
-def sharpe_ratio(avg_daily_rets, std_dev_tp):
-    k = math.sqrt(252) # for daily returns (assume 252)
-    sharpe = k * avg_daily_rets / std_dev_tp
-    return sharpe
-
-def cumulative_return(na_rets):
-    cumul = 1 + np.subtract(na_rets[-1], na_rets[0])
-    return cumul
-  
 # read stock database from Yahoo and return data structure
 def read_stock_database(begin,end,ls_symbols):
     print "read_stock_database"
     dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2])) - dt.timedelta(days=3)
     dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2])) + dt.timedelta(days=1)
 
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16))    
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))    
     
-    dataobj = da.DataAccess('Yahoo')
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)
-    d_data = dict(zip(ls_keys, ldf_data))
-
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
      
     return dt_begin, dt_end, ldt_timestamps, d_data   
 
-# process benchmark
-def process_benchmark(stock, ldt_timestamps, d_data, np_fund):
-    print "process_benchmark"    
-    df_close = d_data['actual_close']
-   
-    j = 0
-    for i in range(1, len(df_close.index)):
-        bench_date = ldt_timestamps[i].date()
-        for row in np_fund: 
-           fund_date = dt.date(int(row[0]),int(row[1]),int(row[2]))
-           if fund_date == bench_date:
-               value = df_close[stock].ix[df_close.index[i]]
-               np_fund[j][4] = value
-               j +=1
-               break
-                   
-    return np_fund
-
+# fund values csv rows as int64 day numbers and float values
+def parse_values(np_values):
+    na_fund_day = tc.ymd_days(np_values[:,0].astype(int), np_values[:,1].astype(int), np_values[:,2].astype(int))
+    return na_fund_day, np_values[:,3].astype(float)
+
+# process benchmark: join the benchmark closes onto the fund dates with the
+# calendar index, one table lookup per fund date.  Returns a (fund rows x
+# benchmarks) float array, NaN where a benchmark has no close, the fund
+# dates missing from the benchmark data and the trading days inside the
+# fund's range missing from the fund, as day numbers.
+def process_benchmark(ls_benchmarks, ldt_timestamps, d_data, na_fund_day):
+    print "process_benchmark"
+    na_close = d_data['actual_close'][ls_benchmarks].values
+    bench_index = tc.day_index(ldt_timestamps)
+    na_bench_day = bench_index.na_days
+
+    na_rows = bench_index.rows(na_fund_day)
+    na_found = na_rows >= 0
+
+    na_bench = np.empty((len(na_fund_day), len(ls_benchmarks)))
+    na_bench[:] = np.NAN
+    na_bench[na_found] = na_close[na_rows[na_found]]
+
+    na_in_fund = np.zeros(len(na_bench_day), dtype=bool)
+    na_in_fund[na_rows[na_found]] = True
+    na_dated = na_fund_day[na_fund_day != tc.INVALID_DAY]
+    na_in_range = (na_bench_day >= na_dated.min()) & (na_bench_day <= na_dated.max())
+
+    return na_bench, na_fund_day[~na_found], na_bench_day[~na_in_fund & na_in_range]
+
+# print the number and the first few of a list of missing day numbers
+def report_missing(s_label, na_days, i_show=5):
+    if len(na_days) == 0:
+        return
+    ls_dates = [tc.day_date(i_day).isoformat() if i_day != tc.INVALID_DAY else "invalid date"
+                for i_day in na_days[:i_show]]
+    if len(na_days) > i_show:
+        ls_dates.append("...")
+    print "%d dates missing %s: %s" % (len(na_days), s_label, ", ".join(ls_dates))
+
+# statistics of every column of a (days x series) value matrix; returns
+# per-series arrays of sharpe, total return, std, average daily return, max
+# drawdown and sortino
 def calc_stats(prices):
-    # normalize prices
-    na_normalized_price = normalize_data(prices) 
- 
-    # calculate daily return
-    na_rets = na_normalized_price.copy()
-    na_daily_rets = daily_return(na_rets)
-        
-    # average daily return
-    tp_avg_daily_rets = avg_daily_return(na_daily_rets)
-    
-    # compute standard deviation
-    tp_std_dev = std_dev(na_daily_rets)
-    
-    # compute sharpe ratio
-    tp_sharpe_ratio = sharpe_ratio(tp_avg_daily_rets,tp_std_dev)
-    #sharpe_ratio_tp = tsu.getSharpeRatio(na_rets)
-    
-    #compute cumulative return
-    tp_total_return = cumulative_return(na_normalized_price)
-    
-    return tp_sharpe_ratio, tp_total_return, tp_std_dev, tp_avg_daily_rets
+    d_metrics = metrics.calc_metrics(prices)
+    return d_metrics['sharpe'], d_metrics['cumulative'], d_metrics['volatility'], d_metrics['avg_daily'], \
+           d_metrics['max_drawdown'], d_metrics['sortino']
 
 def print_stats():
     # print out status
@@ -148,14 +126,18 @@ def print_stats():
     
 def main():
     print "analyze.py main"
+    sys.argv = sys.argv[:1] + st.profile_argv(sys.argv[1:])
     
     # get command line parameters
     infile,benchmark = get_cmdline_options()    
     
-    # read values csvfile into a numpy array and get list of stocks traded
-    np_values = read_csvfile(infile)    
+    # read values csvfile into a numpy array of day numbers and fund values
+    with st.stage('load values') as span:
+        np_values = read_csvfile(infile)    
+        na_fund_day, na_fund = parse_values(np_values)
+        span['rows'] = len(na_fund)
 
-    ls_symbols = [benchmark]
+    ls_symbols = benchmark.split(",")
 
     # determine the earliest and latest begin dates
     begin = np_values[0][0:3]
@@ -164,35 +146,43 @@ def main():
     # read stock database from Yahoo
     dt_begin, dt_end, ldt_timestamps, d_data = read_stock_database(begin,end,ls_symbols)    
      
-    # append benchmark to the fund
-    stock = ls_symbols[0]
-    np_fund = np.append(np_values,np.zeros([len(np_values),1]),1)
-    np_fund = process_benchmark(stock, ldt_timestamps, d_data, np_fund)
-    
-    # compute statistics for total portfolio (tp)
-    np_price = np_fund[:,[3]].astype(float)
-    tp_sharpe_ratio, tp_total_return, tp_std_dev, tp_avg_daily_rets = calc_stats(np_price)
+    # join the benchmarks to the fund dates
+    with st.stage('compute', rows=len(na_fund_day), benchmarks=len(ls_symbols)):
+        na_bench, na_no_bench, na_no_fund = process_benchmark(ls_symbols, ldt_timestamps, d_data, na_fund_day)
+    report_missing("from the benchmark data", na_no_bench)
+    report_missing("from the fund values", na_no_fund)
+
+    # statistics only on the dates every series has
+    na_common = ~np.isnan(na_bench).any(axis=1)
+    if not na_common.all():
+        print "using the %d of %d fund dates with benchmark data" % (na_common.sum(), len(na_common))
     
-    # compute statistics for benchmark (bm)
-    bm_price = np_fund[:,[4]].astype(float)
-    bm_sharpe_ratio, bm_total_return, bm_std_dev, bm_avg_daily_rets = calc_stats(bm_price)
+    # compute statistics for the total portfolio (tp) and each benchmark (bm)
+    # in one pass over the common dates
+    with st.stage('compute stats', rows=na_common.sum() * (len(ls_symbols) + 1)):
+        np_price = np.column_stack([na_fund[na_common], na_bench[na_common]])
+        na_sharpe, na_total_return, na_std_dev, na_avg_daily_rets, na_drawdown, na_sortino = calc_stats(np_price)
     
     # print statistics
     print "Details of the Performance of the portfolio :"
 
     print "Data Range : %s to %s" % (dt_begin.strftime("%B %d, %Y"), dt_end.strftime("%B %d, %Y"))
     print
-    print "Sharpe Ratio of Fund  : %0.12f" % (tp_sharpe_ratio)
-    print "Sharpe Ratio of %s : %0.12f" % (stock, bm_sharpe_ratio)
-    print
-    print "Total Return of Fund  : %0.12f" % (tp_total_return)
-    print "Total Return of %s : %0.12f" % (stock,bm_total_return)
-    print
-    print "Standard Deviation of  Fund : %0.12f " %(tp_std_dev)
-    print "Standard Deviation of %s : %0.12f" % (stock,bm_std_dev)
-    print 
-    print "Average Daily Return of  Fund : %0.12f" % (tp_avg_daily_rets)
-    print "Average Daily Return of %s : %0.12f" % (stock, bm_avg_daily_rets)
+    print "Sharpe Ratio of Fund  : %0.12f" % (na_sharpe[0])
+    print "Total Return of Fund  : %0.12f" % (na_total_return[0])
+    print "Standard Deviation of  Fund : %0.12f " %(na_std_dev[0])
+    print "Average Daily Return of  Fund : %0.12f" % (na_avg_daily_rets[0])
+    print "Max Drawdown of  Fund : %0.12f" % (na_drawdown[0])
+    print "Sortino Ratio of  Fund : %0.12f" % (na_sortino[0])
+
+    for j, stock in enumerate(ls_symbols):
+        print
+        print "Sharpe Ratio of %s : %0.12f" % (stock, na_sharpe[j + 1])
+        print "Total Return of %s : %0.12f" % (stock, na_total_return[j + 1])
+        print "Standard Deviation of %s : %0.12f" % (stock, na_std_dev[j + 1])
+        print "Average Daily Return of %s : %0.12f" % (stock, na_avg_daily_rets[j + 1])
+        print "Max Drawdown of %s : %0.12f" % (stock, na_drawdown[j + 1])
+        print "Sortino Ratio of %s : %0.12f" % (stock, na_sortino[j + 1])
     
     # plot graph
     #plt.clf()
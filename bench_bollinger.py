@@ -0,0 +1,117 @@
+'''
+File:   bench_bollinger.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Benchmark the whole-panel Bollinger kernel against the
+             per-symbol, per-day loop it replaced in bollinger_events.py
+
+bench_bollinger.py -b <begin_year> -e <end_year> -s <stock_list>
+'''
+
+import datetime as dt
+import pandas as pd
+import numpy as np
+import bollinger_events
+import sys, getopt
+import time
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:",["begin=","end=","stock="])
+    except getopt.GetoptError:
+        print "bench_bollinger.py -b <begin_year> -e <end_year> -s <stock_list>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "bench_bollinger.py -b <begin_year> -e <end_year> -s <stock_list>"
+            print "bench_bollinger.py -b 2008 -e 2009 -s sp5002012"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+    return dt_begin,dt_end,stocks
+
+# the original loop: rolling mean/std per symbol, then seven .ix lookups per
+# (day, symbol) cell
+def loop_bollinger_bands(ls_symbols, d_data):
+    df_close = d_data['close']
+    ldt_timestamps = df_close.index
+
+    bollinger = []
+    rolling_mean = {}
+    rolling_std = {}
+    bollinger_upper = {}
+    bollinger_lower = {}
+    bollinger_value = {}
+
+    for s_sym in ls_symbols:
+        rolling_mean[s_sym] = pd.rolling_mean(df_close[s_sym], window=20, min_periods=1)
+        rolling_std[s_sym]  = pd.rolling_std (df_close[s_sym], window=20, min_periods=1)
+        bollinger_upper[s_sym] = rolling_mean[s_sym] + rolling_std[s_sym]
+        bollinger_lower[s_sym] = rolling_mean[s_sym] - rolling_std[s_sym]
+        bollinger_value[s_sym] = (df_close[s_sym] - rolling_mean[s_sym]) / rolling_std[s_sym]
+
+    for i in range(1, len(ldt_timestamps)):
+        spy_value = bollinger_value['SPY'].ix[ldt_timestamps[i]]
+
+        for s_sym in ls_symbols:
+            date = ldt_timestamps[i]
+            price = df_close[s_sym].ix[ldt_timestamps[i]]
+            mean  = rolling_mean[s_sym].ix[ldt_timestamps[i]]
+            std   = rolling_std[s_sym].ix[ldt_timestamps[i]]
+            upper = bollinger_upper[s_sym].ix[ldt_timestamps[i]]
+            lower = bollinger_lower[s_sym].ix[ldt_timestamps[i]]
+            value = bollinger_value[s_sym].ix[ldt_timestamps[i]]
+            value_yest = bollinger_value[s_sym].ix[ldt_timestamps[i-1]]
+
+            event = spy_value >= 1.5 and value <= -2.0 and value_yest >= -2.0
+            bollinger.append([date, s_sym, price, mean, std, upper, lower, value, event])
+
+    return bollinger
+
+def timed(f, *args):
+    t_start = time.time()
+    result = f(*args)
+    return result, time.time() - t_start
+
+def main(argv):
+    dt_begin, dt_end, stocks = get_cmdline_options(argv)
+    ldt_timestamps, ls_symbols, d_data = bollinger_events.read_stock_database(dt_begin, dt_end, stocks)
+    i_cells = (len(ldt_timestamps) - 1) * len(ls_symbols)
+
+    loop, t_loop = timed(loop_bollinger_bands, ls_symbols, d_data)
+    (panel, df_events), t_panel = timed(bollinger_events.calc_bollinger_bands, ls_symbols, d_data)
+
+    # compare every numeric field and the event flags.  In flat windows the
+    # loop divides by a zero std and gets +-inf from rounding noise in the
+    # mean; the kernel gives NaN there, so those cells are counted separately
+    na_loop = np.array([row[2:8] for row in loop], dtype=float)
+    na_panel = np.array([row[2:8] for row in panel], dtype=float)
+    na_finite = np.isfinite(na_loop) & np.isfinite(na_panel)
+    f_max_diff = np.max(np.abs(na_loop - na_panel)[na_finite])
+    i_flat = np.sum(~na_finite)
+    i_event_diff = sum(1 for a, b in zip(loop, panel) if a[8] != b[8])
+
+    print
+    print "symbols=%d days=%d cells=%d" % (len(ls_symbols), len(ldt_timestamps), i_cells)
+    print "loop   : %8.3f s  %12.0f cells/s" % (t_loop, i_cells / t_loop)
+    print "kernel : %8.3f s  %12.0f cells/s" % (t_panel, i_cells / t_panel)
+    print "speedup: %8.1fx" % (t_loop / t_panel)
+    print "max abs difference:", f_max_diff
+    print "non-finite cells  :", i_flat
+    print "event mismatches  :", i_event_diff, "of", sum(1 for row in loop if row[8]), "events"
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,324 @@
+'''
+File:   bench_suite.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Benchmark the entry points on synthetic data
+
+Every case runs the compute stage of one script (everything after the
+stock database read) on a synthetic.price_panel() of N symbols x T days and,
+for the order cases, synthetic.order_array() orders, so no QSTK data
+directory is needed.  Each case runs in its own process and reports wall
+time, rows per second and two memory figures: peak_rss_mb, the peak RSS of
+the whole process including the synthetic data, and case_rss_mb, how far the
+case itself raised the peak above the RSS once the data was built.  A child
+that dies (killed for memory, a crash) or runs past --timeout is recorded as
+an error result and the suite goes on.  Results are written as JSON; with a
+baseline JSON file, cases that got slower than the tolerance are flagged and
+the exit status is 1.
+
+bench_suite.py -p quick -o bench.json
+bench_suite.py -p quick -o bench_new.json -B bench.json
+bench_suite.py -c marketsim_vector,marketsim_stream -n 500 -t 2500 -r 1000000
+'''
+
+import datetime as dt
+import multiprocessing as mp
+import Queue
+import numpy as np
+import pandas as pd
+import platform
+import resource
+import json
+import time
+import sys, getopt
+import os
+import synthetic as syn
+import bollinger_bands as bb
+import bollinger_events
+import bollinger_trade
+import find_events
+import event_engine as ee
+import event_study as es
+import optimize
+import allocations as al
+import analyze
+import metrics
+import marketsim
+import orderstream
+import tradingcalendar as tc
+
+PRESETS = { 'quick' : { 'symbols' : [10, 100, 500], 'days' : [250, 1000], 'orders' : [1000, 100000] },
+            'full'  : { 'symbols' : [10, 100, 500, 1000, 5000], 'days' : [250, 1000, 2500, 5000],
+                        'orders' : [1000, 100000, 1000000] } }
+
+# get command line options
+def get_cmdline_options(argv):
+    preset = 'quick'
+    ls_cases = None
+    d_sizes = {}
+    outfile = "bench_results.json"
+    baseline = None
+    f_tolerance = 0.25
+    f_timeout = None
+
+    try:
+        opts, args = getopt.getopt(argv,"hp:c:n:t:r:o:B:",["preset=","cases=","symbols=","days=","orders=",
+                                   "outfile=","baseline=","tolerance=","timeout="])
+    except getopt.GetoptError:
+        print "bench_suite.py -p <quick|full> -c <cases> -n <symbols> -t <days> -r <orders> -o <outfile.json> -B <baseline.json> --tolerance <fraction> --timeout <seconds>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "bench_suite.py -p <quick|full> -c <cases> -n <symbols> -t <days> -r <orders> -o <outfile.json> -B <baseline.json> --tolerance <fraction> --timeout <seconds>"
+            print "cases:", ",".join(sorted(CASES.keys()))
+            print "bench_suite.py -p quick -o bench_new.json -B bench.json"
+            sys.exit()
+        elif opt in ('-p','--preset'):
+            preset = arg
+        elif opt in ('-c','--cases'):
+            ls_cases = arg.split(",")
+        elif opt in ('-n','--symbols'):
+            d_sizes['symbols'] = [int(s) for s in arg.split(",")]
+        elif opt in ('-t','--days'):
+            d_sizes['days'] = [int(s) for s in arg.split(",")]
+        elif opt in ('-r','--orders'):
+            d_sizes['orders'] = [int(s) for s in arg.split(",")]
+        elif opt in ('-o','--outfile'):
+            outfile = arg
+        elif opt in ('-B','--baseline'):
+            baseline = arg
+        elif opt == '--tolerance':
+            f_tolerance = float(arg)
+        elif opt == '--timeout':
+            f_timeout = float(arg)
+
+    if preset not in PRESETS:
+        print "Error: preset must be one of", ",".join(sorted(PRESETS.keys()))
+        sys.exit(2)
+    if ls_cases is None:
+        ls_cases = sorted(CASES.keys())
+    for s_case in ls_cases:
+        if s_case not in CASES:
+            print "Error: unknown case", s_case
+            sys.exit(2)
+    d_grid = dict(PRESETS[preset])
+    d_grid.update(d_sizes)
+    return ls_cases,d_grid,outfile,baseline,f_tolerance,f_timeout
+
+# case functions run one script's compute stage on (ldt_timestamps,
+# ls_symbols, d_data, np_orders) and return the number of rows processed
+
+def case_bollinger_bands(ldt_timestamps, ls_symbols, d_data, np_orders):
+    d_bands = bb.calc_bands(d_data['close'][ls_symbols])
+    bb.event_mask(d_bands, ls_symbols.index('SPY'))
+    return len(ldt_timestamps) * len(ls_symbols)
+
+def case_bollinger_events(ldt_timestamps, ls_symbols, d_data, np_orders):
+    bollinger, df_events = bollinger_events.calc_bollinger_bands(ls_symbols, d_data)
+    bollinger_events.find_events(bollinger)
+    return len(ldt_timestamps) * len(ls_symbols)
+
+def case_bollinger_trade(ldt_timestamps, ls_symbols, d_data, np_orders):
+    bollinger_trade.bollinger_trade(ls_symbols, d_data)
+    return len(ldt_timestamps) * len(ls_symbols)
+
+def case_find_events(ldt_timestamps, ls_symbols, d_data, np_orders):
+    find_events.find_events(ls_symbols, d_data)
+    return len(ldt_timestamps) * len(ls_symbols)
+
+def case_event_study(ldt_timestamps, ls_symbols, d_data, np_orders):
+    df_close = d_data['actual_close'][ls_symbols]
+    na_mask = ee.cross_below(df_close.values, float(np.median(df_close.values[0])))
+    na_mask[:, ls_symbols.index('SPY')] = False
+    if na_mask.any():
+        es.event_study(na_mask, d_data, i_bootstrap=100, i_seed=0)
+    return len(ldt_timestamps) * len(ls_symbols)
+
+def case_optimize_sweep(ldt_timestamps, ls_symbols, d_data, np_orders):
+    na_price = d_data['close'].values[:, :min(len(ls_symbols), 5)]
+    optimize.sweep_prices(na_price, i_top=10)
+    return len(ldt_timestamps) * int(al.count_allocations(na_price.shape[1], 0.1))
+
+def case_analyze(ldt_timestamps, ls_symbols, d_data, np_orders):
+    ls_benchmarks = ls_symbols[-5:]
+    na_fund_day = tc.timestamp_days(ldt_timestamps)
+    na_fund = d_data['close'].values[:, :len(ls_symbols) - 1].mean(axis=1)
+    na_bench, na_no_bench, na_no_fund = analyze.process_benchmark(ls_benchmarks, ldt_timestamps, d_data, na_fund_day)
+    analyze.calc_stats(np.column_stack([na_fund, na_bench]))
+    return len(ldt_timestamps) * (len(ls_benchmarks) + 1)
+
+def case_metrics(ldt_timestamps, ls_symbols, d_data, np_orders):
+    metrics.calc_metrics(d_data['close'].values)
+    return len(ldt_timestamps) * len(ls_symbols)
+
+def case_marketsim_vector(ldt_timestamps, ls_symbols, d_data, np_orders):
+    marketsim.process_stock_orders_vectorized(ls_symbols, ldt_timestamps, d_data, 1000000.0, np_orders)
+    return len(np_orders)
+
+def case_marketsim_stream(ldt_timestamps, ls_symbols, d_data, np_orders):
+    portfolio = { "cash" : 1000000.0 }
+    for row in orderstream.iter_fund(portfolio, np_orders.tolist(), ldt_timestamps, d_data['close']):
+        pass
+    return len(np_orders)
+
+def case_marketsim_batch(ldt_timestamps, ls_symbols, d_data, np_orders):
+    l_books = np.array_split(np_orders, 20)
+    marketsim.process_order_books(ldt_timestamps, d_data, 1000000.0, l_books)
+    return len(np_orders)
+
+def case_marketsim_loop(ldt_timestamps, ls_symbols, d_data, np_orders):
+    marketsim.process_stock_orders(ls_symbols, ldt_timestamps, d_data, 1000000.0, np_orders)
+    return len(np_orders)
+
+# case: (function, uses orders, largest size it is run at, as symbols x days
+# or orders x days for the order cases)
+CASES = { 'bollinger_bands'  : (case_bollinger_bands,  False, None),
+          'bollinger_events' : (case_bollinger_events, False, 2500000),
+          'bollinger_trade'  : (case_bollinger_trade,  False, None),
+          'find_events'      : (case_find_events,      False, None),
+          'event_study'      : (case_event_study,      False, None),
+          'optimize_sweep'   : (case_optimize_sweep,   False, None),
+          'analyze'          : (case_analyze,          False, None),
+          'metrics'          : (case_metrics,          False, None),
+          'marketsim_vector' : (case_marketsim_vector, True,  None),
+          'marketsim_stream' : (case_marketsim_stream, True,  None),
+          'marketsim_batch'  : (case_marketsim_batch,  True,  None),
+          'marketsim_loop'   : (case_marketsim_loop,   True,  250000) }
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+# run one case in this process, printed output discarded
+def run_case(s_case, i_symbols, i_days, i_orders):
+    f_case, b_orders, i_limit = CASES[s_case]
+    ldt_timestamps, ls_symbols, d_data = syn.price_panel(i_symbols, i_days)
+    np_orders = None
+    if b_orders:
+        np_orders = syn.order_array(ldt_timestamps, ls_symbols, i_orders)
+    f_setup_rss = peak_rss_mb()
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        t_start = time.time()
+        i_rows = f_case(ldt_timestamps, ls_symbols, d_data, np_orders)
+        f_wall = time.time() - t_start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    f_peak_rss = peak_rss_mb()
+
+    return { 'case' : s_case, 'symbols' : i_symbols, 'days' : i_days, 'orders' : i_orders,
+             'wall' : f_wall, 'peak_rss_mb' : f_peak_rss, 'case_rss_mb' : f_peak_rss - f_setup_rss,
+             'rows' : i_rows,
+             'rows_per_s' : i_rows / f_wall if f_wall > 0 else None }
+
+def child(queue, args):
+    try:
+        queue.put(run_case(*args))
+    except Exception as e:
+        queue.put({ 'error' : "%s: %s" % (type(e).__name__, e) })
+
+# run a case in a fresh process so peak RSS belongs to that case alone; a
+# child that exits without a result, or runs longer than f_timeout seconds,
+# gives an error result instead of hanging the suite
+def run_isolated(s_case, i_symbols, i_days, i_orders, f_timeout=None, f_poll=1.0):
+    queue = mp.Queue()
+    proc = mp.Process(target=child, args=(queue, (s_case, i_symbols, i_days, i_orders)))
+    proc.start()
+    t_start = time.time()
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=f_poll)
+        except Queue.Empty:
+            if not proc.is_alive():
+                # a result put just before the exit may still be in the pipe
+                try:
+                    result = queue.get(timeout=f_poll)
+                except Queue.Empty:
+                    proc.join()
+                    if proc.exitcode < 0:
+                        return { 'error' : "child killed by signal %d" % (-proc.exitcode) }
+                    return { 'error' : "child exited with code %d and no result" % (proc.exitcode) }
+            elif f_timeout is not None and time.time() - t_start > f_timeout:
+                proc.terminate()
+                proc.join()
+                return { 'error' : "timed out after %0.0f s" % (f_timeout) }
+    proc.join()
+    return result
+
+# (case, symbols, days, orders) runs for the grid, skipping sizes above a
+# case's limit
+def case_grid(ls_cases, d_grid):
+    runs = []
+    for s_case in ls_cases:
+        f_case, b_orders, i_limit = CASES[s_case]
+        for i_symbols in d_grid['symbols']:
+            for i_days in d_grid['days']:
+                for i_orders in (d_grid['orders'] if b_orders else [0]):
+                    i_size = (i_orders if b_orders else i_symbols) * i_days
+                    if i_limit is not None and i_size > i_limit:
+                        continue
+                    runs.append((s_case, i_symbols, i_days, i_orders))
+    return runs
+
+def result_key(result):
+    return "%s/%d/%d/%d" % (result['case'], result['symbols'], result['days'], result['orders'])
+
+# results slower than the baseline by more than f_tolerance (and by more than
+# f_floor seconds, so timer noise on tiny cases is not flagged)
+def find_regressions(results, baseline, f_tolerance=0.25, f_floor=0.05):
+    d_base = dict((result_key(r), r) for r in baseline['results'] if 'wall' in r)
+    regressions = []
+    for result in results:
+        base = d_base.get(result_key(result))
+        if base is None or 'wall' not in result:
+            continue
+        if result['wall'] > base['wall'] * (1.0 + f_tolerance) and result['wall'] - base['wall'] > f_floor:
+            regressions.append((result_key(result), base['wall'], result['wall']))
+    return regressions
+
+def main(argv):
+    ls_cases, d_grid, outfile, baseline, f_tolerance, f_timeout = get_cmdline_options(argv)
+
+    results = []
+    print "%-18s %7s %6s %8s %10s %10s %10s %14s" % ("case", "symbols", "days", "orders", "wall s", "peak MB",
+                                                   "case MB", "rows/s")
+    for s_case, i_symbols, i_days, i_orders in case_grid(ls_cases, d_grid):
+        result = run_isolated(s_case, i_symbols, i_days, i_orders, f_timeout)
+        if 'error' in result:
+            print "%-18s %7d %6d %8d  error: %s" % (s_case, i_symbols, i_days, i_orders, result['error'])
+            result.update({ 'case' : s_case, 'symbols' : i_symbols, 'days' : i_days, 'orders' : i_orders })
+        else:
+            print "%-18s %7d %6d %8d %10.4f %10.1f %10.1f %14.0f" % (s_case, i_symbols, i_days, i_orders,
+                  result['wall'], result['peak_rss_mb'], result['case_rss_mb'], result['rows_per_s'] or 0)
+        results.append(result)
+
+    d_out = { 'meta' : { 'date' : dt.datetime.now().isoformat(), 'python' : platform.python_version(),
+                         'numpy' : np.__version__, 'pandas' : pd.__version__, 'machine' : platform.platform(),
+                         'grid' : d_grid },
+              'results' : results }
+    f = open(outfile, "w")
+    try:
+        json.dump(d_out, f, indent=1, sort_keys=True)
+    finally:
+        f.close()
+    print "results written to", outfile
+
+    if baseline is not None:
+        f = open(baseline, "r")
+        try:
+            d_base = json.load(f)
+        finally:
+            f.close()
+        regressions = find_regressions(results, d_base, f_tolerance)
+        for s_key, f_base, f_wall in regressions:
+            print "REGRESSION %-40s %10.4f s -> %10.4f s (%+.0f%%)" % (s_key, f_base, f_wall, (f_wall / f_base - 1.0) * 100.0)
+        if len(regressions) > 0:
+            sys.exit(1)
+        print "no regressions against", baseline
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -7,18 +7,22 @@ Description: Compute Bollinger Bands
 '''
 
 import datetime as dt
-import pandas as pd
+import lazyimport
 import numpy as np
 import math
 import copy
-import QSTK.qstkutil.qsdateutil as du
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
-import matplotlib.pyplot as plt
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import bollinger_bands as bb
 import sys, getopt
 import csv
 
+pd = lazyimport.module('pandas')
+tsu = lazyimport.module('QSTK.qstkutil.tsutil')
+ep = lazyimport.module('QSTK.qstkstudy.EventProfiler')
+plt = lazyimport.module('matplotlib.pyplot')
+
 # get command line options
 def get_cmdline_options(argv):    
     begin = [2010, 1, 1]
@@ -33,7 +37,7 @@ def get_cmdline_options(argv):
         print "bollinger.py -b <begin_year> -e <end_year> -s <stocks> -o <outfile.csv>" 
         sys.exit(2)
     for opt, arg in opts:
-        if opt == 'h':
+        if opt == '-h':
             print "bollinger.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv>"
             print "bollinger.py -b 2011 -e 2011 -s AAPL,MSFT -o bolligner.csv"
             sys.exit()
@@ -70,38 +74,21 @@ def calc_bollinger(ls_symbols, d_data):
     print "Calculate Bollinger Bands"
     
     # Finding the event dataframe
-    df_close = d_data['actual_close']
+    df_close = d_data['actual_close'][ls_symbols]
 
     # Time stamps for the event range
     ldt_timestamps = df_close.index
 
-    bollinger = []    
-    closing_price = {}
-    rolling_mean = {}
-    rolling_std = {}
-    bollinger_upper = {}
-    bollinger_lower = {}
-    bollinger_value = {}
-    
-    for s_sym in ls_symbols:
-        closing_price[s_sym] = df_close[s_sym]
-        rolling_mean[s_sym] = pd.rolling_mean(df_close[s_sym], window=20, min_periods=1)
-        rolling_std[s_sym]  = pd.rolling_std (df_close[s_sym], window=20, min_periods=1)
-        bollinger_upper[s_sym] = rolling_mean[s_sym] + rolling_std[s_sym]
-        bollinger_lower[s_sym] = rolling_mean[s_sym] - rolling_std[s_sym] 
-        bollinger_value[s_sym] = (closing_price[s_sym] - rolling_mean[s_sym]) / rolling_std[s_sym]
- 
+    # bands for all symbols and days at once
+    d_bands = bb.calc_bands(df_close, i_window=20)
+    ls_fields = ['price', 'mean', 'std', 'upper', 'lower', 'value']
+    ll_cells = np.dstack([d_bands[s_field] for s_field in ls_fields]).tolist()
+
+    bollinger = []
     for i in range(1, len(ldt_timestamps)):
-        for s_sym in ls_symbols:
-            date = ldt_timestamps[i]
-            price = df_close[s_sym].ix[ldt_timestamps[i]]
-            mean  = rolling_mean[s_sym].ix[ldt_timestamps[i]]
-            std   = rolling_std[s_sym].ix[ldt_timestamps[i]]
-            upper = bollinger_upper[s_sym].ix[ldt_timestamps[i]]
-            lower = bollinger_lower[s_sym].ix[ldt_timestamps[i]]
-            value = bollinger_value[s_sym].ix[ldt_timestamps[i]]
-            
-            bollinger.append([date, s_sym, price, mean, std, upper, lower, value ])
+        date = ldt_timestamps[i]
+        for j, s_sym in enumerate(ls_symbols):
+            bollinger.append([date, s_sym] + ll_cells[i][j])
             
     return bollinger
 
@@ -119,27 +106,22 @@ def read_stock_database(dt_begin,dt_end,ls_symbols):
     print "read_stock_database"
     dt_end +=dt.timedelta(days=1)
 
-    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16))        
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)   
-    d_data = dict(zip(ls_keys, ldf_data))
-   
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))        
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
      
     return ldt_timestamps, d_data   
 
 def main(argv):
     print "bollinger.py main routine\n"
-    dt_begin, dt_end, ls_symbols, outfile = get_cmdline_options(argv)
+    dt_begin, dt_end, ls_symbols, outfile = get_cmdline_options(st.profile_argv(argv))
     ldt_timestamps, d_data = read_stock_database(dt_begin, dt_end,ls_symbols)
   
-    bollinger = calc_bollinger(ls_symbols, d_data)
-    write_csvfile(outfile,bollinger)
-    plot(ldt_timestamps, ls_symbols, d_data)
+    with st.stage('compute', rows=len(ldt_timestamps) * len(ls_symbols)):
+        bollinger = calc_bollinger(ls_symbols, d_data)
+    with st.stage('write', rows=len(bollinger)):
+        write_csvfile(outfile,bollinger)
+    with st.stage('plot'):
+        plot(ldt_timestamps, ls_symbols, d_data)
     
     #print bollinger
     print "bollinger.py main done\n"
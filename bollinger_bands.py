@@ -0,0 +1,95 @@
+'''
+File:   bollinger_bands.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Bollinger Bands for a whole price DataFrame at once
+
+calc_bands() returns the rolling mean, std, bands and Bollinger value of
+every symbol as (days x symbols) arrays, computed from prefix sums so the
+cost is independent of the window length.  It matches
+pd.rolling_mean/pd.rolling_std(window, min_periods=1) per column.
+'''
+
+import numpy as np
+
+# prefix sums of the column-centered prices and their squares, with a leading
+# zero row so the sum over rows [a, b) is cs[b] - cs[a]; centering keeps the
+# sum of squares small enough that the variance does not lose precision.
+# The prefix count of day-to-day price changes finds flat windows exactly.
+def prefix_sums(na_price):
+    na_offset = na_price.mean(axis=0)
+    na_center = na_price - na_offset
+    i_days, i_syms = na_center.shape
+    na_sum = np.zeros((i_days + 1, i_syms))
+    na_sum2 = np.zeros((i_days + 1, i_syms))
+    na_changes = np.zeros((i_days + 1, i_syms), dtype=int)
+    np.cumsum(na_center, axis=0, out=na_sum[1:])
+    np.cumsum(na_center * na_center, axis=0, out=na_sum2[1:])
+    np.cumsum(na_price[1:] != na_price[:-1], axis=0, out=na_changes[2:])
+    return na_offset, na_sum, na_sum2, na_changes
+
+# rolling mean and sample std (ddof=1) over the last i_window rows, using
+# fewer rows at the start of the range like min_periods=1.  A window with a
+# single repeated price has std 0 and mean equal to that price.
+def rolling_mean_std(na_price, i_window=20, prefix=None):
+    if prefix is None:
+        prefix = prefix_sums(na_price)
+    na_offset, na_sum, na_sum2, na_changes = prefix
+    i_days = na_price.shape[0]
+
+    na_end = np.arange(1, i_days + 1)
+    na_begin = np.maximum(na_end - i_window, 0)
+    na_count = (na_end - na_begin).astype(float)[:, np.newaxis]
+
+    na_mean = (na_sum[na_end] - na_sum[na_begin]) / na_count + na_offset
+    na_ss = (na_sum2[na_end] - na_sum2[na_begin]) - na_count * (na_mean - na_offset) ** 2
+    np.maximum(na_ss, 0.0, out=na_ss)
+
+    na_flat = (na_changes[na_end] - na_changes[na_begin + 1]) == 0
+    na_ss[na_flat] = 0.0
+    na_mean[na_flat] = na_price[na_flat]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        na_std = np.sqrt(na_ss / (na_count - 1))
+    na_std[0, :] = np.nan
+    return na_mean, na_std
+
+# Bollinger Bands for every column of df_close (a DataFrame or a days x
+# symbols array), returned as a dictionary of (days x symbols) arrays;
+# value_yest is the previous day's value (NaN on day 0)
+def calc_bands(df_close, i_window=20, prefix=None):
+    na_price = np.asarray(getattr(df_close, 'values', df_close), dtype=float)
+    na_mean, na_std = rolling_mean_std(na_price, i_window, prefix)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        na_value = (na_price - na_mean) / na_std
+    na_value_yest = np.empty_like(na_value)
+    na_value_yest[0, :] = np.nan
+    na_value_yest[1:, :] = na_value[:-1, :]
+
+    return { 'price'      : na_price,
+             'mean'       : na_mean,
+             'std'        : na_std,
+             'upper'      : na_mean + na_std,
+             'lower'      : na_mean - na_std,
+             'value'      : na_value,
+             'value_yest' : na_value_yest }
+
+# boolean (days x symbols) mask of the days where the market's Bollinger value
+# is at least f_market and a symbol's value crosses below f_value.  With
+# b_strict the value must be strictly below f_value (bollinger_trade.py),
+# otherwise at or below it (bollinger_events.py).  Day 0 never has an event.
+def event_mask(d_bands, i_market, f_market=1.5, f_value=-2.0, b_strict=False):
+    na_value = d_bands['value']
+    na_value_yest = d_bands['value_yest']
+    na_market = na_value[:, i_market][:, np.newaxis]
+
+    with np.errstate(invalid='ignore'):
+        if b_strict:
+            na_cross = na_value < f_value
+        else:
+            na_cross = na_value <= f_value
+        na_mask = (na_market >= f_market) & na_cross & (na_value_yest >= f_value)
+    na_mask[0, :] = False
+    return na_mask
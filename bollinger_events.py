@@ -9,34 +9,37 @@ Lookback windows=20
 '''
 
 import datetime as dt
-import pandas as pd
+import lazyimport
 import numpy as np
-import math
-import copy
-import QSTK.qstkutil.qsdateutil as du
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
-import matplotlib.pyplot as plt
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import bollinger_bands as bb
+import event_study as es
 import sys, getopt
 import csv
 
+pd = lazyimport.module('pandas')
+plt = lazyimport.module('matplotlib.pyplot')
+
 # get command line options
 def get_cmdline_options(argv):    
     begin = [2008, 1, 1]
     end   = [2009, 12, 31]
     stocks = 'SP5002012'
+    b_plot = True
+    i_seed = 0
     outfile = "bollinger_events"
     
     try:
-        opts, args = getopt.getopt(argv,"hb:e:s:o:",["begin=","end=","stock=","outfile="])
+        opts, args = getopt.getopt(argv,"hb:e:s:o:r:",["begin=","end=","stock=","outfile=","seed=","noplot"])
         
     except getopt.GetoptError:
-        print "bollinger.py -b <begin_year> -e <end_year> -s <stocks> -o <outfile.csv>" 
+        print "bollinger.py -b <begin_year> -e <end_year> -s <stocks> -o <outfile.csv> -r <seed> [--noplot]" 
         sys.exit(2)
     for opt, arg in opts:
-        if opt == 'h':
-            print "bollinger.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv>"
+        if opt == '-h':
+            print "bollinger.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv> -r <seed> [--noplot]"
             print "bollinger.py -b 2011 -e 2011 -s AAPL,MSFT -o bollinger_events.csv"
             sys.exit()
         elif opt in ('-b','--begin'):
@@ -48,6 +51,10 @@ def get_cmdline_options(argv):
             stocks = stocks.split(",")
         elif opt in ('-o','--ofile'):
             outfile = arg
+        elif opt in ('-r','--seed'):
+            i_seed = int(arg)
+        elif opt == '--noplot':
+            b_plot = False
     
     dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2])) 
     dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
@@ -55,8 +62,8 @@ def get_cmdline_options(argv):
     if dt_begin > dt_end:
         print "Error: begining date must be before ending date"
         sys.exit(2)
-    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks," outfile=",outfile
-    return dt_begin,dt_end,stocks,outfile
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks," outfile=",outfile,"seed=",i_seed
+    return dt_begin,dt_end,stocks,outfile,b_plot,i_seed
 
 #open csv file and write out all trades
 def write_csvfile(outfile,data):
@@ -72,51 +79,29 @@ def calc_bollinger_bands(ls_symbols, d_data):
     print "calc_bollinger_bands"
     
     # Finding the event dataframe
-    df_close = d_data['close']
-
-    # Creating an empty dataframe
-    df_events = copy.deepcopy(df_close)
-    df_events = df_events * np.NAN
+    df_close = d_data['close'][ls_symbols]
 
     # Time stamps for the event range
     ldt_timestamps = df_close.index
 
-    bollinger = []    
-    closing_price = {}
-    rolling_mean = {}
-    rolling_std = {}
-    bollinger_upper = {}
-    bollinger_lower = {}
-    bollinger_value = {}
-    
-    for s_sym in ls_symbols:
-        closing_price[s_sym] = df_close[s_sym]
-        rolling_mean[s_sym] = pd.rolling_mean(df_close[s_sym], window=20, min_periods=1)
-        rolling_std[s_sym]  = pd.rolling_std (df_close[s_sym], window=20, min_periods=1)
-        bollinger_upper[s_sym] = rolling_mean[s_sym] + rolling_std[s_sym]
-        bollinger_lower[s_sym] = rolling_mean[s_sym] - rolling_std[s_sym] 
-        bollinger_value[s_sym] = (closing_price[s_sym] - rolling_mean[s_sym]) / rolling_std[s_sym]
- 
+    # bands for all symbols and days at once, events where SPY >= 1.5 and the
+    # symbol crosses to or below -2.0
+    d_bands = bb.calc_bands(df_close, i_window=20)
+    i_market = list(df_close.columns).index('SPY')
+    na_events = bb.event_mask(d_bands, i_market, f_market=1.5, f_value=-2.0)
+
+    # Creating the event dataframe
+    df_events = pd.DataFrame(np.where(na_events, 1.0, np.NAN), index=df_close.index, columns=df_close.columns)
+
+    ls_fields = ['price', 'mean', 'std', 'upper', 'lower', 'value']
+    ll_cells = np.dstack([d_bands[s_field] for s_field in ls_fields]).tolist()
+    ll_events = na_events.tolist()
+
+    bollinger = []
     for i in range(1, len(ldt_timestamps)):
-        spy_value = bollinger_value['SPY'].ix[ldt_timestamps[i]]
-        
-        for s_sym in ls_symbols:
-            date = ldt_timestamps[i]
-            price = df_close[s_sym].ix[ldt_timestamps[i]]
-            mean  = rolling_mean[s_sym].ix[ldt_timestamps[i]]
-            std   = rolling_std[s_sym].ix[ldt_timestamps[i]]
-            upper = bollinger_upper[s_sym].ix[ldt_timestamps[i]]
-            lower = bollinger_lower[s_sym].ix[ldt_timestamps[i]]
-            value = bollinger_value[s_sym].ix[ldt_timestamps[i]]
-            value_yest = bollinger_value[s_sym].ix[ldt_timestamps[i-1]]
-                        
-            if spy_value >= 1.5 and value <= -2.0 and value_yest >= -2.0:
-                event = True
-                df_events[s_sym].ix[ldt_timestamps[i]] = 1
-            else:
-                event = False
-                
-            bollinger.append([date, s_sym, price, mean, std, upper, lower, value, event ])
+        date = ldt_timestamps[i]
+        for j, s_sym in enumerate(ls_symbols):
+            bollinger.append([date, s_sym] + ll_cells[i][j] + [ll_events[i][j]])
             
     return bollinger, df_events
 
@@ -145,41 +130,44 @@ def read_stock_database(dt_begin,dt_end,stocks):
     print "read_stock_database"
     dt_end +=dt.timedelta(days=1)
 
-    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
     
-    ls_symbols = dataobj.get_symbols_from_list(stocks)
+    ls_symbols = stockdb.get_symbols_from_list(stocks)
     ls_symbols.append('SPY')
     
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16))        
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)   
-    d_data = dict(zip(ls_keys, ldf_data))
-   
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))        
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
      
     return ldt_timestamps, ls_symbols, d_data   
 
 def main(argv):
     print "bollinger_events.py main routine\n"
-    dt_begin, dt_end, stocks, outfile = get_cmdline_options(argv)
+    dt_begin, dt_end, stocks, outfile, b_plot, i_seed = get_cmdline_options(st.profile_argv(argv))
     ldt_timestamps, ls_symbols, d_data = read_stock_database(dt_begin, dt_end, stocks)
   
-    bollinger, df_events = calc_bollinger_bands(ls_symbols, d_data)
-    events = find_events(bollinger)
-    write_csvfile(outfile,events)
+    with st.stage('compute', rows=len(ldt_timestamps) * len(ls_symbols)) as span:
+        bollinger, df_events = calc_bollinger_bands(ls_symbols, d_data)
+        events = find_events(bollinger)
+        span['events'] = len(events)
+    with st.stage('write', rows=len(events)):
+        write_csvfile(outfile,events)
     #plot(ldt_timestamps, ls_symbols, d_data)
     
     print "total events=",len(events)
     print "bollinger_events.py main done\n"
     
-    studyfile = outfile + ".pdf"
-    print "creating study in file:",studyfile
-    ep.eventprofiler(df_events, d_data, i_lookback=20, i_lookforward=20,
-                s_filename=studyfile, b_market_neutral=True, b_errorbars=True,
-                s_market_sym='SPY')
+    # market neutral event study with bootstrap error bars, saved as csv
+    with st.stage('event profile', rows=len(events)):
+        d_study = es.event_study(df_events, d_data, i_lookback=20, i_lookforward=20,
+                    b_market_neutral=True, s_market_sym='SPY', i_bootstrap=1000, i_seed=i_seed)
+    with st.stage('write', rows=len(d_study['day'])):
+        es.save_study(d_study, outfile + "_study.csv")
+    print "event study of %d events in file: %s" % (d_study['count'], outfile + "_study.csv")
+
+    if b_plot:
+        studyfile = outfile + ".pdf"
+        print "creating study in file:",studyfile
+        with st.stage('plot'):
+            es.plot_study(d_study, studyfile, b_market_neutral=True, b_errorbars=True)
     
     
 
@@ -0,0 +1,269 @@
+'''
+File:   bollinger_state.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Rolling Bollinger Band state updated one bar at a time
+
+RollingBands keeps, for every symbol, the last i_window prices in a ring
+buffer with the windowed Welford mean and sum of squared deviations, so a
+new day's bar updates the bands of all symbols in O(1) per symbol instead of
+recomputing the rolling mean and std over the whole history.  The number of
+price changes inside the window is kept too, so a flat window gets std 0 and
+mean equal to the price exactly, like bollinger_bands.rolling_mean_std().
+The state is saved to and loaded from a .npz file between runs.
+
+Each run reads only the days after the saved state; a symbol without a bar
+on one of them is carried forward from its last price in the ring, and a
+symbol's first real close rewrites its window with that close, so from then
+on the bands match bollinger_bands.calc_bands() over the whole history.
+Only the days before a symbol's first close differ: the batch back fills
+them from the future, the state has 1.0 or the fill of that night's read.
+state_check.py compares one-day updates against the batch bands.
+
+bollinger_state.py -b 2008 -e 2009 -s sp5002012 -f bollinger_state.npz
+'''
+
+import datetime as dt
+import numpy as np
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import sys, getopt
+import os
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+    statefile = "bollinger_state.npz"
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:f:",["begin=","end=","stock=","file="])
+    except getopt.GetoptError:
+        print "bollinger_state.py -b <begin_year> -e <end_year> -s <stock_list> -f <statefile.npz>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "bollinger_state.py -b <begin_year> -e <end_year> -s <stock_list> -f <statefile.npz>"
+            print "builds the state from begin to end the first time, then only adds the days after the saved state up to end"
+            print "bollinger_state.py -b 2008 -e 2009 -s sp5002012 -f bollinger_state.npz"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-f','--file'):
+            statefile = arg
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+    return dt_begin,dt_end,stocks,statefile
+
+def date_key(timestamp):
+    return timestamp.year * 10000 + timestamp.month * 100 + timestamp.day
+
+class RollingBands(object):
+    def __init__(self, ls_symbols, i_window=20):
+        i_syms = len(ls_symbols)
+        self.ls_symbols = list(ls_symbols)
+        self.i_window = i_window
+        self.na_ring = np.zeros((i_window, i_syms))
+        self.i_pos = 0          # ring slot of the next bar, the oldest one once full
+        self.i_count = 0        # bars in the window
+        self.na_mean = np.zeros(i_syms)
+        self.na_m2 = np.zeros(i_syms)
+        self.na_changes = np.zeros(i_syms, dtype=int)
+        self.na_value = np.empty(i_syms)
+        self.na_value[:] = np.nan
+        self.na_seen = np.zeros(i_syms, dtype=bool)    # symbols that have had a real price
+        self.i_last_key = 0     # yyyymmdd of the last bar
+
+    # add one bar (a price per symbol, in ls_symbols order) and return the
+    # bands for it as a dictionary of per-symbol arrays, the same fields as
+    # bollinger_bands.calc_bands() for one day plus the event flags.
+    # Events are where the market's value is at least f_market and a
+    # symbol's value crosses to (b_strict: below) f_value.  na_real marks the
+    # prices that are real closes rather than filled; a symbol's first real
+    # close rewrites its window with that close, the back fill a batch read
+    # gives the days before it.
+    def update(self, na_price, i_key=None, i_market=None, f_market=1.5, f_value=-2.0, b_strict=False, na_real=None):
+        na_price = np.asarray(na_price, dtype=float)
+        i_window = self.i_window
+
+        if na_real is not None:
+            na_first = na_real & ~self.na_seen
+            if na_first.any() and self.i_count > 0:
+                self.na_ring[:, na_first] = na_price[na_first]
+                self.na_mean[na_first] = na_price[na_first]
+                self.na_m2[na_first] = 0.0
+                self.na_changes[na_first] = 0
+            self.na_seen |= na_real
+
+        if self.i_count > 0:
+            na_last = self.na_ring[(self.i_pos - 1) % i_window]
+            self.na_changes += na_price != na_last
+
+        if self.i_count == i_window:
+            # replace the oldest bar: windowed Welford update
+            na_old = self.na_ring[self.i_pos]
+            if i_window > 1:
+                self.na_changes -= self.na_ring[(self.i_pos + 1) % i_window] != na_old
+            na_mean = self.na_mean + (na_price - na_old) / i_window
+            self.na_m2 += (na_price - na_old) * (na_price - na_mean + na_old - self.na_mean)
+            self.na_mean = na_mean
+        else:
+            self.i_count += 1
+            na_delta = na_price - self.na_mean
+            self.na_mean += na_delta / self.i_count
+            self.na_m2 += na_delta * (na_price - self.na_mean)
+
+        self.na_ring[self.i_pos] = na_price
+        self.i_pos = (self.i_pos + 1) % i_window
+        if i_key is not None:
+            self.i_last_key = i_key
+
+        # a window with a single repeated price is exactly flat
+        na_flat = self.na_changes == 0
+        self.na_mean[na_flat] = na_price[na_flat]
+        self.na_m2[na_flat] = 0.0
+        np.maximum(self.na_m2, 0.0, out=self.na_m2)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            na_std = np.sqrt(self.na_m2 / (self.i_count - 1))
+            na_value = (na_price - self.na_mean) / na_std
+        na_value_yest = self.na_value
+        self.na_value = na_value
+
+        d_bands = { 'price'      : na_price,
+                    'mean'       : self.na_mean.copy(),
+                    'std'        : na_std,
+                    'upper'      : self.na_mean + na_std,
+                    'lower'      : self.na_mean - na_std,
+                    'value'      : na_value,
+                    'value_yest' : na_value_yest }
+
+        na_event = np.zeros(len(na_price), dtype=bool)
+        if i_market is not None and self.i_count > 1:
+            with np.errstate(invalid='ignore'):
+                if b_strict:
+                    na_cross = na_value < f_value
+                else:
+                    na_cross = na_value <= f_value
+                na_event = (na_value[i_market] >= f_market) & na_cross & (na_value_yest >= f_value)
+        d_bands['event'] = na_event
+        return d_bands
+
+    # the last bar's price of every symbol, NaN before the first bar
+    def last_price(self):
+        if self.i_count == 0:
+            na_last = np.empty(len(self.ls_symbols))
+            na_last[:] = np.nan
+            return na_last
+        return self.na_ring[(self.i_pos - 1) % self.i_window].copy()
+
+    def save(self, s_file):
+        s_tmp = s_file + ".tmp"
+        f = open(s_tmp, "wb")
+        try:
+            np.savez(f, symbols=np.array(self.ls_symbols), ring=self.na_ring, mean=self.na_mean,
+                     m2=self.na_m2, changes=self.na_changes, value=self.na_value, seen=self.na_seen,
+                     meta=np.array([self.i_window, self.i_pos, self.i_count, self.i_last_key]))
+        finally:
+            f.close()
+        os.rename(s_tmp, s_file)
+
+    @classmethod
+    def load(cls, s_file):
+        npz = np.load(s_file)
+        try:
+            i_window, i_pos, i_count, i_last_key = [int(i) for i in npz['meta']]
+            state = cls([str(s_sym) for s_sym in npz['symbols']], i_window)
+            state.na_ring = npz['ring']
+            state.na_mean = npz['mean']
+            state.na_m2 = npz['m2']
+            state.na_changes = npz['changes']
+            state.na_value = npz['value']
+            if 'seen' in npz.files:
+                state.na_seen = npz['seen']
+            else:
+                state.na_seen[:] = True
+        finally:
+            npz.close()
+        state.i_pos, state.i_count, state.i_last_key = i_pos, i_count, i_last_key
+        return state
+
+# new state for the symbols, seeded by adding every bar of the history;
+# na_real marks the real closes among the prices
+def build_state(ls_symbols, ldt_timestamps, na_price, i_window=20, na_real=None):
+    state = RollingBands(ls_symbols, i_window)
+    for i, timestamp in enumerate(ldt_timestamps):
+        state.update(na_price[i], date_key(timestamp), na_real=None if na_real is None else na_real[i])
+    return state
+
+# (days x symbols) closes of the days to add to the state.  A read of only
+# the new days would fill a missing bar from inside those days, so the raw
+# closes are read and a missing bar is carried forward from the state's
+# last price instead, the same value the ffill of a read over the whole
+# history gives.  A symbol with no price in the state yet gets the fill of
+# the new days (bfill, then 1.0), as a first batch read does.  Returns the
+# prices and the mask of the real closes among them.
+def new_prices(state, ldt_timestamps, ls_symbols):
+    df_raw = stockdb.read_files(stockdb.get_dataobj(), ldt_timestamps, ls_symbols, ['close'])['close']
+    return carry_prices(state, df_raw)
+
+# fill the raw (days x symbols) closes in df_raw for new_prices()
+def carry_prices(state, df_raw):
+    na_real = ~np.isnan(df_raw.values)
+    na_price = df_raw.values.copy()
+    na_last = state.last_price()
+    for i in range(len(na_price)):
+        na_gap = np.isnan(na_price[i])
+        na_price[i, na_gap] = na_last[na_gap]
+        na_last = na_price[i]
+    na_missing = np.isnan(na_price)
+    if na_missing.any():
+        na_fill = stockdb.fill_data({ 'close' : df_raw }, ['close'])['close'].values
+        na_price[na_missing] = na_fill[na_missing]
+    return na_price, na_real
+
+def main(argv):
+    print "bollinger_state.py main routine\n"
+    dt_begin, dt_end, stocks, statefile = get_cmdline_options(st.profile_argv(argv))
+
+    if os.path.exists(statefile):
+        state = RollingBands.load(statefile)
+        i_key = state.i_last_key
+        dt_begin = dt.datetime(i_key // 10000, i_key // 100 % 100, i_key % 100) + dt.timedelta(days=1)
+        ls_symbols = state.ls_symbols
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+        ls_symbols.append('SPY')
+        state = RollingBands(ls_symbols)
+
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end + dt.timedelta(days=1), dt.timedelta(hours=16))
+    ldt_timestamps = [ts for ts in ldt_timestamps if date_key(ts) > state.i_last_key]
+    if len(ldt_timestamps) == 0:
+        print "state is up to date:", state.i_last_key
+        return
+
+    with st.stage('load', symbols=len(ls_symbols), rows=len(ldt_timestamps) * len(ls_symbols)):
+        na_price, na_real = new_prices(state, ldt_timestamps, ls_symbols)
+    i_market = ls_symbols.index('SPY')
+
+    with st.stage('compute', rows=na_price.size):
+        for i, timestamp in enumerate(ldt_timestamps):
+            d_bands = state.update(na_price[i], date_key(timestamp), i_market, na_real=na_real[i])
+            for j in np.nonzero(d_bands['event'])[0]:
+                print "event", timestamp, ls_symbols[j], d_bands['price'][j], d_bands['mean'][j], d_bands['std'][j], \
+                      d_bands['upper'][j], d_bands['lower'][j], d_bands['value'][j], True
+
+    with st.stage('write', bytes=state.na_ring.nbytes):
+        state.save(statefile)
+    print "added %d days, state saved to %s at %d" % (len(ldt_timestamps), statefile, state.i_last_key)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,260 @@
+'''
+File:   bollinger_sweep.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Sweep the bollinger_trade.py strategy over a parameter grid
+
+Evaluates every combination of window length, market filter (SPY value at
+least -m), entry value (symbol crosses below -v) and hold period (-d days)
+in one process, without writing orders or values files.  Prices are loaded
+once into shared memory; each worker builds the prefix sums of the prices
+once and reuses them for every window it gets, so a window costs O(T x N)
+whatever its length.  The trades of a parameter set are simulated with
+arrays: i_shares bought at each event's close and sold i_hold days later,
+exactly like bollinger_trade.py followed by marketsim.py.  The fund values
+of all parameter sets of a task are scored together by metrics.calc_metrics.
+
+Every parameter set is scored on the whole date range, so the results are
+comparable with each other; marketsim.py on a single orders file starts its
+values at the first order instead.
+
+bollinger_sweep.py -b 2008 -e 2009 -s sp5002012 -w 10,20,30 -m 1.0,1.5 -v -1.5,-2.0 -d 5,10 -o bollinger_sweep.csv
+'''
+
+import datetime as dt
+import numpy as np
+import itertools as it
+import multiprocessing as mp
+import multiprocessing.sharedctypes as mps
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import bollinger_bands as bb
+import metrics
+import time
+import sys, getopt
+import csv
+
+LS_COLUMNS = ['window', 'market', 'value', 'hold', 'trades',
+              'sharpe', 'cumulative', 'volatility', 'avg_daily', 'max_drawdown', 'sortino']
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+    li_windows = [10, 15, 20, 25, 30]
+    lf_market = [1.0, 1.5]
+    lf_value = [-1.5, -2.0, -2.5]
+    li_hold = [3, 5, 10]
+    i_shares = 100
+    f_cash = 100000.0
+    i_procs = mp.cpu_count()
+    i_top = 10
+    outfile = "bollinger_sweep.csv"
+
+    s_usage = "bollinger_sweep.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -w <windows> -m <market_values> " \
+              "-v <entry_values> -d <hold_days> -q <shares> -c <cash> -p <processes> -t <top> -o <outfile.csv>"
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:w:m:v:d:q:c:p:t:o:",["begin=","end=","stock=","windows=","market=",
+                                   "value=","hold=","shares=","cash=","procs=","top=","outfile="])
+    except getopt.GetoptError:
+        print s_usage
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print s_usage
+            print "grid values are comma separated lists; every combination is evaluated"
+            print "bollinger_sweep.py -b 2008 -e 2009 -s sp5002012 -w 10,20,30 -m 1.0,1.5 -v -1.5,-2.0 -d 5,10"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-w','--windows'):
+            li_windows = [int(s) for s in arg.split(",")]
+        elif opt in ('-m','--market'):
+            lf_market = [float(s) for s in arg.split(",")]
+        elif opt in ('-v','--value'):
+            lf_value = [float(s) for s in arg.split(",")]
+        elif opt in ('-d','--hold'):
+            li_hold = [int(s) for s in arg.split(",")]
+        elif opt in ('-q','--shares'):
+            i_shares = int(arg)
+        elif opt in ('-c','--cash'):
+            f_cash = float(arg)
+        elif opt in ('-p','--procs'):
+            i_procs = int(arg)
+        elif opt in ('-t','--top'):
+            i_top = int(arg)
+        elif opt in ('-o','--outfile'):
+            outfile = arg
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+
+    if dt_begin > dt_end:
+        print "Error: begining date must be before ending date"
+        sys.exit(2)
+    if min(li_windows) < 2 or min(li_hold) < 1:
+        print "Error: windows must be at least 2 days and hold periods at least 1 day"
+        sys.exit(2)
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"windows=",li_windows,"market=",lf_market, \
+          "value=",lf_value,"hold=",li_hold,"procs=",i_procs
+    return dt_begin,dt_end,stocks,li_windows,lf_market,lf_value,li_hold,i_shares,f_cash,i_procs,i_top,outfile
+
+# read stock database from Yahoo and return data structure; a comma separated
+# list of symbols is used as is, anything else is a symbol list name
+def read_stock_database(dt_begin,dt_end,stocks):
+    print "read_stock_database"
+    dt_end +=dt.timedelta(days=1)
+
+    if "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+    if 'SPY' not in ls_symbols:
+        ls_symbols.append('SPY')
+
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
+
+    return ldt_timestamps, ls_symbols, d_data
+
+# daily fund values of buying i_shares of every event at the close and
+# selling them i_hold days later, starting with f_cash; events must leave
+# i_hold days at the end of the range for the sell
+def fund_values(na_price, na_events, i_hold, i_shares=100, f_cash=100000.0):
+    i_days = na_price.shape[0]
+    na_buy = na_events * float(i_shares)
+    na_trades = na_buy.copy()
+    na_trades[i_hold:] -= na_buy[:i_days - i_hold]
+
+    na_holdings = np.cumsum(na_trades, axis=0)
+    na_cash = f_cash - np.cumsum(np.einsum('ij,ij->i', na_trades, na_price))
+    return na_cash + np.einsum('ij,ij->i', na_holdings, na_price)
+
+# worker state: the shared price matrix, its prefix sums and the trade sizes
+_na_price = None
+_prefix = None
+_i_market = None
+_i_shares = None
+_f_cash = None
+
+def init_worker(raw_price, t_shape, i_market, i_shares, f_cash):
+    global _na_price, _prefix, _i_market, _i_shares, _f_cash
+    _na_price = np.frombuffer(raw_price).reshape(t_shape)
+    _prefix = bb.prefix_sums(_na_price)
+    _i_market = i_market
+    _i_shares = i_shares
+    _f_cash = f_cash
+
+# evaluate one window against a list of (market, value, hold) parameters;
+# returns result rows in LS_COLUMNS order
+def sweep_window(task):
+    i_window, l_params = task
+    i_days = _na_price.shape[0]
+    d_bands = bb.calc_bands(_na_price, i_window, _prefix)
+
+    l_rows = []
+    l_values = []
+    d_events = {}
+    for f_market, f_value, i_hold in l_params:
+        if (f_market, f_value) not in d_events:
+            d_events[(f_market, f_value)] = bb.event_mask(d_bands, _i_market, f_market, f_value, b_strict=True)
+        na_events = d_events[(f_market, f_value)].copy()
+        na_events[max(i_days - i_hold, 0):, :] = False
+        l_values.append(fund_values(_na_price, na_events, i_hold, _i_shares, _f_cash))
+        l_rows.append([i_window, f_market, f_value, i_hold, int(na_events.sum())])
+
+    d_metrics = metrics.calc_metrics(np.column_stack(l_values))
+    for k, row in enumerate(l_rows):
+        row.extend(float(d_metrics[s_field][k]) for s_field in LS_COLUMNS[5:])
+    return l_rows
+
+# tasks of one window and part of the (market, value, hold) grid, split so
+# there are at least i_procs tasks when the grid allows it
+def sweep_tasks(li_windows, lf_market, lf_value, li_hold, i_procs=1):
+    l_params = list(it.product(lf_market, lf_value, li_hold))
+    i_splits = max(1, min(len(l_params), -(-i_procs // len(li_windows))))
+    i_chunk = -(-len(l_params) // i_splits)
+    tasks = []
+    for i_window in li_windows:
+        for i_start in range(0, len(l_params), i_chunk):
+            tasks.append((i_window, l_params[i_start:i_start + i_chunk]))
+    return tasks
+
+# indices ordering the result rows best Sharpe ratio first, NaN last
+def rank_results(table):
+    na_sharpe = np.array([row[5] for row in table], dtype=float)
+    return np.argsort(-np.where(np.isnan(na_sharpe), -np.inf, na_sharpe), kind='mergesort')
+
+# every grid point on a (days x symbols) close price array, fanned out over
+# i_procs processes; returns the result rows ranked by Sharpe ratio
+def sweep_prices(na_price, i_market, li_windows, lf_market, lf_value, li_hold,
+                 i_shares=100, f_cash=100000.0, i_procs=None):
+    na_price = np.ascontiguousarray(na_price, dtype=float)
+    raw_price = mps.RawArray('d', na_price.size)
+    np.frombuffer(raw_price).reshape(na_price.shape)[:] = na_price
+
+    if i_procs is None:
+        i_procs = mp.cpu_count()
+    tasks = sweep_tasks(li_windows, lf_market, lf_value, li_hold, i_procs)
+    t_init = (raw_price, na_price.shape, i_market, i_shares, f_cash)
+    if i_procs > 1:
+        pool = mp.Pool(i_procs, init_worker, t_init)
+        try:
+            table = list(it.chain.from_iterable(pool.imap_unordered(sweep_window, tasks)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        init_worker(*t_init)
+        table = list(it.chain.from_iterable(it.imap(sweep_window, tasks)))
+
+    return [table[k] for k in rank_results(table)]
+
+#open csv file and write out the results table with a header row
+def write_csvfile(outfile,table):
+    f = open(outfile,"wb")
+    try:
+        writer = csv.writer(f,delimiter=',')
+        writer.writerow(LS_COLUMNS)
+        for row in table:
+            writer.writerow(row)
+    finally:
+        f.close()
+
+def print_results(table, i_top=10):
+    print
+    print "top %d of %d parameter sets by Sharpe ratio" % (min(i_top, len(table)), len(table))
+    print "%6s %7s %7s %5s %7s %10s %10s %10s %10s" % ("window", "market", "value", "hold", "trades",
+                                                     "Sharpe", "Cumulative", "Volatility", "Drawdown")
+    for row in table[:i_top]:
+        print "%6d %7.2f %7.2f %5d %7d %10.6f %10.6f %10.6f %10.6f" % tuple(row[:7] + [row[7], row[9]])
+
+def main(argv):
+    print "bollinger_sweep.py main routine\n"
+    dt_begin, dt_end, stocks, li_windows, lf_market, lf_value, li_hold, i_shares, f_cash, i_procs, i_top, outfile = \
+        get_cmdline_options(st.profile_argv(argv))
+    ldt_timestamps, ls_symbols, d_data = read_stock_database(dt_begin, dt_end, stocks)
+    na_price = d_data['close'][ls_symbols].values
+    i_market = ls_symbols.index('SPY')
+
+    i_grid = len(li_windows) * len(lf_market) * len(lf_value) * len(li_hold)
+    t_start = time.time()
+    with st.stage('compute', rows=na_price.size, grid=i_grid, procs=i_procs):
+        table = sweep_prices(na_price, i_market, li_windows, lf_market, lf_value, li_hold, i_shares, f_cash, i_procs)
+    t_elapsed = time.time() - t_start
+    with st.stage('write', rows=len(table)):
+        write_csvfile(outfile, table)
+
+    print_results(table, i_top)
+    print
+    print "%d parameter sets in %0.2f s, results in file: %s" % (i_grid, t_elapsed, outfile)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
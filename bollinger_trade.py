@@ -9,18 +9,22 @@ Lookback windows=20
 '''
 
 import datetime as dt
-import pandas as pd
+import lazyimport
 import numpy as np
 import math
 import copy
-import QSTK.qstkutil.qsdateutil as du
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
-import matplotlib.pyplot as plt
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import bollinger_bands as bb
 import sys, getopt
 import csv
 
+pd = lazyimport.module('pandas')
+tsu = lazyimport.module('QSTK.qstkutil.tsutil')
+ep = lazyimport.module('QSTK.qstkstudy.EventProfiler')
+plt = lazyimport.module('matplotlib.pyplot')
+
 # get command line options
 def get_cmdline_options(argv):    
     begin = [2008, 1, 1]
@@ -35,7 +39,7 @@ def get_cmdline_options(argv):
         print "bollinger.py -b <begin_year> -e <end_year> -s <stocks> -o <outfile.csv>" 
         sys.exit(2)
     for opt, arg in opts:
-        if opt == 'h':
+        if opt == '-h':
             print "bollinger.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv>"
             print "bollinger.py -b 2011 -e 2011 -s AAPL,MSFT -o bollinger_events.csv"
             sys.exit()
@@ -76,50 +80,25 @@ def bollinger_trade(ls_symbols, d_data):
     print "bollinger_trade"
     
     # Finding the event dataframe
-    df_close = d_data['close']
+    df_close = d_data['close'][ls_symbols]
 
     # Time stamps for the event range
     ldt_timestamps = df_close.index
 
+    # buy where SPY >= 1.5 and the symbol crosses below -2.0, leaving
+    # 5 days at the end of the range for the sell
+    d_bands = bb.calc_bands(df_close, i_window=20)
+    i_market = list(df_close.columns).index('SPY')
+    na_events = bb.event_mask(d_bands, i_market, f_market=1.5, f_value=-2.0, b_strict=True)
+    na_events[max(len(ldt_timestamps)-5, 0):, :] = False
+
     trades = []
-    closing_price = {}
-    rolling_mean = {}
-    rolling_std = {}
-    bollinger_upper = {}
-    bollinger_lower = {}
-    bollinger_value = {}
-    
-    for s_sym in ls_symbols:
-        closing_price[s_sym] = df_close[s_sym]
-        rolling_mean[s_sym] = pd.rolling_mean(df_close[s_sym], window=20, min_periods=1)
-        rolling_std[s_sym]  = pd.rolling_std (df_close[s_sym], window=20, min_periods=1)
-        bollinger_upper[s_sym] = rolling_mean[s_sym] + rolling_std[s_sym]
-        bollinger_lower[s_sym] = rolling_mean[s_sym] - rolling_std[s_sym] 
-        bollinger_value[s_sym] = (closing_price[s_sym] - rolling_mean[s_sym]) / rolling_std[s_sym]
- 
-    for i in range(1, len(ldt_timestamps)-5):
-        spy_value = bollinger_value['SPY'].ix[ldt_timestamps[i]]
-        
-        for s_sym in ls_symbols:
-            date = ldt_timestamps[i]
-            price = df_close[s_sym].ix[ldt_timestamps[i]]
-            mean  = rolling_mean[s_sym].ix[ldt_timestamps[i]]
-            std   = rolling_std[s_sym].ix[ldt_timestamps[i]]
-            upper = bollinger_upper[s_sym].ix[ldt_timestamps[i]]
-            lower = bollinger_lower[s_sym].ix[ldt_timestamps[i]]
-            value = bollinger_value[s_sym].ix[ldt_timestamps[i]]
-            value_yest = bollinger_value[s_sym].ix[ldt_timestamps[i-1]]
-                        
-            if spy_value >= 1.5 and value < -2.0 and value_yest >= -2.0:
-                buy_trade = place_stock_order(ldt_timestamps[i],s_sym,"Buy",100)
-                
-                if (i+5) < len(ldt_timestamps):
-                    sell_date = ldt_timestamps[i+5]
-                else:
-                    sell_date = ldt_timestamps[-1]
-                sell_trade= place_stock_order(sell_date,s_sym,"Sell",100)
-                trades.append(buy_trade)
-                trades.append(sell_trade)                
+    na_days, na_syms = np.nonzero(na_events)
+    for i, j in zip(na_days, na_syms):
+        s_sym = ls_symbols[j]
+        sell_date = ldt_timestamps[min(i+5, len(ldt_timestamps)-1)]
+        trades.append(place_stock_order(ldt_timestamps[i],s_sym,"Buy",100))
+        trades.append(place_stock_order(sell_date,s_sym,"Sell",100))
                          
     return trades
 
@@ -128,30 +107,24 @@ def read_stock_database(dt_begin,dt_end,stocks):
     print "read_stock_database"
     dt_end +=dt.timedelta(days=1)
 
-    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
     
-    ls_symbols = dataobj.get_symbols_from_list(stocks)
+    ls_symbols = stockdb.get_symbols_from_list(stocks)
     ls_symbols.append('SPY')
     
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16))        
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)   
-    d_data = dict(zip(ls_keys, ldf_data))
-   
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))        
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
      
     return ldt_timestamps, ls_symbols, d_data   
 
 def main(argv):
     print "bollinger_trade.py main routine\n"
-    dt_begin, dt_end, stocks, outfile = get_cmdline_options(argv)
+    dt_begin, dt_end, stocks, outfile = get_cmdline_options(st.profile_argv(argv))
     ldt_timestamps, ls_symbols, d_data = read_stock_database(dt_begin, dt_end, stocks)
   
-    trades = bollinger_trade(ls_symbols, d_data)
-    write_csvfile(outfile,trades)
+    with st.stage('compute', rows=len(ldt_timestamps) * len(ls_symbols)):
+        trades = bollinger_trade(ls_symbols, d_data)
+    with st.stage('write', rows=len(trades)):
+        write_csvfile(outfile,trades)
         
 
 if __name__ == '__main__':
@@ -0,0 +1,146 @@
+'''
+File:   ci.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: One command line entry point for the scripts
+
+ci.py <command> [options] runs a script's main routine with the options that
+follow the command, the same as running the script itself:
+
+    ci.py simulate -c 1000000 -i orders.csv -o values.csv -e vector
+    ci.py analyze fund values.csv $SPX
+
+Only the module of the command is imported, and the scripts bind pandas,
+matplotlib and QSTK through lazyimport, so ci.py -h and <command> -h load
+none of them and a run loads only what it touches.  ci.py startup times
+ci.py -h, every <command> -h and optionally a small run in fresh processes
+and fails when a median is over its target (-t for -h, -T for the run).
+
+ci.py startup -n 5 -t 0.5 -T 2.0 -r "simulate -c 1000000 -i orders-short.csv -o values-short.csv"
+'''
+
+import importlib
+import subprocess
+import time
+import sys, getopt
+import os
+
+# command -> (module, main takes argv (False: reads sys.argv), description)
+D_COMMANDS = { 'simulate'     : ('marketsim',        True,  "simulate an orders file into daily fund values"),
+               'optimize'     : ('optimize',         True,  "best Sharpe ratio allocation of a few stocks"),
+               'bollinger'    : ('bollinger',        True,  "Bollinger bands of a list of stocks"),
+               'events'       : ('find_events',      True,  "event study of price drop events"),
+               'trade'        : ('bollinger_trade',  True,  "orders from Bollinger band events"),
+               'analyze'      : ('analyze',          False, "performance of a values file against benchmarks"),
+               'pipeline'     : ('pipeline',         True,  "trade, simulate and analyze in one process"),
+               'sweep'        : ('bollinger_sweep',  True,  "Bollinger strategy over a parameter grid"),
+               'ingest'       : ('pricepanel',       True,  "convert the Yahoo database into a price panel"),
+               'significance' : ('significance',     True,  "bootstrap and permutation tests of Sharpe ratios"),
+               'loadtimes'    : ('loadtimes',        True,  "per-symbol read times of a symbol list") }
+LS_COMMANDS = ['simulate', 'optimize', 'bollinger', 'events', 'trade', 'analyze', 'pipeline', 'sweep', 'ingest',
+               'significance', 'loadtimes']
+
+def print_usage():
+    print "ci.py <command> [options]      (ci.py <command> -h for the command's options)"
+    print
+    for s_command in LS_COMMANDS + ['startup']:
+        if s_command == 'startup':
+            print "  %-12s %-19s %s" % (s_command, "", "time ci.py -h, <command> -h and a small run")
+        else:
+            s_module, b_argv, s_text = D_COMMANDS[s_command]
+            print "  %-12s %-19s %s" % (s_command, s_module + ".py", s_text)
+
+# run a command's main routine with the options after the command
+def run_command(s_command, argv):
+    s_module, b_argv, s_text = D_COMMANDS[s_command]
+    module = importlib.import_module(s_module)
+    if b_argv:
+        module.main(argv)
+    else:
+        sys.argv = [s_module + ".py"] + argv
+        module.main()
+
+# get startup command line options
+def get_startup_options(argv):
+    i_repeat = 5
+    f_target = 0.5
+    f_run_target = 2.0
+    s_run = None
+
+    try:
+        opts, args = getopt.getopt(argv,"hn:t:T:r:",["repeat=","target=","run-target=","run="])
+    except getopt.GetoptError:
+        print "ci.py startup -n <repeat> -t <help_target_s> -T <run_target_s> -r <command and options>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "ci.py startup -n <repeat> -t <help_target_s> -T <run_target_s> -r <command and options>"
+            print "ci.py startup -n 5 -t 0.5 -T 2.0 -r \"simulate -c 1000000 -i orders-short.csv -o values-short.csv\""
+            sys.exit()
+        elif opt in ('-n','--repeat'):
+            i_repeat = int(arg)
+        elif opt in ('-t','--target'):
+            f_target = float(arg)
+        elif opt in ('-T','--run-target'):
+            f_run_target = float(arg)
+        elif opt in ('-r','--run'):
+            s_run = arg
+    return i_repeat, f_target, f_run_target, s_run
+
+# wall times of i_repeat fresh runs of ci.py with ls_args, output discarded
+def time_runs(ls_args, i_repeat):
+    ls_cmd = [sys.executable, os.path.abspath(__file__)] + ls_args
+    lf_wall = []
+    devnull = open(os.devnull, "w")
+    try:
+        for i in range(i_repeat):
+            t_start = time.time()
+            i_status = subprocess.call(ls_cmd, stdout=devnull, stderr=devnull)
+            lf_wall.append(time.time() - t_start)
+    finally:
+        devnull.close()
+    return sorted(lf_wall), i_status
+
+def startup(argv):
+    i_repeat, f_target, f_run_target, s_run = get_startup_options(argv)
+
+    l_cases = [(["-h"], f_target)] + [([s_command, "-h"], f_target) for s_command in LS_COMMANDS]
+    if s_run is not None:
+        l_cases.append((s_run.split(), f_run_target))
+
+    i_over = 0
+    print "%-50s %8s %8s %8s %8s" % ("ci.py", "min s", "median s", "max s", "target")
+    for ls_args, f_limit in l_cases:
+        lf_wall, i_status = time_runs(ls_args, i_repeat)
+        f_median = lf_wall[len(lf_wall) // 2]
+        s_flag = ""
+        if f_median > f_limit:
+            s_flag = "  OVER"
+            i_over += 1
+        if i_status != 0:
+            s_flag += "  exit status %d" % (i_status)
+        print "%-50s %8.3f %8.3f %8.3f %8.2f%s" % (" ".join(ls_args)[:50], lf_wall[0], f_median, lf_wall[-1],
+                                                  f_limit, s_flag)
+
+    if i_over > 0:
+        print "%d of %d over their target" % (i_over, len(l_cases))
+        sys.exit(1)
+    print "all under their target"
+
+def main(argv):
+    if len(argv) == 0 or argv[0] in ('-h', '--help'):
+        print_usage()
+        sys.exit(0 if len(argv) > 0 else 2)
+    s_command = argv[0]
+    if s_command == 'startup':
+        startup(argv[1:])
+    elif s_command in D_COMMANDS:
+        run_command(s_command, argv[1:])
+    else:
+        print "ci.py: unknown command", s_command
+        print_usage()
+        sys.exit(2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,90 @@
+'''
+File:   event_engine.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Whole-frame event detection
+
+An event predicate is a boolean (days x symbols) mask computed from the price
+array and a copy of it shifted by one day, so every symbol and day is tested
+at once.  Day 0 has no yesterday and never has an event.  Events are listed
+with np.nonzero in symbol-major order, the order of the old per-symbol loops,
+and paired exit orders are clamped to the last day of the range.
+'''
+
+import lazyimport
+import numpy as np
+import orderstore
+import tradingcalendar as tc
+
+pd = lazyimport.module('pandas')
+
+# previous day's values, NaN on day 0
+def yesterday(na_price):
+    na_yest = np.empty_like(na_price, dtype=float)
+    na_yest[0, :] = np.nan
+    na_yest[1:, :] = na_price[:-1, :]
+    return na_yest
+
+# daily returns, NaN on day 0
+def daily_returns(na_price):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return na_price / yesterday(na_price) - 1.0
+
+# price closes below f_level after closing at or above it the day before
+def cross_below(na_price, f_level):
+    with np.errstate(invalid='ignore'):
+        return (na_price < f_level) & (yesterday(na_price) >= f_level)
+
+# symbol is down at least f_symbol while the market is up at least f_market,
+# e.g. down more than 3% on a day the market is up more than 2%
+def return_vs_market(na_price, i_market, f_symbol=-0.03, f_market=0.02):
+    na_rets = daily_returns(na_price)
+    with np.errstate(invalid='ignore'):
+        return (na_rets <= f_symbol) & (na_rets[:, i_market][:, np.newaxis] >= f_market)
+
+# (days, symbols) index arrays of the events, symbol by symbol
+def event_list(na_mask):
+    na_syms, na_days = np.nonzero(na_mask.T)
+    return na_days, na_syms
+
+# event DataFrame for EventProfiler: 1 on events, NaN elsewhere
+def event_frame(df_close, na_mask):
+    return pd.DataFrame(np.where(na_mask, 1.0, np.NAN), index=df_close.index, columns=df_close.columns)
+
+# day i_hold days after each event, clamped to the last day
+def exit_days(na_days, i_days, i_hold=5):
+    return np.minimum(na_days + i_hold, i_days - 1)
+
+# buy i_shares on every event and sell them i_hold days later, as
+# [year, month, day, symbol, order, shares] rows with each sell after its buy
+def paired_orders(ldt_timestamps, ls_symbols, na_mask, i_shares=100, i_hold=5):
+    na_days, na_syms = event_list(na_mask)
+    na_exit = exit_days(na_days, len(ldt_timestamps), i_hold)
+
+    na_ymd = np.array([[t.year, t.month, t.day] for t in ldt_timestamps], dtype=int).reshape(-1, 3)
+    ll_buy = na_ymd[na_days].tolist()
+    ll_sell = na_ymd[na_exit].tolist()
+
+    orders = []
+    for l_buy, l_sell, j in zip(ll_buy, ll_sell, na_syms.tolist()):
+        orders.append(l_buy + [ls_symbols[j], "Buy", i_shares])
+        orders.append(l_sell + [ls_symbols[j], "Sell", i_shares])
+    return orders
+
+# the orders of paired_orders() for the events (na_days, na_syms) as a typed
+# orderstore table, without string rows: each event's Buy then its Sell, in
+# event order, stable sorted by day the way orderstore reads a csv file.
+# sym indexes the symbol list the events came from.
+def order_table(ldt_timestamps, na_days, na_syms, i_shares=100, i_hold=5):
+    na_day_key = tc.day_index(ldt_timestamps).na_days
+    na_exit = exit_days(na_days, len(ldt_timestamps), i_hold)
+
+    na_orders = np.zeros(2 * len(na_days), dtype=orderstore.ORDER_DTYPE)
+    na_orders['day'][0::2] = na_day_key[na_days]
+    na_orders['day'][1::2] = na_day_key[na_exit]
+    na_orders['sym'][0::2] = na_syms
+    na_orders['sym'][1::2] = na_syms
+    na_orders['buy'][0::2] = True
+    na_orders['qty'] = i_shares
+    return na_orders[np.argsort(na_orders['day'], kind='mergesort')]
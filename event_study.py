@@ -0,0 +1,160 @@
+'''
+File:   event_study.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Event study over all events at once
+
+Replaces the QSTK eventprofiler loop.  Daily returns are computed for the
+whole close price array (minus the market's return for a market neutral
+study), a strided view gives every (i_lookback + 1 + i_lookforward) day
+window of every symbol without copying, and the windows of all events are
+gathered with one fancy index.  Each window is compounded and normalized to
+1.0 on the event day; the mean and std curves are returned as arrays and
+can be saved as CSV or NPY.  Bootstrap error bars resample the events in
+batches of index matrices.  Plotting is an optional last step.
+'''
+
+import numpy as np
+import csv
+
+# daily returns of every column, 0 on day 0 like tsu.returnize0; with
+# i_market the market's return is subtracted from every column
+def daily_returns(na_close, i_market=None):
+    na_rets = np.zeros(na_close.shape)
+    na_rets[1:, :] = na_close[1:, :] / na_close[:-1, :] - 1.0
+    if i_market is not None:
+        na_rets = na_rets - na_rets[:, i_market][:, np.newaxis]
+    return na_rets
+
+# read-only (symbols x windows x i_length) view of every i_length day window
+# of every column of na_rets
+def strided_windows(na_rets, i_length):
+    na_cols = np.ascontiguousarray(na_rets.T)
+    i_syms, i_days = na_cols.shape
+    i_windows = max(i_days - i_length + 1, 0)
+    i_row, i_day = na_cols.strides
+    na_view = np.lib.stride_tricks.as_strided(na_cols, shape=(i_syms, i_windows, i_length),
+                                              strides=(i_row, i_day, i_day))
+    na_view.flags.writeable = False
+    return na_view
+
+# (events x window) returns around each event; events in the first
+# i_lookback or last i_lookforward days are dropped, like eventprofiler
+def event_windows(na_rets, na_days, na_syms, i_lookback=20, i_lookforward=20):
+    i_days = na_rets.shape[0]
+    na_keep = (na_days >= i_lookback) & (na_days < i_days - i_lookforward)
+    na_view = strided_windows(na_rets, i_lookback + 1 + i_lookforward)
+    return na_view[na_syms[na_keep], na_days[na_keep] - i_lookback]
+
+# compounded returns of each window normalized to 1.0 on the event day
+def event_curves(na_windows, i_lookback=20):
+    na_curves = np.cumprod(na_windows + 1.0, axis=1)
+    return na_curves / na_curves[:, i_lookback][:, np.newaxis]
+
+# bootstrap the mean curve: i_samples resamples of the events with
+# replacement, i_batch resamples per index matrix.  Returns the std of the
+# resampled means and the f_conf percentile interval.
+def bootstrap_errors(na_curves, i_samples=1000, f_conf=0.95, i_seed=None, i_batch=None):
+    i_events, i_length = na_curves.shape
+    if i_batch is None:
+        i_batch = max(1, int(4e6 // max(i_events * i_length, 1)))
+    rng = np.random.RandomState(i_seed)
+
+    l_means = []
+    for i_start in range(0, i_samples, i_batch):
+        i_take = min(i_batch, i_samples - i_start)
+        na_index = rng.randint(0, i_events, size=(i_take, i_events))
+        l_means.append(na_curves[na_index].mean(axis=1))
+    na_means = np.vstack(l_means)
+
+    f_tail = (1.0 - f_conf) / 2.0 * 100.0
+    na_lower, na_upper = np.percentile(na_means, [f_tail, 100.0 - f_tail], axis=0)
+    return na_means.std(axis=0), na_lower, na_upper
+
+# event study of an event mask or NaN/1 event DataFrame against the close
+# prices in d_data.  Returns a dictionary of arrays over the window days:
+# day, mean, std and, with i_bootstrap resamples, boot_std, boot_lower and
+# boot_upper; count is the number of events used.
+def event_study(events, d_data, i_lookback=20, i_lookforward=20, b_market_neutral=True,
+                s_market_sym='SPY', i_bootstrap=0, f_conf=0.95, i_seed=None):
+    df_close = d_data['close']
+    ls_columns = list(df_close.columns)
+    if hasattr(events, 'columns'):
+        df_close = df_close[list(events.columns)]
+        ls_columns = list(events.columns)
+        na_mask = events.values == 1
+    else:
+        na_mask = np.asarray(events, dtype=bool)
+    na_close = df_close.values
+
+    i_market = None
+    if b_market_neutral:
+        i_market = ls_columns.index(s_market_sym)
+        na_mask = na_mask.copy()
+        na_mask[:, i_market] = False
+    na_rets = daily_returns(na_close, i_market)
+
+    # events symbol by symbol, in eventprofiler's order
+    na_syms, na_days = np.nonzero(na_mask.T)
+    na_windows = event_windows(na_rets, na_days, na_syms, i_lookback, i_lookforward)
+    if len(na_windows) == 0:
+        raise ValueError("Zero events in the event matrix")
+    na_curves = event_curves(na_windows, i_lookback)
+
+    d_study = { 'day'   : np.arange(-i_lookback, i_lookforward + 1),
+                'mean'  : na_curves.mean(axis=0),
+                'std'   : na_curves.std(axis=0),
+                'count' : len(na_curves) }
+    if i_bootstrap > 0:
+        d_study['boot_std'], d_study['boot_lower'], d_study['boot_upper'] = \
+            bootstrap_errors(na_curves, i_bootstrap, f_conf, i_seed)
+    return d_study
+
+def study_fields(d_study):
+    return [s_field for s_field in ['day', 'mean', 'std', 'boot_std', 'boot_lower', 'boot_upper'] if s_field in d_study]
+
+# save the study curves as a CSV file with a header row, or as a
+# (days x fields) .npy array in the same column order
+def save_study(d_study, s_filename):
+    ls_fields = study_fields(d_study)
+    na_table = np.column_stack([d_study[s_field] for s_field in ls_fields])
+    if s_filename.endswith(".npy"):
+        np.save(s_filename, na_table)
+        return
+    f = open(s_filename,"wb")
+    try:
+        writer = csv.writer(f,delimiter=',')
+        writer.writerow(ls_fields)
+        for row in na_table.tolist():
+            writer.writerow([int(row[0])] + row[1:])
+    finally:
+        f.close()
+
+# the eventprofiler chart; error bars are the bootstrap interval when the
+# study has one, otherwise the std of the events
+def plot_study(d_study, s_filename, b_market_neutral=True, b_errorbars=True):
+    import matplotlib.pyplot as plt
+
+    li_time = d_study['day']
+    na_mean = d_study['mean']
+    i_lookback = int(-li_time[0])
+
+    plt.clf()
+    plt.axhline(y=1.0, xmin=li_time[0], xmax=li_time[-1], color='k')
+    if b_errorbars:
+        if 'boot_lower' in d_study:
+            na_yerr = [na_mean[i_lookback:] - d_study['boot_lower'][i_lookback:],
+                       d_study['boot_upper'][i_lookback:] - na_mean[i_lookback:]]
+        else:
+            na_yerr = d_study['std'][i_lookback:]
+        plt.errorbar(li_time[i_lookback:], na_mean[i_lookback:], yerr=na_yerr, ecolor='#AAAAFF', alpha=0.1)
+    plt.plot(li_time, na_mean, linewidth=3, label='mean', color='b')
+    plt.xlim(li_time[0] - 1, li_time[-1] + 1)
+    if b_market_neutral:
+        plt.title('Market Relative mean return of ' + str(d_study['count']) + ' events')
+    else:
+        plt.title('Mean return of ' + str(d_study['count']) + ' events')
+    plt.xlabel('Days')
+    plt.ylabel('Cumulative Returns')
+    plt.savefig(s_filename, format='pdf')
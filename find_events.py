@@ -6,15 +6,12 @@ Date:  10/1/2014
 Description: Find Financial Events
 '''
 
-import pandas as pd
-import numpy as np
-import math
-import copy
-import QSTK.qstkutil.qsdateutil as du
 import datetime as dt
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import event_engine as ee
+import event_study as es
 import sys, getopt
 import csv
 
@@ -39,17 +36,19 @@ def get_cmdline_options(argv):
     begin = [2012, 1, 1]
     end   = [2013, 12, 31]
     stocks = 'sp5002012'
+    b_plot = True
+    i_seed = 0
     outfile = "events"
     
     try:
-        opts, args = getopt.getopt(argv,"hb:e:s:o:",["begin=","end=","stock=","ofile="])
+        opts, args = getopt.getopt(argv,"hb:e:s:o:r:",["begin=","end=","stock=","ofile=","seed=","noplot"])
         
     except getopt.GetoptError:
-        print "find_events.py -b <begin_year> -e <end_year> -s <stocks> -o <outfile.csv>" 
+        print "find_events.py -b <begin_year> -e <end_year> -s <stocks> -o <outfile.csv> -r <seed> [--noplot]" 
         sys.exit(2)
     for opt, arg in opts:
-        if opt == 'h':
-            print "find_events.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv>"
+        if opt == '-h':
+            print "find_events.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv> -r <seed> [--noplot]"
             print "find_events.py -b 2011 -e 2011 -s sp5002012 -o find_events.csv"
             sys.exit()
         elif opt in ('-b','--begin'):
@@ -61,6 +60,10 @@ def get_cmdline_options(argv):
             stocks = stocks.split(",")
         elif opt in ('-o','--ofile'):
             outfile = arg
+        elif opt in ('-r','--seed'):
+            i_seed = int(arg)
+        elif opt == '--noplot':
+            b_plot = False
     
     dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2])) 
     dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
@@ -68,8 +71,8 @@ def get_cmdline_options(argv):
     if dt_begin > dt_end:
         print "Error: begining date must be before ending date"
         sys.exit(2)
-    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks," outfile=",outfile
-    return dt_begin,dt_end,stocks,outfile
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks," outfile=",outfile,"seed=",i_seed
+    return dt_begin,dt_end,stocks,outfile,b_plot,i_seed
 
 #open csv file and write out all trades
 def write_csvfile(outfile,data):
@@ -83,35 +86,21 @@ def write_csvfile(outfile,data):
         
 def find_events(ls_symbols, d_data):
     print "find_events"
-    df_close = d_data['actual_close']
-    ts_market = df_close['SPY']
-
-    # Creating an empty dataframe
-    df_events = copy.deepcopy(df_close)
-    df_events = df_events * np.NAN
+    df_close = d_data['actual_close'][ls_symbols]
 
     # Time stamps for the event range
     ldt_timestamps = df_close.index
-    events = []
 
-    for s_sym in ls_symbols:
-        for i in range(1, len(ldt_timestamps)):
-            # Calculating the returns for this timestamp
-            f_symprice_today = df_close[s_sym].ix[ldt_timestamps[i]]
-            f_symprice_yest = df_close[s_sym].ix[ldt_timestamps[i - 1]]
-            f_marketprice_today = ts_market.ix[ldt_timestamps[i]]
-            f_marketprice_yest = ts_market.ix[ldt_timestamps[i - 1]]
-            f_symreturn_today = (f_symprice_today / f_symprice_yest) - 1
-            f_marketreturn_today = (f_marketprice_today / f_marketprice_yest) - 1
+    # Event is found if the price closes below $20 after closing at or above
+    # it the day before; ee.return_vs_market() finds a symbol down more than
+    # 3% while the market is up more than 2%
+    na_price = df_close.values
+    na_mask = ee.cross_below(na_price, 20.00)
+    df_events = ee.event_frame(df_close, na_mask)
 
-            # Event is found if the symbol is down more then 3% while the
-            # market is up more then 2%
-            #if f_symreturn_today <= -0.03 and f_marketreturn_today >= 0.02:
-            #    df_events[s_sym].ix[ldt_timestamps[i]] = 1
-            if f_symprice_today < 20.00 and f_symprice_yest >= 20.00:
-            #if (f_symprice_today / f_symprice_yest ) < 0.80:
-                events.append([ldt_timestamps[i],s_sym,f_symprice_today])
-                df_events[s_sym].ix[ldt_timestamps[i]] = 1
+    na_days, na_syms = ee.event_list(na_mask)
+    events = [[ldt_timestamps[i], ls_symbols[j], f_price]
+              for i, j, f_price in zip(na_days, na_syms, na_price[na_days, na_syms].tolist())]
 
     return df_events, events
 
@@ -119,36 +108,40 @@ def find_events(ls_symbols, d_data):
 def read_stock_database(dt_begin, dt_end, stocks):
     print "read_stock_database"
 
-    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16)) 
-    ls_symbols = dataobj.get_symbols_from_list(stocks)
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16)) 
+    ls_symbols = stockdb.get_symbols_from_list(stocks)
     ls_symbols.append('SPY')
     
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)   
-    d_data = dict(zip(ls_keys, ldf_data))
-   
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    # events use the actual close, the event study the adjusted close
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols).load(['actual_close', 'close'])
      
     return ldt_timestamps, ls_symbols, d_data   
    
 def main(argv):
     print "find_events.py main routine\n"
     
-    dt_begin, dt_end, stocks, outfile = get_cmdline_options(argv)
+    dt_begin, dt_end, stocks, outfile, b_plot, i_seed = get_cmdline_options(st.profile_argv(argv))
     ldt_timestamps, ls_symbols, d_data = read_stock_database(dt_begin, dt_end, stocks)   
 
-    df_events, events = find_events(ls_symbols, d_data)
-    write_csvfile(outfile,events)
+    with st.stage('compute', rows=len(ldt_timestamps) * len(ls_symbols)) as span:
+        df_events, events = find_events(ls_symbols, d_data)
+        span['events'] = len(events)
+    with st.stage('write', rows=len(events)):
+        write_csvfile(outfile,events)
     
-    studyfile = outfile + ".pdf"
-    print "creating study in file:",studyfile
-    ep.eventprofiler(df_events, d_data, i_lookback=20, i_lookforward=20,
-                s_filename=studyfile, b_market_neutral=True, b_errorbars=True,
-                s_market_sym='SPY')
+    # market neutral event study with bootstrap error bars, saved as csv
+    with st.stage('event profile', rows=len(events)):
+        d_study = es.event_study(df_events, d_data, i_lookback=20, i_lookforward=20,
+                    b_market_neutral=True, s_market_sym='SPY', i_bootstrap=1000, i_seed=i_seed)
+    with st.stage('write', rows=len(d_study['day'])):
+        es.save_study(d_study, outfile + "_study.csv")
+    print "event study of %d events in file: %s" % (d_study['count'], outfile + "_study.csv")
+
+    if b_plot:
+        studyfile = outfile + ".pdf"
+        print "creating study in file:",studyfile
+        with st.stage('plot'):
+            es.plot_study(d_study, studyfile, b_market_neutral=True, b_errorbars=True)
 
 if __name__ == '__main__':
     main(sys.argv[1:])
\ No newline at end of file
@@ -12,9 +12,10 @@ Created on January, 24, 2013
 '''
 
 # QSTK Imports
-import QSTK.qstkutil.qsdateutil as du
+import tradingcalendar as tc
 import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkutil.DataAccess as da
+import stockdb
+import stagetimer as st
 
 # Third Party Imports
 import datetime as dt
@@ -22,6 +23,7 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import math
+import sys
 
 print "Pandas Version", pd.__version__
 
@@ -72,24 +74,11 @@ def simulate(startdate, enddate, ls_symbols, allocations):
     dt_timeofday = dt.timedelta(hours=16)    
 
     # Start and End date of the charts
-    ldt_timestamps = du.getNYSEdays(dt_start, dt_end, dt_timeofday)
+    ldt_timestamps = tc.nyse_days(dt_start, dt_end, dt_timeofday)
    
-    # Creating an object of the dataaccess class with Yahoo as the source.
-    c_dataobj = da.DataAccess('Yahoo')
-    
-    # Keys to be read from the data, it is good to read everything in one go.
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']    
-    
-    # Reading the data, now d_data is a dictionary with the keys above.
-    # Timestamps and symbols are the ones that were specified before.
-    ldf_data = c_dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)
-    d_data = dict(zip(ls_keys, ldf_data))    
-   
-    # Filling the data for NAN
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)
+    # Reading the data, now d_data is a dictionary with the keys in stockdb.LS_KEYS.
+    # Repeated calls for the same symbols and dates are served from the cache.
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
 
     # Getting the numpy ndarray of close prices.
     na_price = d_data['close'].values  
@@ -133,8 +122,11 @@ def simulate(startdate, enddate, ls_symbols, allocations):
     
     
 def main():
-    simulate([2011, 1, 1], [2011, 12, 31], ["AAPL", "GLD", "GOOG", "XOM"], [ 0.4, 0.4, 0.0, 0.2 ])
-    simulate([2010, 1, 1], [2010, 12, 31], ["AXP","HPQ","IBM","HNZ"], [ 0.0, 0.0, 0.0, 1.0 ])
+    sys.argv = sys.argv[:1] + st.profile_argv(sys.argv[1:])
+    with st.stage('compute', symbols=4):
+        simulate([2011, 1, 1], [2011, 12, 31], ["AAPL", "GLD", "GOOG", "XOM"], [ 0.4, 0.4, 0.0, 0.2 ])
+    with st.stage('compute', symbols=4):
+        simulate([2010, 1, 1], [2010, 12, 31], ["AXP","HPQ","IBM","HNZ"], [ 0.0, 0.0, 0.0, 1.0 ])
 
     
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+'''
+File:   lazyimport.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Modules imported on first attribute access
+
+pandas, matplotlib.pyplot and the QSTK modules take most of a script's
+startup (QSTK's qsdateutil alone is about 0.8 s), yet -h, a bad option or a
+run that never plots does not need them.  A script binds them with
+
+    pd = lazyimport.module('pandas')
+    du = lazyimport.module('QSTK.qstkutil.qsdateutil')
+
+instead of import ... as ...; the real import happens the first time an
+attribute is looked up (pd.DataFrame) and is then cached, so later lookups
+cost one getattr.  The import time is recorded as an 'import' stage of
+stagetimer, so --profile shows what a run paid for its imports.
+'''
+
+import importlib
+import types
+import stagetimer as st
+
+class LazyModule(types.ModuleType):
+    def __init__(self, s_name):
+        types.ModuleType.__init__(self, s_name)
+        self.__dict__['_module'] = None
+
+    # the real module, imported the first time
+    def load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with st.stage('import', module=self.__name__):
+                module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return module
+
+    def loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, s_attr):
+        return getattr(self.load(), s_attr)
+
+    def __setattr__(self, s_attr, value):
+        setattr(self.load(), s_attr, value)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def __repr__(self):
+        if self.loaded():
+            return repr(self.__dict__['_module'])
+        return "<lazy module '%s'>" % (self.__name__)
+
+# one LazyModule per name, so every script shares the same proxy
+_modules = {}
+
+def module(s_name):
+    if s_name not in _modules:
+        _modules[s_name] = LazyModule(s_name)
+    return _modules[s_name]
@@ -0,0 +1,95 @@
+'''
+File:   loadtimes.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Per-symbol read times of the stock database
+
+Reads the csv files of a symbol list with stockdb.read_files(), the loader
+behind stockdb.get_data(), and prints the total time, the slowest files and
+every file that is missing or could not be parsed, so slow or corrupt files
+are easy to spot.  With --profile the trace shows every file as a 'read
+symbol' event on the thread that read it.
+
+loadtimes.py -s sp5002012 -b 2008 -e 2009 -t 8 -n 10
+'''
+
+import datetime as dt
+import numpy as np
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import time
+import sys, getopt
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+    i_threads = stockdb.LOAD_THREADS
+    i_top = 10
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:t:n:",["begin=","end=","stock=","threads=","top="])
+    except getopt.GetoptError:
+        print "loadtimes.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -t <threads> -n <top>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "loadtimes.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -t <threads> -n <top>"
+            print "loadtimes.py -s sp5002012 -b 2008 -e 2009 -t 8 -n 10"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-t','--threads'):
+            i_threads = int(arg)
+        elif opt in ('-n','--top'):
+            i_top = int(arg)
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"threads=",i_threads,"top=",i_top
+    return dt_begin,dt_end,stocks,i_threads,i_top
+
+def print_report(l_report, f_elapsed, i_threads, i_top=10):
+    lf_seconds = np.array([row[1] for row in l_report])
+    print
+    print "%d files, %d rows in %0.3f s with %d threads (file read times: median %0.1f ms, max %0.1f ms)" % \
+          (len(l_report), sum(row[2] for row in l_report), f_elapsed, i_threads,
+           np.median(lf_seconds) * 1000.0, lf_seconds.max() * 1000.0)
+
+    print
+    print "slowest %d files" % (min(i_top, len(l_report)))
+    print "%-10s %10s %8s  %s" % ("symbol", "ms", "rows", "status")
+    for s_sym, f_seconds, i_rows, s_status in sorted(l_report, key=lambda row: -row[1])[:i_top]:
+        print "%-10s %10.1f %8d  %s" % (s_sym, f_seconds * 1000.0, i_rows, s_status)
+
+    l_failed = [row for row in l_report if row[3] != 'ok']
+    if l_failed:
+        print
+        print "%d files missing or unreadable" % (len(l_failed))
+        for s_sym, f_seconds, i_rows, s_status in l_failed:
+            print "%-10s %10.1f %8d  %s" % (s_sym, f_seconds * 1000.0, i_rows, s_status)
+
+def main(argv):
+    print "loadtimes.py main routine\n"
+    dt_begin, dt_end, stocks, i_threads, i_top = get_cmdline_options(st.profile_argv(argv))
+
+    if "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end + dt.timedelta(days=1), dt.timedelta(hours=16))
+
+    t_start = time.time()
+    with st.stage('load', symbols=len(ls_symbols), threads=i_threads):
+        stockdb.read_files(stockdb.get_dataobj(), ldt_timestamps, ls_symbols, stockdb.LS_KEYS, i_threads)
+    print_report(stockdb.load_report(), time.time() - t_start, i_threads, i_top)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
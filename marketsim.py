@@ -6,33 +6,44 @@ Date:   10/15/2014
 Description: Given cash, orders in a csv file, generates daily portfolio values
 '''
 
-import pandas as pd
+import lazyimport
 import numpy as np
 import math
 import copy
-import QSTK.qstkutil.qsdateutil as du
 import datetime as dt
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import metrics
+import orderstream
+import orderstore
+import tempfile
+import os
 import sys, getopt
 import csv
 
+pd = lazyimport.module('pandas')
+tsu = lazyimport.module('QSTK.qstkutil.tsutil')
+ep = lazyimport.module('QSTK.qstkstudy.EventProfiler')
+
 # get command line options
 def get_cmdline_options(argv):
     cash = float(100000.00)
     infile  = "bollinger_trade.csv"
     outfile = "bollinger_values.csv"
+    engine  = "loop"
     
     try:
-        opts, args = getopt.getopt(argv,"hc:i:o:",["cash=","infile=","outfile="])        
+        opts, args = getopt.getopt(argv,"hc:i:o:e:",["cash=","infile=","outfile=","engine="])        
     except getopt.GetoptError:
-        print "marketsim.py -c <cash> -i <infile> -o <outfile.csv>" 
+        print "marketsim.py -c <cash> -i <infile> -o <outfile.csv> -e <loop|vector|stream|batch>" 
         sys.exit(2)
     for opt, arg in opts:
-        if opt == 'h':
-            print "marketsim.py -c <cash> -i <infile> -o <outfile.csv>"
-            print "marketsim.py -c 500000 -i orders.csv -o values.csv"
+        if opt == '-h':
+            print "marketsim.py -c <cash> -i <infile> -o <outfile.csv> -e <loop|vector|stream|batch>"
+            print "marketsim.py -c 500000 -i orders.csv -o values.csv -e vector"
+            print "marketsim.py -c 500000 -i big_orders.csv -o values.csv -e stream"
+            print "marketsim.py -c 500000 -i orders.csv,orders2.csv -o values.csv -e batch"
             sys.exit()
         elif opt in ('-c','--cash'):
             cash = float(arg)
@@ -40,9 +51,14 @@ def get_cmdline_options(argv):
             infile = arg
         elif opt in ('-o','--ofile'):
             outfile = arg
-            
-    print "cmdline options: cash=%d infile=%s outfile=%s" % (cash,infile,outfile)
-    return cash,infile,outfile   
+        elif opt in ('-e','--engine'):
+            engine = arg
+    
+    if engine not in ('loop','vector','stream','batch'):
+        print "Error: engine must be loop, vector, stream or batch"
+        sys.exit(2)
+    print "cmdline options: cash=%d infile=%s outfile=%s engine=%s" % (cash,infile,outfile,engine)
+    return cash,infile,outfile,engine
 
 #open csv file and read in all stock orders in a numpy array
 def read_csvfile(infile):
@@ -74,44 +90,35 @@ def read_stock_database(begin,end,ls_symbols):
     dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
     dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2])) + dt.timedelta(days=1)
 
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16))    
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))    
     
-    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)   
-    d_data = dict(zip(ls_keys, ldf_data))
-   
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
      
     return ldt_timestamps, d_data   
 
-# execute stock order
-def execute_order(portfolio,df_close,i,timestamp,np_orders):    
+# execute the stock orders of trading day i
+def execute_order(portfolio,df_close,i,np_orders):    
     for order in np_orders:
         order_date  = dt.date(int(order[0]),int(order[1]),int(order[2]))
         order_stock = str(order[3]).upper()
         order_type  = str(order[4]).upper()
         order_quantity = float(order[5])
-        
-        if timestamp.date() == order_date:
-            order_price = df_close[order_stock].ix[df_close.index[i]]
-            if order_type == "BUY":               
-                portfolio["cash"] -= float(order_quantity * order_price)
-                try:
-                    portfolio[order_stock] += order_quantity
-                except KeyError:
-                    portfolio[order_stock] = order_quantity
-                print "%s Buying %.0f shares of %s at %0.2f | cash=%0.2f" % (order_date,order_quantity,order_stock,order_price,portfolio["cash"])
-            elif order_type == "SELL":
-                portfolio["cash"] += float(order_quantity * order_price)
-                try:
-                    portfolio[order_stock] -= order_quantity
-                except KeyError:
-                    portfolio[order_stock] = -order_quantity
-                print "%s Selling %.0f shares of %s at %0.2f | cash=%0.2f" % (order_date,order_quantity,order_stock,order_price,portfolio["cash"])
+
+        order_price = df_close[order_stock].ix[df_close.index[i]]
+        if order_type == "BUY":               
+            portfolio["cash"] -= float(order_quantity * order_price)
+            try:
+                portfolio[order_stock] += order_quantity
+            except KeyError:
+                portfolio[order_stock] = order_quantity
+            print "%s Buying %.0f shares of %s at %0.2f | cash=%0.2f" % (order_date,order_quantity,order_stock,order_price,portfolio["cash"])
+        elif order_type == "SELL":
+            portfolio["cash"] += float(order_quantity * order_price)
+            try:
+                portfolio[order_stock] -= order_quantity
+            except KeyError:
+                portfolio[order_stock] = -order_quantity
+            print "%s Selling %.0f shares of %s at %0.2f | cash=%0.2f" % (order_date,order_quantity,order_stock,order_price,portfolio["cash"])
     return portfolio
 
 # calculate daily fund value and return it
@@ -137,62 +144,235 @@ def process_stock_orders(ls_symbols, ldt_timestamps, d_data, cash, np_orders):
     #df_close = d_data['actual_close']
     df_close = d_data['close']    # close = adjusted close
 
+    # orders grouped by trading day row, in file order; orders on
+    # non-trading days have row -1 and are never executed
+    na_rows = order_rows(ldt_timestamps, np_orders)
+    l_day_orders = [[] for i in range(len(df_close.index))]
+    for k, i_row in enumerate(na_rows.tolist()):
+        if i_row >= 0:
+            l_day_orders[i_row].append(np_orders[k])
+
     # Time stamps for the event range
     for i in range(0, len(df_close.index)):
-        portfolio = execute_order(portfolio,df_close,i,ldt_timestamps[i],np_orders)                   
+        portfolio = execute_order(portfolio,df_close,i,l_day_orders[i])                   
         row = calculate_daily_fund_value(portfolio,df_close,i,ldt_timestamps[i])
         fund.append(row)
     return portfolio,fund
 
-# normalize prices
-def normalize_data(prices):
-    return prices / prices[0, :]
+# convert a string column of the orders array, parsing each distinct value once
+def parse_column(na_column, dtype):
+    na_values, na_inverse = np.unique(na_column, return_inverse=True)
+    return na_values.astype(dtype)[na_inverse]
+
+# map order dates onto trading day rows through the calendar index, -1 for
+# orders on non-trading days
+def order_rows(ldt_timestamps, np_orders):
+    if len(np_orders) == 0:
+        return np.zeros(0, dtype=np.int64)
+    na_order_day = tc.ymd_days(parse_column(np_orders[:,0], int), parse_column(np_orders[:,1], int),
+                               parse_column(np_orders[:,2], int))
+    return tc.day_index(ldt_timestamps).rows(na_order_day)
+
+# parse orders into arrays of trading day row, symbol column and signed
+# share quantity, dropping orders that fall on non-trading days
+def parse_orders(ldt_timestamps, ls_columns, np_orders):
+    if len(np_orders) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0), []
+
+    na_rows = order_rows(ldt_timestamps, np_orders)
+
+    # order types and symbols are parsed once per distinct string, not once per order
+    ls_types, na_type = np.unique(np_orders[:,4], return_inverse=True)
+    d_side = { "BUY" : 1.0, "SELL" : -1.0 }
+    na_side = np.array([d_side.get(str(s_type).upper(), 0.0) for s_type in ls_types])[na_type]
+    na_valid = (na_rows >= 0) & (na_side != 0)
+
+    ls_stocks, na_stock = np.unique(np_orders[na_valid,3], return_inverse=True)
+    ls_stocks = [str(s_sym).upper() for s_sym in ls_stocks]
+    d_column = dict((s_sym, i) for i, s_sym in enumerate(ls_columns))
+    na_column = np.array([d_column[s_sym] for s_sym in ls_stocks], dtype=int)
+
+    # keep orders in date order, same day orders in file order
+    na_quantity = na_side[na_valid] * parse_column(np_orders[na_valid,5], float)
+    na_rows = na_rows[na_valid]
+    na_order = np.argsort(na_rows, kind='mergesort')
+    ls_traded = sorted(set(ls_stocks))
+    return na_rows[na_order], na_column[na_stock][na_order], na_quantity[na_order], ls_traded
+
+# trading day row, symbol column and signed share quantity from a typed
+# orderstore table, the same as parse_orders() without parsing strings
+def table_orders(ldt_timestamps, ls_columns, na_orders, ls_names):
+    if len(na_orders) == 0 or len(ldt_timestamps) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0), []
+
+    na_rows = tc.day_index(ldt_timestamps).rows(na_orders['day'])
+    na_valid = na_rows >= 0
 
-# given an array of prices, compute daily return for all stocks
-def daily_return(prices):
-    return tsu.returnize0(prices)
+    # only the names the orders reference; a symbol without a price column is
+    # a KeyError, as in parse_orders()
+    na_names, na_stock = np.unique(na_orders['sym'][na_valid], return_inverse=True)
+    ls_stocks = [str(ls_names[i]).upper() for i in na_names]
+    d_column = dict((s_sym, i) for i, s_sym in enumerate(ls_columns))
+    na_column = np.array([d_column[s_sym] for s_sym in ls_stocks], dtype=int)
 
-# given daily return and allocations, compute average daily return for portfolio
-def avg_daily_return(daily_rets):
-    avg = daily_rets.mean()
-    return avg
+    na_quantity = np.where(na_orders['buy'][na_valid], 1.0, -1.0) * na_orders['qty'][na_valid]
+    na_rows = na_rows[na_valid]
+    na_order = np.argsort(na_rows, kind='mergesort')
+    ls_traded = sorted(set(ls_stocks))
+    return na_rows[na_order], na_column[na_stock][na_order], na_quantity[na_order], ls_traded
 
-# given an array of prices, compute standard deviation of portfolio
-def std_dev(daily_rets):
-    std = daily_rets.std()
-    return std
+# daily fund value, (days x symbols) holdings and cash of the orders given as
+# day rows (sorted), symbol columns and signed quantities against the
+# (days x symbols) close prices
+def fund_arrays(na_price, cash, na_rows, na_columns, na_quantity):
+    na_trades = np.zeros(na_price.shape)
+    np.add.at(na_trades, (na_rows, na_columns), na_quantity)
+    na_holdings = np.cumsum(na_trades, axis=0)
+    na_cash = daily_cash(na_price, cash, na_rows, na_columns, na_quantity)
 
-def sharpe_ratio(avg_daily_rets, std_dev_tp):
-    k = math.sqrt(252) # for daily returns (assume 252)
-    sharpe = k * avg_daily_rets / std_dev_tp
-    return sharpe
+    na_value = na_cash + np.einsum('ij,ij->i', na_holdings, na_price)
+    return na_value, na_holdings, na_cash
+
+# cash at the end of every day: accumulated order by order, in the same order
+# as the loop engine, then sampled after the last order of each day
+def daily_cash(na_price, cash, na_rows, na_columns, na_quantity):
+    na_flow = -na_quantity * na_price[na_rows, na_columns]
+    na_cash_after = np.cumsum(np.concatenate(([float(cash)], na_flow)))
+    return na_cash_after[np.searchsorted(na_rows, np.arange(na_price.shape[0]), side='right')]
+
+# process stock orders for all days at once: holdings are the running sum of
+# the (days x symbols) trade matrix, same day same symbol orders aggregated
+# np_orders is either the string array from read_csvfile() or, with ls_names,
+# a typed orderstore table
+def process_stock_orders_vectorized(ls_symbols, ldt_timestamps, d_data, cash, np_orders, ls_names=None):
+    print "process_stock_orders_vectorized"
+
+    df_close = d_data['close']    # close = adjusted close
+    na_price = df_close.values
+    ls_columns = [str(s_sym).upper() for s_sym in df_close.columns]
+
+    if ls_names is None:
+        na_rows, na_columns, na_quantity, ls_traded = parse_orders(ldt_timestamps, ls_columns, np_orders)
+    else:
+        na_rows, na_columns, na_quantity, ls_traded = table_orders(ldt_timestamps, ls_columns, np_orders, ls_names)
+
+    na_value, na_holdings, na_cash = fund_arrays(na_price, cash, na_rows, na_columns, na_quantity)
+    fund = [[ts.year, ts.month, ts.day, float(na_value[i])] for i, ts in enumerate(ldt_timestamps)]
+
+    portfolio = { "cash" : float(na_cash[-1]) }
+    for s_sym in ls_traded:
+        portfolio[s_sym] = float(na_holdings[-1, ls_columns.index(s_sym)])
+    return portfolio,fund
+
+# trading day rows, symbol columns and signed quantities of one order book:
+# a read_csvfile() string array or an (orderstore table, symbol list) pair
+def book_orders(ldt_timestamps, ls_columns, book):
+    if isinstance(book, tuple):
+        na_orders, ls_names = book
+        return table_orders(ldt_timestamps, ls_columns, na_orders, ls_names)
+    return parse_orders(ldt_timestamps, ls_columns, book)
+
+# parsed order books grouped into chunks whose (books x days x symbols)
+# holdings block, over the symbols the chunk's books trade, stays within
+# i_cells; a book larger than that is a chunk of its own
+def book_chunks(ldt_timestamps, ls_columns, l_books, i_cells=4000000):
+    i_days = len(ldt_timestamps)
+    l_chunk = []
+    set_used = set()
+    for book in l_books:
+        t_book = book_orders(ldt_timestamps, ls_columns, book)
+        set_book = set_used.union(t_book[1].tolist())
+        if l_chunk and (len(l_chunk) + 1) * i_days * len(set_book) > i_cells:
+            yield l_chunk
+            l_chunk = []
+            set_book = set(t_book[1].tolist())
+        l_chunk.append(t_book)
+        set_used = set_book
+    if l_chunk:
+        yield l_chunk
+
+# process a batch of order books against one shared price matrix and return
+# the (days x books) value matrix, every book starting with the same cash.
+# Each chunk of books gets a (books x days x symbols) trade block over only
+# the symbols its books trade, so memory is bounded by i_cells, not by the
+# number of books; the holdings are its running sum over days.
+def process_order_books(ldt_timestamps, d_data, cash, l_books, i_cells=4000000):
+    print "process_order_books"
+
+    df_close = d_data['close']    # close = adjusted close
+    na_price = df_close.values
+    ls_columns = [str(s_sym).upper() for s_sym in df_close.columns]
+    i_days = len(ldt_timestamps)
 
-def cumulative_return(na_rets):
-    cumul = float(1 + np.subtract(na_rets[-1], na_rets[0]))
-    return cumul
+    na_values = np.empty((i_days, len(l_books)))
+    i_book = 0
+    for l_chunk in book_chunks(ldt_timestamps, ls_columns, l_books, i_cells):
+        na_used = np.unique(np.concatenate([na_columns for na_rows, na_columns, na_quantity, ls_traded in l_chunk]))
+        na_used_price = na_price[:, na_used]
+
+        na_trades = np.zeros((len(l_chunk), i_days, len(na_used)))
+        for b, (na_rows, na_columns, na_quantity, ls_traded) in enumerate(l_chunk):
+            np.add.at(na_trades[b], (na_rows, np.searchsorted(na_used, na_columns)), na_quantity)
+            na_values[:, i_book + b] = daily_cash(na_price, cash, na_rows, na_columns, na_quantity)
+        np.cumsum(na_trades, axis=1, out=na_trades)
+
+        na_values[:, i_book:i_book + len(l_chunk)] += np.einsum('btn,tn->tb', na_trades, na_used_price)
+        i_book += len(l_chunk)
+    return na_values
+
+# process stock orders straight from the csv file without loading them: one
+# pass finds the dates and symbols, unsorted files are merge sorted into a
+# temporary file, and each day's value row is written as soon as it is known.
+# Only the daily values are kept, for the stats.
+def process_stock_orders_streaming(cash, infile, outfile):
+    print "process_stock_orders_streaming"
+
+    i_first, i_last, ls_symbols, i_orders, b_sorted = orderstream.scan_orders(infile)
+    if i_orders == 0:
+        print "Error: no orders in", infile
+        sys.exit(2)
+
+    s_sorted = None
+    if not b_sorted:
+        print "sorting %d orders" % (i_orders)
+        i_fd, s_sorted = tempfile.mkstemp(suffix=".csv")
+        os.close(i_fd)
+        orderstream.sort_orders(infile, s_sorted)
+
+    try:
+        dt_first = orderstream.key_date(i_first)
+        dt_last  = orderstream.key_date(i_last)
+        begin = [dt_first.year, dt_first.month, dt_first.day]
+        end   = [dt_last.year, dt_last.month, dt_last.day]
+        ldt_timestamps, d_data = read_stock_database(begin,end,ls_symbols)
+        df_close = d_data['close']    # close = adjusted close
+
+        portfolio = { "cash" : cash }
+        rows = orderstream.read_rows(s_sorted or infile)
+        values = []
+        f = open(outfile,"wb")
+        try:
+            writer = csv.writer(f,delimiter=',')
+            for row in orderstream.iter_fund(portfolio, rows, ldt_timestamps, df_close):
+                writer.writerow(row)
+                values.append(row[3])
+        finally:
+            f.close()
+    finally:
+        if s_sorted is not None:
+            os.remove(s_sorted)
+
+    return portfolio, begin, end, values
 
 def calc_stats(begin, end, na_price):        
     dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2])) 
     dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
     
-    # normalize prices
-    na_normalized_price = normalize_data(na_price) 
- 
-    # calculate daily return
-    na_rets = na_normalized_price.copy()
-    na_daily_rets = daily_return(na_rets)
-        
-    # average daily return
-    avg_daily_rets = avg_daily_return(na_daily_rets)
-    
-    # compute standard deviation
-    std_dev_tp = std_dev(na_daily_rets)
-    
-    # compute sharpe ratio
-    sharpe_ratio_tp = sharpe_ratio(avg_daily_rets,std_dev_tp)
-    
-    #compute cumulative return
-    cumul_return_tp = cumulative_return(na_normalized_price)
+    d_metrics = metrics.calc_metrics(na_price)
+    sharpe_ratio_tp = d_metrics['sharpe'][0]
+    cumul_return_tp = float(d_metrics['cumulative'][0])
+    std_dev_tp = d_metrics['volatility'][0]
+    avg_daily_rets = d_metrics['avg_daily'][0]
     
     # print out status
     print
@@ -201,37 +381,108 @@ def calc_stats(begin, end, na_price):
     print "Total Return of Fund:", cumul_return_tp
     print "Standard Deviation:  ", std_dev_tp 
     print "Average Daily Return:", avg_daily_rets
+    print "Max Drawdown:        ", d_metrics['max_drawdown'][0]
+    print "Sortino Ratio:       ", d_metrics['sortino'][0]
     
     
+# simulate several order book files at once over the dates of all of them;
+# writes [year, month, day, value of each book] rows and prints each book's
+# statistics
+def process_batch(cash, ls_infiles, outfile):
+    with st.stage('load orders', engine='batch', books=len(ls_infiles)) as span:
+        l_books = [orderstore.load_orders(s_file) for s_file in ls_infiles]
+        l_books = [(na_orders, ls_names) for na_orders, ls_names in l_books if len(na_orders) > 0]
+        if len(l_books) < len(ls_infiles):
+            print "Error: order files without orders in", ls_infiles
+            sys.exit(2)
+        ls_symbols = set(ls_names[i] for na_orders, ls_names in l_books for i in np.unique(na_orders['sym']))
+        dt_first = tc.day_date(min(na_orders['day'][0] for na_orders, ls_names in l_books))
+        dt_last  = tc.day_date(max(na_orders['day'][-1] for na_orders, ls_names in l_books))
+        begin = [dt_first.year, dt_first.month, dt_first.day]
+        end   = [dt_last.year, dt_last.month, dt_last.day]
+        span['rows'] = sum(len(na_orders) for na_orders, ls_names in l_books)
+
+    ldt_timestamps, d_data = read_stock_database(begin,end,ls_symbols)
+
+    with st.stage('compute', engine='batch', books=len(l_books)):
+        na_values = process_order_books(ldt_timestamps, d_data, cash, l_books)
+
+    with st.stage('stats', rows=na_values.size):
+        d_metrics = metrics.calc_metrics(na_values)
+    print
+    print "Start Date:",ldt_timestamps[0],"to",ldt_timestamps[-1]
+    print "%12s %12s %12s %12s %12s  %s" % ("Sharpe", "Total Return", "Std Dev", "Avg Daily", "Drawdown", "Orders")
+    for k, s_file in enumerate(ls_infiles):
+        print "%12.6f %12.6f %12.8f %12.8f %12.6f  %s" % (d_metrics['sharpe'][k], d_metrics['cumulative'][k],
+              d_metrics['volatility'][k], d_metrics['avg_daily'][k], d_metrics['max_drawdown'][k], s_file)
+
+    with st.stage('write', rows=len(na_values)):
+        write_csvfile(outfile, [[ts.year, ts.month, ts.day] + row for ts, row in zip(ldt_timestamps, na_values.tolist())])
+
 # main routine    
 def main(argv):
     print "marketsim.py main"
     
     # get command line parameters
-    cash,infile,outfile = get_cmdline_options(argv)
+    cash,infile,outfile,engine = get_cmdline_options(st.profile_argv(argv))
+
+    # stream orders from the file and write values as they are computed
+    if engine == "stream":
+        with st.stage('compute', engine=engine) as span:
+            portfolio, begin, end, values = process_stock_orders_streaming(cash, infile, outfile)
+            span['rows'] = len(values)
+        with st.stage('stats', rows=len(values)):
+            calc_stats(begin, end, np.array(values).reshape(len(values),1))
+        print portfolio
+        print "marketsim.py done"
+        return
     
-    # read orders csvfile into a numpy array and get list of stocks traded
-    np_orders = read_csvfile(infile)
-    ls_symbols = set(list(np_orders[:,3]))
+    # simulate every order book of a comma separated list of files together
+    if engine == "batch":
+        process_batch(cash, infile.split(","), outfile)
+        print "marketsim.py done"
+        return
 
-    # determine the earliest and latest begin dates
-    begin = np_orders[0][0:3]
-    end   = np_orders[-1][0:3]
+    # the vector engine reads the typed order table (cached next to the csv
+    # file), the loop engine reads the orders csvfile into a string array
+    ls_names = None
+    with st.stage('load orders', engine=engine) as span:
+        if engine == "vector":
+            np_orders, ls_names = orderstore.load_orders(infile)
+            ls_symbols = set(ls_names[i] for i in np.unique(np_orders['sym']))
+            dt_first = tc.day_date(np_orders['day'][0])
+            dt_last  = tc.day_date(np_orders['day'][-1])
+            begin = [dt_first.year, dt_first.month, dt_first.day]
+            end   = [dt_last.year, dt_last.month, dt_last.day]
+        else:
+            np_orders = read_csvfile(infile)
+            ls_symbols = set(list(np_orders[:,3]))
+
+            # determine the earliest and latest begin dates
+            begin = np_orders[0][0:3]
+            end   = np_orders[-1][0:3]
+        span['rows'] = len(np_orders)
 
     # read stock database from Yahoo
     ldt_timestamps, d_data = read_stock_database(begin,end,ls_symbols)
            
     # loop for all NYSE stock days earliest to latest
-    portfolio, fund = process_stock_orders(ls_symbols, ldt_timestamps, d_data, cash, np_orders)
+    with st.stage('compute', engine=engine, rows=len(np_orders)):
+        if engine == "vector":
+            portfolio, fund = process_stock_orders_vectorized(ls_symbols, ldt_timestamps, d_data, cash, np_orders, ls_names)
+        else:
+            portfolio, fund = process_stock_orders(ls_symbols, ldt_timestamps, d_data, cash, np_orders)
 
     # calculate stats
-    na_fund = np.array(fund)
-    trading_days = na_fund.shape[0]
-    na_price = na_fund[:,3].reshape(trading_days,1)
-    calc_stats(begin, end, na_price)
+    with st.stage('stats', rows=len(fund)):
+        na_fund = np.array(fund)
+        trading_days = na_fund.shape[0]
+        na_price = na_fund[:,3].reshape(trading_days,1)
+        calc_stats(begin, end, na_price)
     
     # write out csvfile
-    write_csvfile(outfile,fund)
+    with st.stage('write', rows=len(fund)):
+        write_csvfile(outfile,fund)
     
     print portfolio
     print "marketsim.py done"
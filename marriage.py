@@ -1,6 +1,42 @@
+'''
+File:   marriage.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Monte Carlo of the marriage problem
+
+Two populations of n values drawn from low..high are paired at random
+datings times; a pair stays in the pool for the next dating only when the
+female's value is at least the male's, the other pairs leave it.  A trial's
+result is the fraction of the population that left the pool,
+(n - pool size) / n, as in marry().
+
+The loop engine is the original marry(): every dating shuffles two Python
+lists and filters them pair by pair.  The vector engine runs a batch of
+trials as (trials x n) arrays.  Males never move; the females still in the
+pool are shuffled with one argsort of random keys per row (the ones that
+left the pool get key 2.0 and sort last) and dropped into the pool
+slots, which gives every remaining male a uniformly random remaining
+female, the same distribution as shuffling both lists and zipping them.
+As the pools shrink the pairs are moved to the front of their rows and the
+arrays narrowed to the largest pool, so late datings cost what the pools do.
+Batches are spread over a process pool; each batch has its own
+RandomState seeded from -s, so the results depend on the seed and the
+batch size, not on the number of processes.
+
+marriage.py -n 1000 -l 0 -u 200 -d 1000 -t 100 -p 4 -s 0
+marriage.py -e loop -t 10
+'''
+
 from random import randint, shuffle
 from itertools import izip
 import numpy as np
+import multiprocessing as mp
+import stagetimer as st
+import random
+import math
+import time
+import sys, getopt
 
 def genpop(n, low, high):
     return [randint(low, high) for _ in xrange(n)]
@@ -17,4 +53,161 @@ def marry(n, low, high, datings=1000):
             izip(shuffled(males), shuffled(females)) if female >= male))
     return (n - len(males)) / float(n)
 
-print np.average([marry(1000, 0, 200) for _ in xrange(100)])
\ No newline at end of file
+# get command line options
+def get_cmdline_options(argv):
+    n = 1000
+    low = 0
+    high = 200
+    datings = 1000
+    i_trials = 100
+    i_batch = None
+    i_procs = mp.cpu_count()
+    i_seed = 0
+    f_conf = 0.95
+    engine = "vector"
+
+    s_usage = "marriage.py -n <population> -l <low> -u <high> -d <datings> -t <trials> -b <batch> " \
+              "-p <processes> -s <seed> -c <confidence> -e <loop|vector>"
+    try:
+        opts, args = getopt.getopt(argv,"hn:l:u:d:t:b:p:s:c:e:",["population=","low=","high=","datings=","trials=",
+                                   "batch=","procs=","seed=","confidence=","engine="])
+    except getopt.GetoptError:
+        print s_usage
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print s_usage
+            print "the batch size defaults to about 200000 / population trials per batch"
+            print "marriage.py -n 1000 -l 0 -u 200 -d 1000 -t 100 -p 4 -s 0"
+            sys.exit()
+        elif opt in ('-n','--population'):
+            n = int(arg)
+        elif opt in ('-l','--low'):
+            low = int(arg)
+        elif opt in ('-u','--high'):
+            high = int(arg)
+        elif opt in ('-d','--datings'):
+            datings = int(arg)
+        elif opt in ('-t','--trials'):
+            i_trials = int(arg)
+        elif opt in ('-b','--batch'):
+            i_batch = int(arg)
+        elif opt in ('-p','--procs'):
+            i_procs = int(arg)
+        elif opt in ('-s','--seed'):
+            i_seed = int(arg)
+        elif opt in ('-c','--confidence'):
+            f_conf = float(arg)
+        elif opt in ('-e','--engine'):
+            engine = arg
+
+    if engine not in ('loop','vector'):
+        print "Error: engine must be loop or vector"
+        sys.exit(2)
+    if n < 1 or i_trials < 1 or low > high or not 0.0 < f_conf < 1.0:
+        print "Error: population and trials must be positive, low at most high and confidence between 0 and 1"
+        sys.exit(2)
+    if i_batch is None:
+        i_batch = max(1, 200000 // n)
+    print "cmdline options: population=",n,"low=",low,"high=",high,"datings=",datings,"trials=",i_trials, \
+          "batch=",i_batch,"procs=",i_procs,"seed=",i_seed,"engine=",engine
+    return n,low,high,datings,i_trials,i_batch,i_procs,i_seed,f_conf,engine
+
+# results of i_trials trials run together: (trials x n) males and females,
+# na_pool marks the pairs still in the pool
+def marry_batch(rng, i_trials, n, low, high, datings=1000):
+    na_males = rng.randint(low, high + 1, size=(i_trials, n))
+    na_females = rng.randint(low, high + 1, size=(i_trials, n))
+    na_pool = np.ones((i_trials, n), dtype=bool)
+    na_rows = np.arange(i_trials)[:, np.newaxis]
+    na_slots = np.arange(n)
+
+    for dating in xrange(datings):
+        # once the largest pool fits in 3/4 of the columns, move every
+        # row's pool pairs to the front and drop the columns behind them
+        na_count = na_pool.sum(axis=1)
+        i_width = na_count.max()
+        if i_width < 0.75 * na_pool.shape[1]:
+            na_front = np.argsort(~na_pool, axis=1, kind='mergesort')[:, :i_width]
+            na_males = na_males[na_rows, na_front]
+            na_females = na_females[na_rows, na_front]
+            na_pool = na_pool[na_rows, na_front]
+            na_slots = na_slots[:i_width]
+
+        # pool females first, in random order, into the pool slots
+        na_keys = np.where(na_pool, rng.random_sample(na_pool.shape), 2.0)
+        na_order = np.argsort(na_keys, axis=1)
+        na_females[na_pool] = na_females[na_rows, na_order][na_slots < na_count[:, np.newaxis]]
+        na_pool &= na_females >= na_males
+    return (n - na_pool.sum(axis=1)) / float(n)
+
+# one batch of a process pool: (seed, trials, n, low, high, datings)
+def run_batch(task):
+    i_seed, i_trials, n, low, high, datings = task
+    return marry_batch(np.random.RandomState(i_seed), i_trials, n, low, high, datings)
+
+# batches of at most i_batch trials, each with a seed drawn from i_seed
+def batch_tasks(i_trials, i_batch, i_seed, n, low, high, datings):
+    li_sizes = [min(i_batch, i_trials - i_start) for i_start in range(0, i_trials, i_batch)]
+    na_seeds = np.random.RandomState(i_seed).randint(0, 2**31 - 1, size=len(li_sizes))
+    return [(int(i_task_seed), i_size, n, low, high, datings) for i_task_seed, i_size in zip(na_seeds, li_sizes)]
+
+# results of every trial, the batches spread over i_procs processes
+def simulate(i_trials, n, low, high, datings=1000, i_batch=200, i_procs=1, i_seed=0):
+    tasks = batch_tasks(i_trials, i_batch, i_seed, n, low, high, datings)
+    i_procs = min(i_procs, len(tasks))
+    if i_procs > 1:
+        pool = mp.Pool(i_procs)
+        try:
+            l_results = pool.map(run_batch, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        l_results = [run_batch(task) for task in tasks]
+    return np.concatenate(l_results)
+
+# results of every trial with the original marry()
+def simulate_loop(i_trials, n, low, high, datings=1000, i_seed=0):
+    random.seed(i_seed)
+    return np.array([marry(n, low, high, datings) for _ in xrange(i_trials)])
+
+# two sided standard normal critical value of a confidence level, bisecting erf
+def normal_critical(f_conf):
+    f_low, f_high = 0.0, 40.0
+    for i in range(100):
+        f_mid = (f_low + f_high) / 2.0
+        if math.erf(f_mid / math.sqrt(2.0)) < f_conf:
+            f_low = f_mid
+        else:
+            f_high = f_mid
+    return f_high
+
+# mean of the trial results and its normal confidence interval
+def confidence_interval(na_results, f_conf=0.95):
+    f_mean = na_results.mean()
+    f_std = na_results.std(ddof=1) if len(na_results) > 1 else 0.0
+    f_half = normal_critical(f_conf) * f_std / math.sqrt(len(na_results))
+    return f_mean, f_std, f_mean - f_half, f_mean + f_half
+
+def main(argv):
+    print "marriage.py main routine\n"
+    n, low, high, datings, i_trials, i_batch, i_procs, i_seed, f_conf, engine = \
+        get_cmdline_options(st.profile_argv(argv))
+
+    t_start = time.time()
+    with st.stage('compute', engine=engine, trials=i_trials, rows=i_trials * n, procs=i_procs):
+        if engine == "loop":
+            na_results = simulate_loop(i_trials, n, low, high, datings, i_seed)
+        else:
+            na_results = simulate(i_trials, n, low, high, datings, i_batch, i_procs, i_seed)
+    t_elapsed = time.time() - t_start
+
+    f_mean, f_std, f_lower, f_upper = confidence_interval(na_results, f_conf)
+    print
+    print "average over %d trials: %0.6f (std %0.6f)" % (len(na_results), f_mean, f_std)
+    print "%0.0f%% confidence interval: %0.6f to %0.6f" % (f_conf * 100.0, f_lower, f_upper)
+    print "%d trials in %0.2f s, %0.2f trials/s" % (len(na_results), t_elapsed, len(na_results) / t_elapsed)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,87 @@
+'''
+File:   metrics.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Performance statistics of many value series at once
+
+calc_metrics() takes a (days x series) value matrix (portfolio values,
+collapsed allocations, benchmark closes) and returns the statistics every
+script prints, for all columns together: Sharpe ratio, volatility (std of
+daily returns), average daily return, cumulative return, maximum drawdown
+and Sortino ratio.  Daily returns follow tsu.returnize0, so the first day's
+zero return counts toward the mean and std, and std uses ddof=0, as in the
+course's normalize / returnize0 / std / sqrt(252) recipe.
+
+The columns are processed in blocks of i_block series, so the daily
+returns and the running peak of 100k series are never held in memory at
+once; each block's returns are computed once and used for every statistic.
+
+    d_metrics = metrics.calc_metrics(na_values)
+    d_metrics['sharpe'][k], d_metrics['max_drawdown'][k]
+'''
+
+import numpy as np
+import math
+
+LS_FIELDS = ['sharpe', 'volatility', 'avg_daily', 'cumulative', 'max_drawdown', 'sortino']
+
+# value series per block, so a block's intermediates stay near 4M cells
+def block_size(i_days, i_cells=4000000):
+    return max(1, int(i_cells // max(i_days, 1)))
+
+# statistics of every column of a (days x series) block; returns a tuple of
+# arrays in LS_FIELDS order
+def block_metrics(na_values, i_trading=252):
+    i_days = na_values.shape[0]
+    f_k = math.sqrt(i_trading)
+
+    # daily returns without the first day's 0, which only adds to the count
+    na_rets = na_values[1:] / na_values[:-1]
+    na_rets -= 1.0
+    na_avg = na_rets.sum(axis=0) / i_days
+
+    # downside deviation against 0 and the std about the mean, both over all
+    # i_days returns
+    na_down = np.minimum(na_rets, 0.0)
+    na_down *= na_down
+    na_downside = np.sqrt(na_down.sum(axis=0) / i_days)
+    del na_down
+    na_rets -= na_avg
+    na_rets *= na_rets
+    na_std = np.sqrt((na_rets.sum(axis=0) + na_avg * na_avg) / i_days)
+    del na_rets
+
+    # drawdown as a fraction of the running peak
+    na_peak = np.maximum.accumulate(na_values, axis=0)
+    na_drawdown = (1.0 - na_values / na_peak).max(axis=0)
+    del na_peak
+
+    na_cumul = na_values[-1] / na_values[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        na_sharpe = f_k * na_avg / na_std
+        na_sortino = f_k * na_avg / na_downside
+    return na_sharpe, na_std, na_avg, na_cumul, na_drawdown, na_sortino
+
+# statistics of every column of a (days x series) value matrix, or of a
+# single series; returns a dictionary of per-series arrays keyed by LS_FIELDS.
+# With i_block the columns are processed that many at a time.
+def calc_metrics(na_values, i_block=None, i_trading=252):
+    na_values = np.asarray(na_values, dtype=float)
+    if na_values.ndim == 1:
+        na_values = na_values.reshape(-1, 1)
+    i_days, i_series = na_values.shape
+    if i_block is None:
+        i_block = block_size(i_days)
+
+    d_metrics = dict((s_field, np.empty(i_series)) for s_field in LS_FIELDS)
+    if i_days == 0:
+        for s_field in LS_FIELDS:
+            d_metrics[s_field][:] = np.nan
+        return d_metrics
+    for i_start in range(0, i_series, i_block):
+        i_stop = min(i_start + i_block, i_series)
+        t_block = block_metrics(na_values[:, i_start:i_stop], i_trading)
+        for s_field, na_field in zip(LS_FIELDS, t_block):
+            d_metrics[s_field][i_start:i_stop] = na_field
+    return d_metrics
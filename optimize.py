@@ -7,21 +7,21 @@ Description: Compute optimal portfolio allocation
 '''
 
 # QSTK Imports
-import QSTK.qstkutil.qsdateutil as du
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkutil.DataAccess as da
+import lazyimport
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import metrics
 
 # Third Party Imports
 import datetime as dt
-import matplotlib.pyplot as plt
-import pandas as pd
 import numpy as np
-import math
-import itertools as it
+import allocations as al
 import sys, getopt
 import csv
 
-print "Pandas Version", pd.__version__
+plt = lazyimport.module('matplotlib.pyplot')
+pd = lazyimport.module('pandas')
 
 # get command line options
 def get_cmdline_options(argv):    
@@ -29,17 +29,23 @@ def get_cmdline_options(argv):
     end   = [2012, 12, 31]
     #stocks = ['BRCM','TXN','IBM','HNZ']
     stocks = ['AAPL','GOOG', 'AMZN']
+    engine = "loop"
+    d_sweep = { 'f_step' : 0.1, 'lf_min' : 0.0, 'lf_max' : 1.0, 'i_max_positions' : None, 'i_top' : 10 }
     
     try:
-        opts, args = getopt.getopt(argv,"hb:e:s:",["begin=","end=","stock="])
+        opts, args = getopt.getopt(argv,"hb:e:s:m:p:n:t:",["begin=","end=","stock=","mode=",
+                                   "step=","positions=","top=","min=","max="])
         
     except getopt.GetoptError:
-        print "optimize.py -b <begin_year> -e <end_year> -s <stocks>" 
+        print "optimize.py -b <begin_year> -e <end_year> -s <stocks> -m <loop|sweep>" 
+        print "            -p <step> -n <max_positions> -t <top> --min <weight> --max <weight>"
         sys.exit(2)
     for opt, arg in opts:
-        if opt == 'h':
-            print "optimize.py -b <begin_year> -e <end_year> -s <stock_list> -o <outfile.csv>"
-            print "optimize.py -b 2011 -e 2011 -s AAPL,MSFT"
+        if opt == '-h':
+            print "optimize.py -b <begin_year> -e <end_year> -s <stock_list> -m <loop|sweep>"
+            print "            -p <step> -n <max_positions> -t <top> --min <weight> --max <weight>"
+            print "optimize.py -b 2011 -e 2011 -s AAPL,MSFT -m sweep"
+            print "optimize.py -b 2011 -e 2011 -s AAPL,MSFT,IBM,XOM,GLD -m sweep -p 0.01 -n 3 --max 0.6"
             sys.exit()
         elif opt in ('-b','--begin'):
             begin = [int(arg), 1, 1]
@@ -48,6 +54,18 @@ def get_cmdline_options(argv):
         elif opt in ('-s','--stock'):
             stocks = str(arg)
             stocks = stocks.split(",")
+        elif opt in ('-m','--mode'):
+            engine = arg
+        elif opt in ('-p','--step'):
+            d_sweep['f_step'] = float(arg)
+        elif opt in ('-n','--positions'):
+            d_sweep['i_max_positions'] = int(arg)
+        elif opt in ('-t','--top'):
+            d_sweep['i_top'] = int(arg)
+        elif opt == '--min':
+            d_sweep['lf_min'] = float(arg)
+        elif opt == '--max':
+            d_sweep['lf_max'] = float(arg)
     
     dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2])) 
     dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
@@ -55,50 +73,18 @@ def get_cmdline_options(argv):
     if dt_begin > dt_end:
         print "Error: begining date must be before ending date"
         sys.exit(2)
-    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks
-    return dt_begin,dt_end,stocks
-
-# normalize prices
-def normalize_data(prices):
-    return prices / prices[0, :]
-
-# given an array of prices, compute daily return for all stocks
-def daily_return(prices):
-    return tsu.returnize0(prices)
-
-# given daily return and allocations, compute average daily return for portfolio
-def avg_daily_return(daily_rets):
-    avg = daily_rets.mean()
-    return avg
-
-# given an array of prices, compute standard deviation of portfolio
-def std_dev(daily_rets):
-    std = daily_rets.std()
-    return std
-
-def sharpe_ratio(avg_daily_rets, std_dev_tp):
-    k = math.sqrt(252) # for daily returns (assume 252)
-    sharpe = k * avg_daily_rets / std_dev_tp
-    return sharpe
-
-def cumulative_return(na_rets):
-    cumul = 1 + np.subtract(na_rets[-1], na_rets[0])
-    return cumul
+    if engine not in ('loop','sweep'):
+        print "Error: mode must be loop or sweep"
+        sys.exit(2)
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"mode=",engine
+    return dt_begin,dt_end,stocks,engine,d_sweep
 
 # read stock database from Yahoo and return data structure
 def read_stock_database(dt_begin,dt_end,ls_symbols):
     print "read_stock_database"
 
-    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
-    ldt_timestamps = du.getNYSEdays(dt_begin, dt_end, dt.timedelta(hours=16))        
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)   
-    d_data = dict(zip(ls_keys, ldf_data))
-   
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)    
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))        
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
      
     return ldt_timestamps, d_data   
 
@@ -116,26 +102,12 @@ def simulate(dt_begin, dt_end, ls_symbols, allocation):
     #print "na_price_tp"
     #print na_price_tp
     
-    # normalize prices
-    na_normalized_price = normalize_data(na_price_tp) 
-    #print na_normalized_price
- 
-    # calculate daily return
-    na_rets = na_normalized_price.copy()
-    na_daily_rets = daily_return(na_rets)
-        
-    # average daily return
-    avg_daily_rets = avg_daily_return(na_daily_rets)
-    
-    # compute standard deviation
-    std_dev_tp = std_dev(na_daily_rets)
-    
-    # compute sharpe ratio
-    sharpe_ratio_tp = sharpe_ratio(avg_daily_rets,std_dev_tp)
-    #sharpe_ratio_tp = tsu.getSharpeRatio(na_rets)
-    
-    #compute cumulative return
-    cumul_return_tp = cumulative_return(na_normalized_price)
+    # sharpe ratio, volatility, average daily return and cumulative return
+    d_metrics = metrics.calc_metrics(na_price_tp)
+    sharpe_ratio_tp = d_metrics['sharpe'][0]
+    std_dev_tp = d_metrics['volatility'][0]
+    avg_daily_rets = d_metrics['avg_daily'][0]
+    cumul_return_tp = d_metrics['cumulative'][0]
     
     # print out status
     print
@@ -149,14 +121,11 @@ def simulate(dt_begin, dt_end, ls_symbols, allocation):
     print "Cumulative Return:", cumul_return_tp
     return sharpe_ratio_tp
 
-# compute all possible legal portfolio allocations
+# compute all possible legal portfolio allocations in 10% steps
 def calc_allocations(ls_symbols):    
     allocations = []
-    vals = [x*0.1 for x in range(11)]
-    combinations = it.product(vals, repeat=len(ls_symbols))
-    for allocation in combinations:
-        if sum(allocation) == 1.0:
-            allocations.append(allocation)
+    for na_block in al.iter_allocations(len(ls_symbols), 0.1):
+        allocations.extend(tuple(row) for row in na_block.tolist())
     return allocations    
     
 def optimize(dt_begin, dt_end, ls_symbols):
@@ -169,9 +138,83 @@ def optimize(dt_begin, dt_end, ls_symbols):
     print "Maximum Sharpe"
     print max(result)
 
+# statistics for every column of a (days x portfolios) value matrix, computed
+# the same way simulate() does for a single portfolio
+def calc_portfolio_stats(na_price_tp):
+    d_metrics = metrics.calc_metrics(na_price_tp)
+    return d_metrics['sharpe'], d_metrics['volatility'], d_metrics['avg_daily'], d_metrics['cumulative']
+
+# load prices once and evaluate allocations as one matrix product
+# prices @ W.T per block of candidates; returns a table ranked by Sharpe ratio,
+# best first, with rows
+# [sharpe, volatility, average daily return, cumulative return, allocation].
+# Without an explicit list the candidates are streamed from
+# allocations.iter_allocations with the given step, bounds and position cap,
+# and only the i_top best are kept when i_top is set.
+def sweep(dt_begin, dt_end, ls_symbols, allocations=None, f_step=0.1,
+          lf_min=0.0, lf_max=1.0, i_max_positions=None, i_top=None):
+    ldt_timestamps, d_data = read_stock_database(dt_begin, dt_end, ls_symbols)
+    na_price = d_data['close'].values
+    with st.stage('compute', rows=na_price.size):
+        return sweep_prices(na_price, allocations, f_step, lf_min, lf_max, i_max_positions, i_top)
+
+# sweep() on an already loaded (days x symbols) close price array
+def sweep_prices(na_price, allocations=None, f_step=0.1, lf_min=0.0, lf_max=1.0,
+                 i_max_positions=None, i_top=None):
+    i_symbols = na_price.shape[1]
+    if allocations is None:
+        blocks = al.iter_allocations(i_symbols, f_step, lf_min, lf_max, i_max_positions)
+    else:
+        blocks = [np.array(allocations, dtype=float).reshape(len(allocations), i_symbols)]
+    
+    l_stats = []
+    l_weights = []
+    for na_weights in blocks:
+        na_price_tp = np.dot(na_price, na_weights.T)
+        na_stats = np.column_stack(calc_portfolio_stats(na_price_tp))
+        l_stats.append(na_stats)
+        l_weights.append(na_weights)
+        
+        # keep the running top i_top so memory does not grow with the sweep
+        if i_top is not None:
+            na_stats = np.vstack(l_stats)
+            na_weights = np.vstack(l_weights)
+            na_keep = rank_by_sharpe(na_stats[:, 0])[:i_top]
+            l_stats = [na_stats[na_keep]]
+            l_weights = [na_weights[na_keep]]
+    
+    if len(l_stats) == 0:
+        return []
+    na_stats = np.vstack(l_stats)
+    na_weights = np.vstack(l_weights)
+    
+    table = []
+    for k in rank_by_sharpe(na_stats[:, 0]):
+        table.append(list(na_stats[k]) + [tuple(na_weights[k])])
+    return table
+
+# indices ordering Sharpe ratios best first, NaN (flat portfolios) last and
+# ties in candidate order
+def rank_by_sharpe(na_sharpe):
+    return np.argsort(-np.where(np.isnan(na_sharpe), -np.inf, na_sharpe), kind='mergesort')
+
+def print_sweep(table, ls_symbols, i_top=10):
+    print
+    print "Symbols:", ls_symbols
+    print "top %d allocations by Sharpe ratio" % (min(i_top, len(table)))
+    print "%12s %12s %12s %12s  %s" % ("Sharpe", "Volatility", "Avg Daily", "Cumulative", "Allocation")
+    for row in table[:i_top]:
+        print "%12.6f %12.6f %12.8f %12.6f  %s" % tuple(row)
+
 def main(argv):
-    dt_begin, dt_end, stocks = get_cmdline_options(argv)
-    optimize(dt_begin, dt_end, stocks)
+    dt_begin, dt_end, stocks, engine, d_sweep = get_cmdline_options(st.profile_argv(argv))
+    if engine == "sweep":
+        table = sweep(dt_begin, dt_end, stocks, **d_sweep)
+        with st.stage('write', rows=len(table)):
+            print_sweep(table, stocks, d_sweep['i_top'])
+    else:
+        with st.stage('compute', engine=engine):
+            optimize(dt_begin, dt_end, stocks)
                                         
     #simulate([2011, 1, 1], [2011, 12, 31], ["AAPL", "GLD", "GOOG", "XOM"], [ 0.4, 0.4, 0.0, 0.2 ])
     #simulate([2010, 1, 1], [2010, 12, 31], ["AXP","HPQ","IBM","HNZ"], [ 0.0, 0.0, 0.0, 1.0 ])
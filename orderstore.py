@@ -0,0 +1,149 @@
+'''
+File:   orderstore.py
+Class:  Market Simulator for Computational Investing Class - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Typed order table with a binary sidecar cache
+
+An order csv file [year, month, day, symbol, order, shares] is parsed once
+into a structured array with one typed column per field:
+
+    day   int32    days since 1970-01-01
+    sym   int16    index into the symbol list
+    buy   bool     True for Buy, False for Sell
+    qty   float64  shares
+
+Rows are stored in date order, same day orders in file order, and orders
+that are neither Buy nor Sell are dropped.  The table is saved next to the
+csv file as <file>.npy with the symbol list, the csv size and mtime in
+<file>.sym.json; later loads memory-map the .npy as long as the csv size and
+mtime still match.
+'''
+
+import numpy as np
+import datetime as dt
+import json
+import os
+import csv
+
+# the day numbers of the calendar, so order days and calendar rows agree
+from tradingcalendar import day_number, day_date, EPOCH
+
+ORDER_DTYPE = np.dtype([('day', np.int32), ('sym', np.int16), ('buy', np.bool_), ('qty', np.float64)])
+
+def sidecar_paths(infile):
+    return infile + ".npy", infile + ".sym.json"
+
+# parse the csv file into a structured array and the symbol list; each
+# distinct date, symbol and order type string is converted once
+def parse_csvfile(infile):
+    d_days = {}
+    d_syms = {}
+    ls_symbols = []
+    d_side = {}
+    l_day, l_sym, l_buy, l_qty = [], [], [], []
+
+    f = open(infile,"rU")
+    try:
+        for row in csv.reader(f):
+            if len(row) < 6:
+                continue
+            s_type = row[4]
+            if s_type not in d_side:
+                d_side[s_type] = { "BUY" : True, "SELL" : False }.get(s_type.strip().upper())
+            b_buy = d_side[s_type]
+            if b_buy is None:
+                continue
+
+            t_date = (row[0], row[1], row[2])
+            if t_date not in d_days:
+                d_days[t_date] = day_number(dt.date(int(row[0]), int(row[1]), int(row[2])))
+            s_sym = row[3]
+            if s_sym not in d_syms:
+                d_syms[s_sym] = len(ls_symbols)
+                ls_symbols.append(s_sym)
+
+            l_day.append(d_days[t_date])
+            l_sym.append(d_syms[s_sym])
+            l_buy.append(b_buy)
+            l_qty.append(float(row[5]))
+    finally:
+        f.close()
+
+    if len(ls_symbols) > np.iinfo(np.int16).max:
+        raise ValueError("%s has more than %d symbols" % (infile, np.iinfo(np.int16).max))
+
+    na_orders = np.empty(len(l_day), dtype=ORDER_DTYPE)
+    na_orders['day'] = l_day
+    na_orders['sym'] = l_sym
+    na_orders['buy'] = l_buy
+    na_orders['qty'] = l_qty
+    na_orders = na_orders[np.argsort(na_orders['day'], kind='mergesort')]
+    return na_orders, ls_symbols
+
+# [year, month, day, symbol, order, shares] rows of a typed table, the csv
+# layout parse_csvfile() reads back
+def table_rows(na_orders, ls_symbols):
+    rows = []
+    for i_day, i_sym, b_buy, f_qty in na_orders.tolist():
+        date = day_date(i_day)
+        rows.append([date.year, date.month, date.day, ls_symbols[i_sym], "Buy" if b_buy else "Sell",
+                     int(f_qty) if f_qty == int(f_qty) else f_qty])
+    return rows
+
+# write the sidecar, the .npy first so a complete .sym.json always describes
+# a complete table
+def save_sidecar(infile, na_orders, ls_symbols):
+    s_npy, s_meta = sidecar_paths(infile)
+    st = os.stat(infile)
+    d_meta = { 'size' : st.st_size, 'mtime' : st.st_mtime, 'symbols' : ls_symbols }
+
+    f = open(s_npy + ".tmp","wb")
+    try:
+        np.save(f, na_orders)
+    finally:
+        f.close()
+    os.rename(s_npy + ".tmp", s_npy)
+
+    f = open(s_meta + ".tmp","w")
+    try:
+        json.dump(d_meta, f)
+    finally:
+        f.close()
+    os.rename(s_meta + ".tmp", s_meta)
+
+# memory-mapped table and symbol list from the sidecar, None when there is no
+# sidecar or the csv file changed since it was written
+def load_sidecar(infile):
+    s_npy, s_meta = sidecar_paths(infile)
+    try:
+        f = open(s_meta,"r")
+        try:
+            d_meta = json.load(f)
+        finally:
+            f.close()
+        st = os.stat(infile)
+        if d_meta['size'] != st.st_size or d_meta['mtime'] != st.st_mtime:
+            return None
+        na_orders = np.load(s_npy, mmap_mode='r')
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+    if na_orders.dtype != ORDER_DTYPE:
+        return None
+    return na_orders, [str(s_sym) for s_sym in d_meta['symbols']]
+
+# typed order table and symbol list for a csv file, from the sidecar when it
+# is current, otherwise parsed and cached
+def load_orders(infile, b_cache=True):
+    if b_cache:
+        cached = load_sidecar(infile)
+        if cached is not None:
+            return cached
+
+    na_orders, ls_symbols = parse_csvfile(infile)
+    if b_cache:
+        try:
+            save_sidecar(infile, na_orders, ls_symbols)
+        except (IOError, OSError):
+            print "could not write order cache for", infile
+    return na_orders, ls_symbols
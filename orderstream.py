@@ -0,0 +1,137 @@
+'''
+File:   orderstream.py
+Class:  Market Simulator for Computational Investing Class - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Stream orders from a csv file one row at a time
+
+Orders are read through generators and the fund is advanced one trading day
+at a time, so memory depends on the number of days and symbols, not on the
+number of orders.  Logs that are not in date order are first sorted with an
+external merge sort: sorted runs of at most i_run orders are written to
+temporary files and merged.  Same day orders keep their file order, like the
+stable sort in marketsim.read_csvfile.
+'''
+
+import datetime as dt
+import tempfile
+import heapq
+import os
+import csv
+
+# order rows [year, month, day, symbol, order, shares] from a csv file
+def read_rows(infile):
+    f = open(infile,"rU")
+    try:
+        for row in csv.reader(f):
+            if len(row) > 0:
+                yield row[0:6]
+    finally:
+        f.close()
+
+# integer yyyymmdd sort key of an order row
+def order_key(row):
+    return int(row[0]) * 10000 + int(row[1]) * 100 + int(row[2])
+
+def key_date(i_key):
+    return dt.datetime(i_key // 10000, i_key // 100 % 100, i_key % 100)
+
+# one pass over the orders: first and last order date, symbols traded, number
+# of orders and whether the file is already in date order
+def scan_orders(infile):
+    i_first, i_last, i_prev = None, None, None
+    ls_symbols = set()
+    i_orders = 0
+    b_sorted = True
+    for row in read_rows(infile):
+        i_key = order_key(row)
+        if i_prev is not None and i_key < i_prev:
+            b_sorted = False
+        if i_first is None or i_key < i_first:
+            i_first = i_key
+        if i_last is None or i_key > i_last:
+            i_last = i_key
+        i_prev = i_key
+        ls_symbols.add(row[3])
+        i_orders += 1
+    return i_first, i_last, ls_symbols, i_orders, b_sorted
+
+def write_run(run, s_tmpdir=None):
+    i_fd, s_path = tempfile.mkstemp(suffix=".csv", dir=s_tmpdir)
+    f = os.fdopen(i_fd, "wb")
+    try:
+        writer = csv.writer(f,delimiter=',')
+        for i_key, i_seq, row in sorted(run):
+            writer.writerow([i_key, i_seq] + row)
+    finally:
+        f.close()
+    return s_path
+
+def read_run(s_path):
+    f = open(s_path,"rb")
+    try:
+        for row in csv.reader(f):
+            yield int(row[0]), int(row[1]), row[2:]
+    finally:
+        f.close()
+
+# external merge sort of the orders in infile into outfile by date, keeping
+# same day orders in file order; at most i_run orders are held in memory
+def sort_orders(infile, outfile, i_run=500000, s_tmpdir=None):
+    runs = []
+    try:
+        run = []
+        for i_seq, row in enumerate(read_rows(infile)):
+            run.append((order_key(row), i_seq, row))
+            if len(run) == i_run:
+                runs.append(write_run(run, s_tmpdir))
+                run = []
+        if len(run) > 0:
+            runs.append(write_run(run, s_tmpdir))
+
+        f = open(outfile,"wb")
+        try:
+            writer = csv.writer(f,delimiter=',')
+            for i_key, i_seq, row in heapq.merge(*[read_run(s_path) for s_path in runs]):
+                writer.writerow(row)
+        finally:
+            f.close()
+    finally:
+        for s_path in runs:
+            os.remove(s_path)
+
+# advance the fund one trading day at a time over date ordered order rows,
+# updating portfolio in place and yielding [year, month, day, value] as soon
+# as each day is complete.  Orders on non-trading days are skipped, the same
+# as marketsim.process_stock_orders.
+def iter_fund(portfolio, rows, ldt_timestamps, df_close):
+    na_price = df_close.values
+    d_column = dict((str(s_sym).upper(), j) for j, s_sym in enumerate(df_close.columns))
+    rows = iter(rows)
+    row = next(rows, None)
+
+    for i, timestamp in enumerate(ldt_timestamps):
+        i_day = timestamp.year * 10000 + timestamp.month * 100 + timestamp.day
+        while row is not None and order_key(row) < i_day:
+            row = next(rows, None)
+
+        while row is not None and order_key(row) == i_day:
+            order_stock = str(row[3]).upper()
+            order_type  = str(row[4]).upper()
+            order_quantity = float(row[5])
+            order_price = na_price[i, d_column[order_stock]]
+            if order_type == "BUY":
+                portfolio["cash"] -= float(order_quantity * order_price)
+                portfolio[order_stock] = portfolio.get(order_stock, 0.0) + order_quantity
+            elif order_type == "SELL":
+                portfolio["cash"] += float(order_quantity * order_price)
+                portfolio[order_stock] = portfolio.get(order_stock, 0.0) - order_quantity
+            row = next(rows, None)
+
+        total = float(0.0)
+        for stock in portfolio.keys():
+            if stock == "cash":
+                total += float(portfolio[stock])
+            else:
+                total += float(portfolio[stock]) * float(na_price[i, d_column[stock]])
+        yield [timestamp.year, timestamp.month, timestamp.day, total]
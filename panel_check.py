@@ -0,0 +1,117 @@
+'''
+File:   panel_check.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Price panel frames against a fresh read of the csv files
+
+Reads a stock list through the panel in -d (pricepanel.PricePanel.frames)
+and straight from the csv files (stockdb.read_files and fill_data), for the
+whole range and for windows starting -w days apart, so every window starts
+at a different place in the symbols' gaps, and compares every field and
+every field's fill mask.  The panel must have been ingested over a range
+that covers -b to -e.
+
+panel_check.py -b 2008 -e 2009 -s sp5002012 -w 50 -d /data/panel
+'''
+
+import datetime as dt
+import numpy as np
+import stockdb
+import pricepanel
+import tradingcalendar as tc
+import sys, getopt
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+    i_step = 50
+    panel_dir = pricepanel.PANEL_DIR
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:w:d:",["begin=","end=","stock=","window=","dir="])
+    except getopt.GetoptError:
+        print "panel_check.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -w <window_step> -d <panel_dir>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "panel_check.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -w <window_step> -d <panel_dir>"
+            print "panel_check.py -b 2008 -e 2009 -s sp5002012 -w 50 -d /data/panel"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-w','--window'):
+            i_step = int(arg)
+        elif opt in ('-d','--dir'):
+            panel_dir = arg
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"window=",i_step,"dir=",panel_dir
+    return dt_begin,dt_end,stocks,i_step,panel_dir
+
+# largest |panel - fresh| of every field and the number of fill mask cells
+# that differ, over one window of timestamps
+def compare_window(panel, dataobj, ldt_timestamps, ls_symbols, ls_keys):
+    d_panel = panel.frames(ldt_timestamps, ls_symbols, ls_keys)
+    if d_panel is None:
+        return None
+    d_raw = stockdb.read_files(dataobj, ldt_timestamps, ls_symbols, ls_keys)
+    d_fresh = stockdb.fill_data(d_raw, ls_keys)
+    rows = panel.rows(ldt_timestamps)
+    columns = panel.columns(ls_symbols)
+
+    d_diff = {}
+    for s_key in ls_keys:
+        f_max = np.abs(d_panel[s_key].values - d_fresh[s_key].values).max()
+        i_mask = int((panel.fill_mask(rows, columns, s_key) != d_raw[s_key].isnull().values).sum())
+        d_diff[s_key] = (f_max, i_mask)
+    return d_diff
+
+def main(argv):
+    print "panel_check.py main routine\n"
+    dt_begin, dt_end, stocks, i_step, panel_dir = get_cmdline_options(argv)
+
+    panel = pricepanel.get_panel(panel_dir)
+    if panel is None:
+        print "Error: no panel in", panel_dir
+        sys.exit(2)
+    dataobj = stockdb.get_dataobj()
+    if "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+    ls_symbols = [s_sym for s_sym in ls_symbols if s_sym in panel.d_column]
+    ls_keys = [s_key for s_key in stockdb.LS_KEYS if s_key in panel.ls_keys]
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end + dt.timedelta(days=1), dt.timedelta(hours=16))
+    if panel.stale(ls_symbols, lambda s_sym: stockdb.symbol_mtime(dataobj, s_sym)):
+        print "Error: the csv files changed since the panel was ingested"
+        sys.exit(2)
+
+    d_worst = dict((s_key, (0.0, 0)) for s_key in ls_keys)
+    i_windows = 0
+    for i_start in range(0, len(ldt_timestamps), i_step):
+        d_diff = compare_window(panel, dataobj, ldt_timestamps[i_start:], ls_symbols, ls_keys)
+        if d_diff is None:
+            print "Error: the panel does not cover %s to %s with per field fill masks" % \
+                  (ldt_timestamps[i_start].date(), ldt_timestamps[-1].date())
+            sys.exit(2)
+        for s_key in ls_keys:
+            d_worst[s_key] = (max(d_worst[s_key][0], d_diff[s_key][0]), d_worst[s_key][1] + d_diff[s_key][1])
+        i_windows += 1
+
+    print
+    print "%d symbols, %d windows from %s to %s" % (len(ls_symbols), i_windows, ldt_timestamps[0].date(),
+                                                    ldt_timestamps[-1].date())
+    print "%-14s %14s %14s" % ("field", "max |diff|", "mask cells")
+    for s_key in ls_keys:
+        print "%-14s %14.3g %14d" % (s_key, d_worst[s_key][0], d_worst[s_key][1])
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
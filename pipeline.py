@@ -0,0 +1,193 @@
+'''
+File:   pipeline.py
+Class:  Computation Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Bollinger trade, market simulation and analysis in one process
+
+Runs bollinger_trade.py, marketsim.py and analyze.py as one chain on a
+single d_data load: the prices of the symbols, SPY and the benchmarks are
+read once, the Bollinger events become a typed orderstore table, the table
+is simulated with marketsim's array engine and the fund values are scored
+against the benchmarks with analyze.calc_stats.  No file is written or read
+between the stages; the orders and values csv files are only written when
+--orders / --values are given, in the chain's csv formats (the orders in date
+order rather than each Buy followed by its Sell).
+
+Like marketsim.py the fund values run from the first to the last order day.
+
+pipeline.py -b 2008 -e 2009 -s sp5002012 -k $SPX -c 100000 --orders bollinger_trade.csv --values bollinger_values.csv
+'''
+
+import datetime as dt
+import numpy as np
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import bollinger_bands as bb
+import event_engine as ee
+import orderstore
+import marketsim
+import analyze
+import sys, getopt
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+    benchmark = '$SPX'
+    cash = 100000.0
+    i_window = 20
+    f_market = 1.5
+    f_value = -2.0
+    i_hold = 5
+    i_shares = 100
+    ordersfile = None
+    valuesfile = None
+
+    s_usage = "pipeline.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -k <benchmarks> -c <cash> -w <window> " \
+              "-m <market_value> -v <entry_value> -d <hold_days> -q <shares> [--orders <orders.csv>] [--values <values.csv>]"
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:k:c:w:m:v:d:q:",["begin=","end=","stock=","benchmark=","cash=","window=",
+                                   "market=","value=","hold=","shares=","orders=","values="])
+    except getopt.GetoptError:
+        print s_usage
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print s_usage
+            print "pipeline.py -b 2008 -e 2009 -s sp5002012 -k $SPX -c 100000 --values bollinger_values.csv"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-k','--benchmark'):
+            benchmark = str(arg)
+        elif opt in ('-c','--cash'):
+            cash = float(arg)
+        elif opt in ('-w','--window'):
+            i_window = int(arg)
+        elif opt in ('-m','--market'):
+            f_market = float(arg)
+        elif opt in ('-v','--value'):
+            f_value = float(arg)
+        elif opt in ('-d','--hold'):
+            i_hold = int(arg)
+        elif opt in ('-q','--shares'):
+            i_shares = int(arg)
+        elif opt == '--orders':
+            ordersfile = arg
+        elif opt == '--values':
+            valuesfile = arg
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+
+    if dt_begin > dt_end:
+        print "Error: begining date must be before ending date"
+        sys.exit(2)
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"benchmark=",benchmark,"cash=",cash
+    d_params = { 'window' : i_window, 'market' : f_market, 'value' : f_value, 'hold' : i_hold, 'shares' : i_shares }
+    return dt_begin,dt_end,stocks,benchmark.split(","),cash,d_params,ordersfile,valuesfile
+
+# read the symbols, SPY and the benchmarks from Yahoo in one load; a comma
+# separated list of symbols is used as is, anything else is a symbol list name
+def read_stock_database(dt_begin,dt_end,stocks,ls_benchmarks):
+    print "read_stock_database"
+    dt_end +=dt.timedelta(days=1)
+
+    if "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+    if 'SPY' not in ls_symbols:
+        ls_symbols.append('SPY')
+    ls_load = ls_symbols + [s_sym for s_sym in ls_benchmarks if s_sym not in ls_symbols]
+
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end, dt.timedelta(hours=16))
+    d_data = stockdb.get_data(ldt_timestamps, ls_load).load(['close', 'actual_close'])
+
+    return ldt_timestamps, ls_symbols, d_data
+
+# bollinger_trade.py's orders as a typed table (sym indexes ls_symbols):
+# buy where SPY's value is at least f_market and the symbol's crosses below
+# f_value, leaving i_hold days at the end of the range for the sell
+def trade_orders(ldt_timestamps, ls_symbols, d_data, d_params):
+    i_hold = d_params['hold']
+    d_bands = bb.calc_bands(d_data['close'][ls_symbols], i_window=d_params['window'])
+    na_events = bb.event_mask(d_bands, ls_symbols.index('SPY'), f_market=d_params['market'],
+                              f_value=d_params['value'], b_strict=True)
+    na_events[max(len(ldt_timestamps)-i_hold, 0):, :] = False
+
+    na_days, na_syms = np.nonzero(na_events)
+    return ee.order_table(ldt_timestamps, na_days, na_syms, d_params['shares'], i_hold)
+
+# simulate the typed orders on the loaded close prices; returns the first and
+# last order day rows, the fund values between them and the final portfolio
+def simulate_orders(ldt_timestamps, ls_symbols, d_data, cash, na_orders):
+    ls_columns = [str(s_sym).upper() for s_sym in ls_symbols]
+    na_price = d_data['close'][ls_symbols].values
+    na_rows, na_columns, na_quantity, ls_traded = marketsim.table_orders(ldt_timestamps, ls_columns,
+                                                                          na_orders, ls_symbols)
+    na_value, na_holdings, na_cash = marketsim.fund_arrays(na_price, cash, na_rows, na_columns, na_quantity)
+
+    i_first, i_last = int(na_rows[0]), int(na_rows[-1])
+    portfolio = { "cash" : float(na_cash[i_last]) }
+    for s_sym in ls_traded:
+        portfolio[s_sym] = float(na_holdings[i_last, ls_columns.index(s_sym)])
+    return i_first, i_last, na_value[i_first:i_last + 1], portfolio
+
+def print_stats(ls_benchmarks, dt_first, dt_last, na_sharpe, na_total_return, na_std_dev, na_avg_daily_rets,
+                na_drawdown, na_sortino):
+    print "Details of the Performance of the portfolio :"
+    print
+    print "Data Range : %s to %s" % (dt_first.strftime("%B %d, %Y"), dt_last.strftime("%B %d, %Y"))
+    for j, s_name in enumerate(["Fund"] + ls_benchmarks):
+        print
+        print "Sharpe Ratio of %s : %0.12f" % (s_name, na_sharpe[j])
+        print "Total Return of %s : %0.12f" % (s_name, na_total_return[j])
+        print "Standard Deviation of %s : %0.12f" % (s_name, na_std_dev[j])
+        print "Average Daily Return of %s : %0.12f" % (s_name, na_avg_daily_rets[j])
+        print "Max Drawdown of %s : %0.12f" % (s_name, na_drawdown[j])
+        print "Sortino Ratio of %s : %0.12f" % (s_name, na_sortino[j])
+
+def main(argv):
+    print "pipeline.py main routine\n"
+    dt_begin, dt_end, stocks, ls_benchmarks, cash, d_params, ordersfile, valuesfile = \
+        get_cmdline_options(st.profile_argv(argv))
+    ldt_timestamps, ls_symbols, d_data = read_stock_database(dt_begin, dt_end, stocks, ls_benchmarks)
+
+    with st.stage('signal', rows=len(ldt_timestamps) * len(ls_symbols)) as span:
+        na_orders = trade_orders(ldt_timestamps, ls_symbols, d_data, d_params)
+        span['orders'] = len(na_orders)
+    print "orders:", len(na_orders)
+    if len(na_orders) == 0:
+        print "Error: no trades for", d_params
+        sys.exit(2)
+    if ordersfile is not None:
+        with st.stage('write', rows=len(na_orders)):
+            marketsim.write_csvfile(ordersfile, orderstore.table_rows(na_orders, ls_symbols))
+
+    with st.stage('simulate', rows=len(na_orders)):
+        i_first, i_last, na_fund, portfolio = simulate_orders(ldt_timestamps, ls_symbols, d_data, cash, na_orders)
+    ldt_fund = ldt_timestamps[i_first:i_last + 1]
+    if valuesfile is not None:
+        with st.stage('write', rows=len(na_fund)):
+            marketsim.write_csvfile(valuesfile, [[ts.year, ts.month, ts.day, float(f_value)]
+                                                 for ts, f_value in zip(ldt_fund, na_fund.tolist())])
+
+    with st.stage('analyze', rows=len(na_fund) * (len(ls_benchmarks) + 1)):
+        na_bench = d_data['actual_close'][ls_benchmarks].values[i_first:i_last + 1]
+        t_stats = analyze.calc_stats(np.column_stack([na_fund, na_bench]))
+    print
+    print_stats(ls_benchmarks, ldt_fund[0], ldt_fund[-1], *t_stats)
+    print
+    print portfolio
+    print "pipeline.py done"
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
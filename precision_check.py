@@ -0,0 +1,145 @@
+'''
+File:   precision_check.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Cost of the float32 storage mode against float64
+
+Loads a stock list once in float64 and stores it the way the 'float32'
+storage mode does (stockdb.store_frames: filling only copies values, so this
+is the same as a float32 read), then compares what the scripts compute from
+each: the stored fields, daily returns, Bollinger values and events, the
+per-symbol statistics of metrics.calc_metrics, and the fund values of the
+Bollinger strategy simulated with marketsim's array engine.  Prints the
+largest differences and the memory of both panels.
+
+precision_check.py -b 2008 -e 2009 -s sp5002012
+'''
+
+import datetime as dt
+import numpy as np
+import stockdb
+import tradingcalendar as tc
+import stagetimer as st
+import bollinger_bands as bb
+import event_engine as ee
+import marketsim
+import metrics
+import sys, getopt
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:",["begin=","end=","stock="])
+    except getopt.GetoptError:
+        print "precision_check.py -b <begin_year> -e <end_year> -s <stock_list|stocks>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "precision_check.py -b <begin_year> -e <end_year> -s <stock_list|stocks>"
+            print "precision_check.py -b 2008 -e 2009 -s sp5002012"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks
+    return dt_begin,dt_end,stocks
+
+# largest |a - b| / |b| over the finite values of b that are not 0
+def max_relative(na_a, na_b):
+    na_a = np.asarray(na_a, dtype=float)
+    na_b = np.asarray(na_b, dtype=float)
+    na_ok = np.isfinite(na_b) & np.isfinite(na_a) & (na_b != 0)
+    if not na_ok.any():
+        return 0.0
+    return float((np.abs(na_a[na_ok] - na_b[na_ok]) / np.abs(na_b[na_ok])).max())
+
+# largest |a - b| over the values finite in both
+def max_absolute(na_a, na_b):
+    na_a = np.asarray(na_a, dtype=float)
+    na_b = np.asarray(na_b, dtype=float)
+    na_ok = np.isfinite(na_b) & np.isfinite(na_a)
+    if not na_ok.any():
+        return 0.0
+    return float(np.abs(na_a[na_ok] - na_b[na_ok]).max())
+
+# Bollinger strategy fund values (bollinger_trade.py defaults) on the close
+# prices of d_data, simulated over the whole range
+def strategy_values(ldt_timestamps, ls_symbols, d_data, f_cash=100000.0):
+    d_bands = bb.calc_bands(d_data['close'][ls_symbols], i_window=20)
+    na_events = bb.event_mask(d_bands, ls_symbols.index('SPY'), f_market=1.5, f_value=-2.0, b_strict=True)
+    na_events[max(len(ldt_timestamps)-5, 0):, :] = False
+    na_days, na_syms = np.nonzero(na_events)
+    na_orders = ee.order_table(ldt_timestamps, na_days, na_syms, 100, 5)
+
+    ls_columns = [str(s_sym).upper() for s_sym in ls_symbols]
+    na_rows, na_columns, na_quantity, ls_traded = marketsim.table_orders(ldt_timestamps, ls_columns, na_orders, ls_symbols)
+    na_value, na_holdings, na_cash = marketsim.fund_arrays(d_data['close'][ls_symbols].values, f_cash,
+                                                           na_rows, na_columns, na_quantity)
+    return d_bands, na_events, na_value
+
+# table of (measure, max relative difference, max absolute difference) rows;
+# measures that cross 0 (returns, Bollinger values) have no relative difference
+def compare(ldt_timestamps, ls_symbols, d_64, d_32):
+    table = []
+    for s_key in stockdb.LS_KEYS:
+        table.append(["stored " + s_key, max_relative(d_32[s_key].values, d_64[s_key].values),
+                      max_absolute(d_32[s_key].values, d_64[s_key].values)])
+
+    na_close_64 = d_64['close'][ls_symbols].values
+    na_close_32 = d_32['close'][ls_symbols].values
+    na_rets_64 = ee.daily_returns(na_close_64)
+    na_rets_32 = ee.daily_returns(na_close_32.astype(float))
+    table.append(["daily return", None, max_absolute(na_rets_32, na_rets_64)])
+
+    d_metrics_64 = metrics.calc_metrics(na_close_64)
+    d_metrics_32 = metrics.calc_metrics(na_close_32)
+    for s_field in metrics.LS_FIELDS:
+        table.append([s_field, max_relative(d_metrics_32[s_field], d_metrics_64[s_field]),
+                      max_absolute(d_metrics_32[s_field], d_metrics_64[s_field])])
+
+    d_bands_64, na_events_64, na_value_64 = strategy_values(ldt_timestamps, ls_symbols, d_64)
+    d_bands_32, na_events_32, na_value_32 = strategy_values(ldt_timestamps, ls_symbols, d_32)
+    table.append(["bollinger value", None, max_absolute(d_bands_32['value'], d_bands_64['value'])])
+    table.append(["fund value", max_relative(na_value_32, na_value_64), max_absolute(na_value_32, na_value_64)])
+    return table, int(na_events_64.sum()), int((na_events_32 != na_events_64).sum())
+
+def main(argv):
+    print "precision_check.py main routine\n"
+    dt_begin, dt_end, stocks = get_cmdline_options(st.profile_argv(argv))
+
+    if "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+    if 'SPY' not in ls_symbols:
+        ls_symbols.append('SPY')
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end + dt.timedelta(days=1), dt.timedelta(hours=16))
+
+    d_64 = stockdb.get_data(ldt_timestamps, ls_symbols, b_lazy=False, s_dtype='float64')
+    d_32 = stockdb.store_frames(d_64, 'float32')
+
+    with st.stage('compute', rows=len(ldt_timestamps) * len(ls_symbols)):
+        table, i_events, i_flipped = compare(ldt_timestamps, ls_symbols, d_64, d_32)
+
+    print
+    print "%d symbols x %d days" % (len(ls_symbols), len(ldt_timestamps))
+    print "%-22s %14s %14s" % ("float32 vs float64", "max relative", "max absolute")
+    for s_name, f_rel, f_abs in table:
+        s_rel = "-" if f_rel is None else "%0.3e" % (f_rel)
+        print "%-22s %14s %14.3e" % (s_name, s_rel, f_abs)
+    print "bollinger events: %d, %d differ" % (i_events, i_flipped)
+    print "memory: float64 %0.1f MB, float32 %0.1f MB" % (st.data_bytes(d_64) / 1e6, st.data_bytes(d_32) / 1e6)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,332 @@
+'''
+File:   pricepanel.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Offline ingestion of the Yahoo database into a memory-mapped panel
+
+DataAccess('Yahoo') opens and parses one csv file per symbol on every read,
+and stockdb then repairs the gaps (ffill, bfill, 1.0) on every run.  This
+script converts the QSTK data directory once into a columnar panel in the
+panel directory (~/.qstk/panel, override with the QSPANEL environment
+variable):
+
+    panel.json   symbols, trading days and the mtime of every source csv file
+    days.npy     int64 day numbers (days since 1970-01-01) of the rows, a
+                 run of NYSE sessions
+    <key>.npy    float64 (days x symbols) array per stockdb field, in
+                 Fortran order so every symbol's series is contiguous, gaps
+                 already filled
+    fill_<key>.npy  uint8 (symbols x days/8) bitmask per field, np.packbits
+                 of the cells the symbol's file has no value of the field
+                 for (no row, or nan in that column), i.e. synthesized by
+                 the fill
+
+Readers memory-map the arrays (copy-on-write).  A date range is a row slice
+and a run of symbols in panel order is a column slice, both views of the
+file; any other symbol subset reads only those symbols' columns.  Filling
+the whole history first and slicing afterwards differs from a fresh read of
+the slice only before each symbol's first real price in the slice (the
+fresh read back fills it, or uses 1.0), so frames() redoes just those
+cells, using the field's own mask: a file can have a close but no volume
+for a day, so one mask for every field would not match the fresh read.
+Panels written before the masks were per field fall back to the csv files.  stockdb.get_data() serves a request from the panel
+when it covers the symbols and days (at 16:00, like DataAccess) and no
+source file changed since the ingestion.
+
+pricepanel.py -s all
+pricepanel.py -s sp5002012 -b 2008 -e 2009 -d /data/panel_sp5002012
+'''
+
+import lazyimport
+import numpy as np
+import datetime as dt
+import tradingcalendar as tc
+import stagetimer as st
+import json
+import shutil
+import sys, getopt
+import os
+
+pd = lazyimport.module('pandas')
+da = lazyimport.module('QSTK.qstkutil.DataAccess')
+
+# the stockdb fields and their column in a Yahoo csv file
+# (Date,Open,High,Low,Close,Volume,Adj Close; close is the adjusted close)
+LS_KEYS = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
+D_COLUMNS = { 'open' : 1, 'high' : 2, 'low' : 3, 'actual_close' : 4, 'volume' : 5, 'close' : 6 }
+
+# default panel directory, override with the QSPANEL environment variable;
+# QSPANEL set to an empty string turns the panel off
+PANEL_DIR = os.environ.get('QSPANEL', os.path.join(os.path.expanduser('~'), '.qstk', 'panel'))
+
+# get command line options
+def get_cmdline_options(argv):
+    stocks = 'all'
+    begin = None
+    end = None
+    panel_dir = PANEL_DIR
+
+    try:
+        opts, args = getopt.getopt(argv,"hs:b:e:d:",["stock=","begin=","end=","dir="])
+    except getopt.GetoptError:
+        print "pricepanel.py -s <all|stock_list|stocks> -b <begin_year> -e <end_year> -d <panel_dir>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "pricepanel.py -s <all|stock_list|stocks> -b <begin_year> -e <end_year> -d <panel_dir>"
+            print "without -b / -e the panel spans the first to the last date of the files"
+            print "pricepanel.py -s all"
+            print "pricepanel.py -s sp5002012 -b 2008 -e 2009 -d /data/panel_sp5002012"
+            sys.exit()
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-b','--begin'):
+            begin = dt.datetime(int(arg), 1, 1)
+        elif opt in ('-e','--end'):
+            end = dt.datetime(int(arg), 12, 31)
+        elif opt in ('-d','--dir'):
+            panel_dir = arg
+
+    print "cmdline options: stocks=",stocks,"begin=",begin,"end=",end,"dir=",panel_dir
+    return stocks,begin,end,panel_dir
+
+# day numbers of csv date strings, yyyy-mm-dd or the m/d/yy DataAccess also reads
+def parse_days(na_dates):
+    try:
+        return np.array(na_dates, dtype='datetime64[D]').astype(np.int64)
+    except ValueError:
+        return np.array([tc.day_number(dt.datetime.strptime(s_date, '%m/%d/%y')) for s_date in na_dates],
+                        dtype=np.int64)
+
+# day numbers and (rows x LS_KEYS) values of a symbol's csv file, oldest row
+# first; of two rows for one day the later one in the file is kept, as in
+# DataAccess which reads the file bottom up
+def read_symbol(s_file):
+    df_file = pd.read_csv(s_file, header=0, usecols=range(7), dtype={0 : str}, float_precision='round_trip')
+    na_days = parse_days(df_file.iloc[::-1, 0].values)
+    na_values = df_file.iloc[::-1, [D_COLUMNS[s_key] for s_key in LS_KEYS]].values.astype(float)
+    na_days, na_first = np.unique(na_days, return_index=True)
+    return na_days, na_values[na_first]
+
+# forward fill, back fill and 1.0 down the columns of a (days x symbols)
+# array in place, the same as stockdb.fill_data(); na_real marks the cells
+# that have a value
+def fill_columns(na_values, na_real):
+    i_days = na_values.shape[0]
+    na_index = np.where(na_real, np.arange(i_days).reshape(-1, 1), 0)
+    np.maximum.accumulate(na_index, axis=0, out=na_index)
+    na_has_prev = np.maximum.accumulate(na_real, axis=0)
+    na_ffill = na_values[na_index, np.arange(na_values.shape[1])]
+
+    na_next = np.where(na_real, np.arange(i_days).reshape(-1, 1), i_days - 1)
+    na_next = np.minimum.accumulate(na_next[::-1], axis=0)[::-1]
+    na_bfill = na_values[na_next, np.arange(na_values.shape[1])]
+
+    na_any = na_real.any(axis=0)
+    na_values[:] = np.where(na_has_prev, na_ffill, np.where(na_any, na_bfill, 1.0))
+    return na_values
+
+# modification times of the symbols' csv files, the stamps stockdb checks
+def source_mtimes(dataobj, ls_symbols):
+    d_sources = {}
+    for s_sym in ls_symbols:
+        s_file = dataobj.getPathOfCSVFile(s_sym)
+        if s_file is not None:
+            d_sources[s_sym] = os.path.getmtime(s_file)
+    return d_sources
+
+# read every symbol's csv file into (days x symbols) arrays over the NYSE
+# sessions from dt_begin to dt_end (default: the dates of the files), fill
+# the gaps and write the panel to s_dir
+def ingest(dataobj, ls_symbols, s_dir, dt_begin=None, dt_end=None):
+    calendar = tc.get_calendar()
+    d_sources = source_mtimes(dataobj, ls_symbols)
+    ls_symbols = [s_sym for s_sym in ls_symbols if s_sym in d_sources]
+
+    with st.stage('read', symbols=len(ls_symbols)) as span:
+        l_files = [read_symbol(dataobj.getPathOfCSVFile(s_sym)) for s_sym in ls_symbols]
+        span['rows'] = sum(len(na_days) for na_days, na_values in l_files)
+
+    if dt_begin is None:
+        dt_begin = tc.day_date(min(na_days[0] for na_days, na_values in l_files if len(na_days) > 0))
+    if dt_end is None:
+        dt_end = tc.day_date(max(na_days[-1] for na_days, na_values in l_files if len(na_days) > 0))
+    i_begin, i_end = calendar.day_range(tc.day_number(dt_begin), tc.day_number(dt_end))
+    panel_index = calendar.window(i_begin, i_end)
+    i_days = len(panel_index)
+
+    with st.stage('fill', rows=i_days * len(ls_symbols)):
+        d_arrays = dict((s_key, np.empty((i_days, len(ls_symbols)), order='F')) for s_key in LS_KEYS)
+        for s_key in LS_KEYS:
+            d_arrays[s_key][:] = np.NAN
+        for j, (na_days, na_values) in enumerate(l_files):
+            na_rows = panel_index.rows(na_days)
+            na_in = na_rows >= 0
+            for k, s_key in enumerate(LS_KEYS):
+                d_arrays[s_key][na_rows[na_in], j] = na_values[na_in, k]
+        d_fill = {}
+        for s_key in LS_KEYS:
+            na_real = ~np.isnan(d_arrays[s_key])
+            d_fill[s_key] = np.packbits(~na_real.T, axis=1)
+            fill_columns(d_arrays[s_key], na_real)
+
+    with st.stage('write', bytes=sum(na.nbytes for na in d_arrays.values())):
+        d_meta = { 'symbols' : ls_symbols, 'keys' : LS_KEYS, 'masks' : LS_KEYS, 'days' : i_days,
+                   'first_day' : int(panel_index.na_days[0]), 'last_day' : int(panel_index.na_days[-1]),
+                   'sources' : d_sources, 'created' : dt.datetime.now().isoformat() }
+        d_arrays['days'] = np.array(panel_index.na_days, dtype=np.int64)
+        for s_key in LS_KEYS:
+            d_arrays['fill_' + s_key] = d_fill[s_key]
+        write_panel(s_dir, d_arrays, d_meta)
+    return d_meta
+
+# write the arrays and panel.json into a new directory and swap it in place
+# of s_dir, so readers never see half a panel
+def write_panel(s_dir, d_arrays, d_meta):
+    s_dir = os.path.abspath(s_dir)
+    s_new = s_dir + ".new"
+    s_old = s_dir + ".old"
+    for s_path in (s_new, s_old):
+        if os.path.isdir(s_path):
+            shutil.rmtree(s_path)
+    os.makedirs(s_new)
+    for s_name, na_array in d_arrays.items():
+        np.save(os.path.join(s_new, s_name + ".npy"), na_array)
+    f = open(os.path.join(s_new, "panel.json"), "w")
+    try:
+        json.dump(d_meta, f)
+    finally:
+        f.close()
+    if os.path.isdir(s_dir):
+        os.rename(s_dir, s_old)
+    os.rename(s_new, s_dir)
+    if os.path.isdir(s_old):
+        shutil.rmtree(s_old)
+
+class PricePanel(object):
+    def __init__(self, s_dir):
+        f = open(os.path.join(s_dir, "panel.json"), "r")
+        try:
+            d_meta = json.load(f)
+        finally:
+            f.close()
+        self.s_dir = s_dir
+        self.ls_symbols = [str(s_sym) for s_sym in d_meta['symbols']]
+        self.ls_keys = [str(s_key) for s_key in d_meta['keys']]
+        self.ls_masks = [str(s_key) for s_key in d_meta.get('masks', [])]
+        self.d_sources = dict((str(s_sym), f_mtime) for s_sym, f_mtime in d_meta['sources'].items())
+        self.d_column = dict((s_sym, j) for j, s_sym in enumerate(self.ls_symbols))
+        self.i_days = d_meta['days']
+        self.index = tc.DayIndex(np.load(os.path.join(s_dir, "days.npy")))
+        self.d_arrays = {}
+
+    # the memory-mapped array of a field ('fill_<key>' for its packed mask)
+    def array(self, s_key):
+        if s_key not in self.d_arrays:
+            self.d_arrays[s_key] = np.load(os.path.join(self.s_dir, s_key + ".npy"), mmap_mode='c')
+        return self.d_arrays[s_key]
+
+    # row slice of the panel for ldt_timestamps, None unless they are
+    # consecutive panel days at 16:00 (DataAccess matches rows at 16:00 only)
+    def rows(self, ldt_timestamps):
+        if len(ldt_timestamps) == 0:
+            return None
+        i_begin = self.index.row(tc.day_number(ldt_timestamps[0]))
+        i_end = i_begin + len(ldt_timestamps)
+        if i_begin < 0 or i_end > self.i_days:
+            return None
+        if not np.array_equal(self.index.na_days[i_begin:i_end], tc.timestamp_days(ldt_timestamps)):
+            return None
+        if any((ts.hour, ts.minute, ts.second, ts.microsecond) != (16, 0, 0, 0) for ts in ldt_timestamps):
+            return None
+        return slice(i_begin, i_end)
+
+    # column slice for a run of symbols in panel order, else the column
+    # indices; None if a symbol is not in the panel
+    def columns(self, ls_symbols):
+        if len(ls_symbols) == 0 or any(s_sym not in self.d_column for s_sym in ls_symbols):
+            return None
+        j_begin = self.d_column[ls_symbols[0]]
+        if self.ls_symbols[j_begin:j_begin + len(ls_symbols)] == list(ls_symbols):
+            return slice(j_begin, j_begin + len(ls_symbols))
+        return np.array([self.d_column[s_sym] for s_sym in ls_symbols])
+
+    # True if the source file of a symbol changed since the ingestion;
+    # f_mtime(s_sym) is the file's modification time now, None if missing
+    def stale(self, ls_symbols, f_mtime):
+        for s_sym in ls_symbols:
+            if f_mtime(s_sym) != self.d_sources.get(s_sym):
+                return True
+        return False
+
+    # (days x symbols) bool array of the synthesized cells of a field
+    def fill_mask(self, rows, columns, s_key='close'):
+        na_packed = self.array('fill_' + s_key)[columns]
+        return np.unpackbits(na_packed, axis=1)[:, rows].T.astype(bool)
+
+    # (days x symbols) values of a field as a fresh read of the slice would
+    # fill them: a view of the file unless a symbol's first rows are synthesized
+    def values(self, s_key, rows, columns, na_fill=None):
+        na_values = self.array(s_key)[rows, columns]
+        if na_fill is None:
+            na_fill = self.fill_mask(rows, columns, s_key)
+        na_lead = na_fill[0]
+        if na_lead.any():
+            na_values = np.array(na_values, order='F')
+            for j in np.nonzero(na_lead)[0]:
+                na_real = np.nonzero(~na_fill[:, j])[0]
+                if len(na_real) == 0:
+                    na_values[:, j] = 1.0
+                else:
+                    na_values[:na_real[0], j] = na_values[na_real[0], j]
+        return na_values
+
+    # the filled frames of ls_keys, or None if the panel does not cover the
+    # request
+    def frames(self, ldt_timestamps, ls_symbols, ls_keys):
+        rows = self.rows(ldt_timestamps)
+        columns = self.columns(ls_symbols)
+        if rows is None or columns is None or any(s_key not in self.ls_masks for s_key in ls_keys):
+            return None
+        d_data = {}
+        for s_key in ls_keys:
+            d_data[s_key] = pd.DataFrame(self.values(s_key, rows, columns), index=ldt_timestamps,
+                                         columns=ls_symbols, copy=False)
+        return d_data
+
+_panel = None
+_panel_dir = None
+
+# the panel in s_dir, opened once per process; None if there is none
+def get_panel(s_dir=None):
+    global _panel, _panel_dir
+    if s_dir is None:
+        s_dir = PANEL_DIR
+    if not s_dir or not os.path.exists(os.path.join(s_dir, "panel.json")):
+        return None
+    if _panel is None or _panel_dir != s_dir:
+        _panel = PricePanel(s_dir)
+        _panel_dir = s_dir
+    return _panel
+
+def main(argv):
+    print "pricepanel.py main routine\n"
+    stocks, dt_begin, dt_end, panel_dir = get_cmdline_options(st.profile_argv(argv))
+
+    dataobj = da.DataAccess('Yahoo', cachestalltime=0)
+    if stocks == 'all':
+        ls_symbols = sorted(dataobj.get_all_symbols())
+    elif "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = dataobj.get_symbols_from_list(stocks)
+    if 'SPY' not in ls_symbols:
+        ls_symbols.append('SPY')
+
+    d_meta = ingest(dataobj, ls_symbols, panel_dir, dt_begin, dt_end)
+    print "%d symbols x %d days (%s to %s) written to %s" % (len(d_meta['symbols']), d_meta['days'],
+          tc.day_date(d_meta['first_day']), tc.day_date(d_meta['last_day']), panel_dir)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
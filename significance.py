@@ -0,0 +1,286 @@
+'''
+File:   significance.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Bootstrap and permutation significance of Sharpe ratios
+
+analyze.py prints one Sharpe ratio for the fund and each benchmark.  This
+script resamples the daily returns of the same series to tell whether the
+fund's Sharpe ratio and its difference from a benchmark are more than noise:
+
+    iid          i.i.d. bootstrap, days drawn with replacement
+    block        stationary block bootstrap (Politis and Romano): blocks
+                 start at random days, have geometric lengths of mean -l
+                 days and wrap around the end, which keeps the short term
+                 dependence of the returns
+    permutation  paired permutation test of fund against benchmark: each
+                 day's fund and benchmark returns are swapped with
+                 probability 1/2, the null being that the two are
+                 exchangeable
+
+The bootstraps draw the same days for the fund and every benchmark, so
+their correlation is kept.  Each method generates its resamples as
+(resamples x days) index or swap matrices, in chunks of about 4M cells
+handed to a process pool; each chunk has its own RandomState seeded from
+-s, so the results do not depend on the number of processes.  Sharpe
+ratios are computed like metrics.calc_metrics (the first day's zero return
+counts), so the observed ratios are the ones analyze.py prints.
+
+The bootstrap reports the std and percentile interval of each Sharpe
+ratio and of each difference, with the two sided p-value of a zero
+difference from the centered resampled differences; the permutation test
+reports the fraction of swapped differences at least as large as the
+observed one.
+
+significance.py -i values.csv -k \$SPX -n 10000 -l 20 -p 4 -s 0
+'''
+
+import numpy as np
+import multiprocessing as mp
+import analyze
+import metrics
+import stagetimer as st
+import math
+import time
+import sys, getopt
+
+LS_METHODS = ['iid', 'block', 'permutation']
+
+# get command line options
+def get_cmdline_options(argv):
+    infile = "values.csv"
+    benchmark = "$SPX"
+    i_resamples = 10000
+    f_block = None
+    i_procs = mp.cpu_count()
+    i_seed = 0
+    f_conf = 0.95
+    ls_methods = list(LS_METHODS)
+
+    s_usage = "significance.py -i <values.csv> -k <benchmark[,benchmark...]> -n <resamples> -l <block_days> " \
+              "-m <iid,block,permutation> -p <processes> -s <seed> -c <confidence>"
+    try:
+        opts, args = getopt.getopt(argv,"hi:k:n:l:m:p:s:c:",["infile=","benchmark=","resamples=","block=","methods=",
+                                   "procs=","seed=","confidence="])
+    except getopt.GetoptError:
+        print s_usage
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print s_usage
+            print "the mean block length defaults to the cube root of the number of days"
+            print "significance.py -i values.csv -k \$SPX -n 10000 -l 20 -p 4 -s 0"
+            sys.exit()
+        elif opt in ('-i','--infile'):
+            infile = arg
+        elif opt in ('-k','--benchmark'):
+            benchmark = arg
+        elif opt in ('-n','--resamples'):
+            i_resamples = int(arg)
+        elif opt in ('-l','--block'):
+            f_block = float(arg)
+        elif opt in ('-m','--methods'):
+            ls_methods = arg.split(",")
+        elif opt in ('-p','--procs'):
+            i_procs = int(arg)
+        elif opt in ('-s','--seed'):
+            i_seed = int(arg)
+        elif opt in ('-c','--confidence'):
+            f_conf = float(arg)
+
+    if any(s_method not in LS_METHODS for s_method in ls_methods):
+        print "Error: methods must be among", ", ".join(LS_METHODS)
+        sys.exit(2)
+    if i_resamples < 1 or not 0.0 < f_conf < 1.0 or (f_block is not None and f_block < 1.0):
+        print "Error: resamples must be positive, confidence between 0 and 1 and the block length at least 1 day"
+        sys.exit(2)
+    print "cmdline options: infile=",infile,"benchmark=",benchmark,"resamples=",i_resamples,"block=",f_block, \
+          "methods=",ls_methods,"procs=",i_procs,"seed=",i_seed
+    return infile,benchmark,i_resamples,f_block,ls_methods,i_procs,i_seed,f_conf
+
+# Sharpe ratios of return samples along axis 1, as metrics.block_metrics
+# computes them: the first day's zero return counts toward mean and std
+def sharpe_ratios(na_rets, i_trading=252):
+    i_days = na_rets.shape[1] + 1
+    na_avg = na_rets.sum(axis=1) / i_days
+    na_dev = na_rets - np.expand_dims(na_avg, 1)
+    na_dev *= na_dev
+    na_std = np.sqrt((na_dev.sum(axis=1) + na_avg * na_avg) / i_days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return math.sqrt(i_trading) * na_avg / na_std
+
+# (count x days) day indices of i.i.d. bootstrap resamples
+def iid_indices(rng, i_count, i_len):
+    return rng.randint(0, i_len, size=(i_count, i_len))
+
+# (count x days) day indices of stationary bootstrap resamples: a block
+# starts on each day with probability 1/f_block at a random day, otherwise
+# the previous block continues, wrapping around the end
+def block_indices(rng, i_count, i_len, f_block):
+    na_new = rng.random_sample((i_count, i_len)) < 1.0 / f_block
+    na_new[:, 0] = True
+    na_day = np.arange(i_len)
+    na_last = np.maximum.accumulate(np.where(na_new, na_day, 0), axis=1)
+    na_start = rng.randint(0, i_len, size=(i_count, i_len))
+    na_first = na_start[np.arange(i_count)[:, np.newaxis], na_last]
+    return (na_first + na_day - na_last) % i_len
+
+# worker state: the (days x series) returns, fund first, and the parameters
+_na_rets = None
+_f_block = None
+_i_trading = None
+
+def init_worker(na_rets, f_block, i_trading):
+    global _na_rets, _f_block, _i_trading
+    _na_rets = na_rets
+    _f_block = f_block
+    _i_trading = i_trading
+
+# one chunk of resamples, (method, seed, count).  The bootstraps return the
+# (count x series) Sharpe ratios, the permutation test the (count x
+# benchmarks) differences of fund and benchmark Sharpe ratios.
+def run_chunk(task):
+    s_method, i_seed, i_count = task
+    rng = np.random.RandomState(i_seed)
+    i_len, i_series = _na_rets.shape
+
+    if s_method == 'permutation':
+        na_swap = rng.random_sample((i_count, i_len)) < 0.5
+        na_fund = _na_rets[:, 0]
+        na_diff = np.empty((i_count, i_series - 1))
+        for j in range(1, i_series):
+            na_bench = _na_rets[:, j]
+            na_diff[:, j - 1] = sharpe_ratios(np.where(na_swap, na_bench, na_fund), _i_trading) - \
+                                sharpe_ratios(np.where(na_swap, na_fund, na_bench), _i_trading)
+        return na_diff
+
+    if s_method == 'iid':
+        na_index = iid_indices(rng, i_count, i_len)
+    else:
+        na_index = block_indices(rng, i_count, i_len, _f_block)
+    return sharpe_ratios(_na_rets[na_index], _i_trading)
+
+# chunks of resamples of about i_cells cells, each with a seed drawn from i_seed
+def chunk_tasks(s_method, i_resamples, i_len, i_series, i_seed, i_cells=4000000):
+    i_chunk = max(1, int(i_cells // max(i_len * i_series, 1)))
+    li_sizes = [min(i_chunk, i_resamples - i_start) for i_start in range(0, i_resamples, i_chunk)]
+    na_seeds = np.random.RandomState(i_seed).randint(0, 2**31 - 1, size=len(li_sizes))
+    return [(s_method, int(i_chunk_seed), i_size) for i_chunk_seed, i_size in zip(na_seeds, li_sizes)]
+
+# i_resamples rows of run_chunk results for one method, the chunks spread
+# over i_procs processes
+def resample(s_method, na_rets, i_resamples, f_block=None, i_procs=1, i_seed=0, i_trading=252):
+    na_rets = np.ascontiguousarray(na_rets, dtype=float)
+    if f_block is None:
+        f_block = len(na_rets) ** (1.0 / 3.0)
+    tasks = chunk_tasks(s_method, i_resamples, na_rets.shape[0], na_rets.shape[1], i_seed)
+    t_init = (na_rets, f_block, i_trading)
+    i_procs = min(i_procs, len(tasks))
+    if i_procs > 1:
+        pool = mp.Pool(i_procs, init_worker, t_init)
+        try:
+            l_results = pool.map(run_chunk, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        init_worker(*t_init)
+        l_results = [run_chunk(task) for task in tasks]
+    return np.concatenate(l_results, axis=0)
+
+# percentile interval of each column
+def percentile_interval(na_samples, f_conf=0.95):
+    f_tail = (1.0 - f_conf) / 2.0 * 100.0
+    return np.percentile(na_samples, [f_tail, 100.0 - f_tail], axis=0)
+
+# two sided p-value of a zero statistic: the fraction of the resampled
+# statistics, centered on the observed one, at least as far from zero
+def centered_pvalue(na_samples, na_observed):
+    na_extreme = np.abs(na_samples - na_observed) >= np.abs(na_observed)
+    return (1.0 + na_extreme.sum(axis=0)) / (len(na_samples) + 1.0)
+
+# two sided p-value of the observed statistic among permuted statistics
+def permutation_pvalue(na_samples, na_observed):
+    na_extreme = np.abs(na_samples) >= np.abs(na_observed)
+    return (1.0 + na_extreme.sum(axis=0)) / (len(na_samples) + 1.0)
+
+# result rows (method, name, observed, std, lower, upper, p-value) of one
+# method; ls_names are the series, fund first; None where not computed
+def summarize(s_method, ls_names, na_sharpe, na_samples, f_conf=0.95):
+    l_rows = []
+    na_diff = na_sharpe[0] - na_sharpe[1:]
+    ls_diffs = ["%s-%s" % (ls_names[0], s_name) for s_name in ls_names[1:]]
+    if s_method == 'permutation':
+        na_pvalue = permutation_pvalue(na_samples, na_diff)
+        for j, s_name in enumerate(ls_diffs):
+            l_rows.append((s_method, s_name, na_diff[j], None, None, None, na_pvalue[j]))
+        return l_rows
+
+    na_lower, na_upper = percentile_interval(na_samples, f_conf)
+    na_std = na_samples.std(axis=0)
+    for j, s_name in enumerate(ls_names):
+        l_rows.append((s_method, s_name, na_sharpe[j], na_std[j], na_lower[j], na_upper[j], None))
+    na_diff_samples = na_samples[:, :1] - na_samples[:, 1:]
+    na_lower, na_upper = percentile_interval(na_diff_samples, f_conf)
+    na_std = na_diff_samples.std(axis=0)
+    na_pvalue = centered_pvalue(na_diff_samples, na_diff)
+    for j, s_name in enumerate(ls_diffs):
+        l_rows.append((s_method, s_name, na_diff[j], na_std[j], na_lower[j], na_upper[j], na_pvalue[j]))
+    return l_rows
+
+# significance of a (days x series) value matrix, fund first: result rows of
+# every method in ls_methods and the seconds each method took
+def significance(na_values, ls_names, ls_methods=LS_METHODS, i_resamples=10000, f_block=None, i_procs=1,
+                 i_seed=0, f_conf=0.95, i_trading=252):
+    na_values = np.asarray(na_values, dtype=float)
+    na_sharpe = metrics.calc_metrics(na_values, i_trading=i_trading)['sharpe']
+    na_rets = na_values[1:] / na_values[:-1] - 1.0
+
+    l_rows = []
+    d_seconds = {}
+    for s_method in ls_methods:
+        t_start = time.time()
+        with st.stage(s_method, rows=i_resamples * na_rets.size, procs=i_procs):
+            na_samples = resample(s_method, na_rets, i_resamples, f_block, i_procs, i_seed, i_trading)
+        d_seconds[s_method] = time.time() - t_start
+        l_rows.extend(summarize(s_method, ls_names, na_sharpe, na_samples, f_conf))
+    return l_rows, d_seconds
+
+def print_rows(l_rows, f_conf=0.95):
+    print "%-12s %-20s %10s %10s %10s %10s %8s" % ("method", "series", "Sharpe", "std",
+                                                  "%0.0f%% low" % (f_conf * 100.0), "high", "p-value")
+    for row in l_rows:
+        ls_cells = ["-" if f is None else "%0.4f" % f for f in row[2:]]
+        print "%-12s %-20s %10s %10s %10s %10s %8s" % tuple([row[0], row[1][:20]] + ls_cells)
+
+def main(argv):
+    print "significance.py main routine\n"
+    infile, benchmark, i_resamples, f_block, ls_methods, i_procs, i_seed, f_conf = \
+        get_cmdline_options(st.profile_argv(argv))
+
+    # the fund values and the benchmark closes on the fund dates, as analyze.py
+    with st.stage('load values') as span:
+        np_values = analyze.read_csvfile(infile)
+        na_fund_day, na_fund = analyze.parse_values(np_values)
+        span['rows'] = len(na_fund)
+    ls_symbols = benchmark.split(",")
+    dt_begin, dt_end, ldt_timestamps, d_data = analyze.read_stock_database(np_values[0][0:3], np_values[-1][0:3],
+                                                                           ls_symbols)
+    na_bench, na_no_bench, na_no_fund = analyze.process_benchmark(ls_symbols, ldt_timestamps, d_data, na_fund_day)
+    na_common = ~np.isnan(na_bench).any(axis=1)
+    if not na_common.all():
+        print "using the %d of %d fund dates with benchmark data" % (na_common.sum(), len(na_common))
+    na_values = np.column_stack([na_fund[na_common], na_bench[na_common]])
+
+    l_rows, d_seconds = significance(na_values, ['fund'] + ls_symbols, ls_methods, i_resamples, f_block, i_procs,
+                                     i_seed, f_conf)
+    print
+    print_rows(l_rows, f_conf)
+    print
+    for s_method in ls_methods:
+        print "%-12s %d resamples of %d days in %0.2f s" % (s_method, i_resamples, len(na_values) - 1,
+                                                          d_seconds[s_method])
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
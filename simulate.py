@@ -12,51 +12,22 @@ Created on January, 24, 2013
 '''
 
 # QSTK Imports
-import QSTK.qstkutil.qsdateutil as du
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkutil.DataAccess as da
+import tradingcalendar as tc
+import stockdb
+import metrics
+import stagetimer as st
 
 # Third Party Imports
 import datetime as dt
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import math
+import sys
 
 print "Pandas Version", pd.__version__
 
-# normalize prices
-def normalize_data(prices):
-    return prices / prices[0, :]
-
-# given an array of prices, compute daily return for all stocks
-def daily_return(prices):
-    return tsu.returnize0(prices)
-
-# given daily return and allocations, compute average daily return for portfolio
-def avg_daily_return(daily_rets):
-    avg = daily_rets.mean()
-    return avg
-
-# given an array of prices, compute standard deviation of portfolio
-def std_dev(daily_rets):
-    std = daily_rets.std()
-    return std
-
-def sharpe_ratio(avg_daily_rets, std_dev_tp):
-    k = math.sqrt(252) # for daily returns (assume 252)
-    sharpe = k * avg_daily_rets / std_dev_tp
-    return sharpe
-
-def cumulative_return(na_rets):
-    cumul = 1 + np.subtract(na_rets[-1], na_rets[0])
-    return cumul
-    
 def simulate(startdate, enddate, ls_symbols, allocations):
     
-    #clear the cache
-    c_dataobj = da.DataAccess('Yahoo', cachestalltime=0)
-    
     # Start and End date of the charts
     dt_start = dt.datetime(startdate[0], startdate[1], startdate[2])
     dt_end   = dt.datetime(enddate[0],   enddate[1],   enddate[2])
@@ -65,24 +36,11 @@ def simulate(startdate, enddate, ls_symbols, allocations):
     dt_timeofday = dt.timedelta(hours=16)    
 
     # Start and End date of the charts
-    ldt_timestamps = du.getNYSEdays(dt_start, dt_end, dt_timeofday)
+    ldt_timestamps = tc.nyse_days(dt_start, dt_end, dt_timeofday)
    
-    # Creating an object of the dataaccess class with Yahoo as the source.
-    c_dataobj = da.DataAccess('Yahoo')
-    
-    # Keys to be read from the data, it is good to read everything in one go.
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']    
-    
-    # Reading the data, now d_data is a dictionary with the keys above.
-    # Timestamps and symbols are the ones that were specified before.
-    ldf_data = c_dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)
-    d_data = dict(zip(ls_keys, ldf_data))    
-   
-    # Filling the data for NAN
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)
+    # Reading the data, now d_data is a dictionary with the keys in stockdb.LS_KEYS.
+    # Repeated calls for the same symbols and dates are served from the cache.
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
 
     # Getting the numpy ndarray of close prices.
     na_price = d_data['close'].values  
@@ -96,26 +54,12 @@ def simulate(startdate, enddate, ls_symbols, allocations):
     
     
     
-    # normalize prices
-    na_normalized_price = normalize_data(na_price_tp) 
-    #print na_normalized_price
- 
-    # calculate daily return
-    na_rets = na_normalized_price.copy()
-    na_daily_rets = daily_return(na_rets)
-        
-    # average daily return
-    avg_daily_rets = avg_daily_return(na_daily_rets)
-    
-    # compute standard deviation
-    std_dev_tp = std_dev(na_daily_rets)
-    
-    # compute sharpe ratio
-    sharpe_ratio_tp = sharpe_ratio(avg_daily_rets,std_dev_tp)
-    #sharpe_ratio_tp = tsu.getSharpeRatio(na_rets)
-    
-    #compute cumulative return
-    cumul_return_tp = cumulative_return(na_normalized_price)
+    # sharpe ratio, volatility, average daily return and cumulative return
+    d_metrics = metrics.calc_metrics(na_price_tp)
+    sharpe_ratio_tp = d_metrics['sharpe'][0]
+    std_dev_tp = d_metrics['volatility'][0]
+    avg_daily_rets = d_metrics['avg_daily'][0]
+    cumul_return_tp = d_metrics['cumulative'][0]
     
     # print out status
     print
@@ -149,7 +93,9 @@ def main():
     #simulate([2010, 1, 1], [2010, 12, 31], ["AXP","HPQ","IBM","HNZ"], [ 0.0, 0.0, 0.0, 1.0 ])
     #simulate([2011, 1, 1], [2011, 12, 31], ["BRCM","TXN","AMD","ADI"], [ 0.0, 1.0, 0.0, 0.0 ])
     #optimize([2011, 1, 1], [2011, 12, 31], ["BRCM","TXN","AMD","ADI"])
-    optimize([2010, 1, 1], [2010, 12, 31], ["BRCM","TXN","IBM","HNZ"])
+    sys.argv = sys.argv[:1] + st.profile_argv(sys.argv[1:])
+    with st.stage('compute', symbols=4):
+        optimize([2010, 1, 1], [2010, 12, 31], ["BRCM","TXN","IBM","HNZ"])
     #simulate([2010, 1, 1], [2010, 12, 31],  ["BRCM","TXN","IBM","HNZ"], [0.1, 0.1, 0.0, 0.8])
     #simulate([2010, 1, 1], [2010, 12, 31],  ["BRCM","TXN","IBM","HNZ"], [0.3, 0.0, 0.7, 0.0])
     #simulate([2010, 1, 1], [2010, 12, 31],  ["BRCM","TXN","IBM","HNZ"], [0.1, 0.1, 0.6, 0.2])
@@ -0,0 +1,126 @@
+'''
+File:   stagetimer.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Stage timing written as a Chrome trace
+
+Scripts wrap their stages (load, fill, compute, event profile, write, plot)
+in stage() blocks:
+
+    with st.stage('compute', rows=len(ls_symbols)) as span:
+        ...
+        span['events'] = len(events)
+
+When profiling is off, stage() returns one shared do-nothing object, so the
+cost is a function call and a global test.  With --profile <file.json> on
+the command line every stage records its wall time, CPU time and arguments
+(row counts, bytes), and the trace is written when the script exits; load it
+in chrome://tracing or Perfetto.
+'''
+
+import threading
+import atexit
+import json
+import time
+import os
+
+_events = None
+_t_origin = time.time()
+
+class NullSpan(object):
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+    def __setitem__(self, s_key, value):
+        pass
+
+NULL_SPAN = NullSpan()
+
+class Span(object):
+    def __init__(self, s_name, s_cat, d_args):
+        self.s_name = s_name
+        self.s_cat = s_cat
+        self.d_args = d_args
+
+    def __setitem__(self, s_key, value):
+        self.d_args[s_key] = value
+
+    def __enter__(self):
+        self.f_cpu = cpu_time()
+        self.f_start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        f_end = time.time()
+        self.d_args['cpu_ms'] = (cpu_time() - self.f_cpu) * 1000.0
+        if exc_type is not None:
+            self.d_args['error'] = exc_type.__name__
+        _events.append({ 'name' : self.s_name, 'cat' : self.s_cat, 'ph' : 'X',
+                         'ts' : (self.f_start - _t_origin) * 1e6, 'dur' : (f_end - self.f_start) * 1e6,
+                         'pid' : os.getpid(), 'tid' : threading.current_thread().ident,
+                         'args' : self.d_args })
+        return False
+
+# user plus system CPU seconds of this process
+def cpu_time():
+    t_times = os.times()
+    return t_times[0] + t_times[1]
+
+def enabled():
+    return _events is not None
+
+# a timed block named s_name; keyword arguments (rows, bytes, ...) go into the
+# trace event's args
+def stage(s_name, s_cat='stage', **d_args):
+    if _events is None:
+        return NULL_SPAN
+    return Span(s_name, s_cat, d_args)
+
+# bytes held by a DataFrame, an array or a dictionary of them
+def data_bytes(data):
+    if isinstance(data, dict):
+        return sum(data_bytes(value) for value in data.values())
+    if hasattr(data, 'values') and hasattr(data.values, 'nbytes'):
+        return int(data.values.nbytes)
+    if hasattr(data, 'nbytes'):
+        return int(data.nbytes)
+    return 0
+
+# start recording; with s_file the trace is written there at exit
+def enable(s_file=None):
+    global _events
+    if _events is None:
+        _events = []
+    if s_file is not None:
+        atexit.register(write_trace, s_file)
+
+def write_trace(s_file):
+    d_trace = { 'traceEvents' : sorted(_events or [], key=lambda e: e['ts']), 'displayTimeUnit' : 'ms' }
+    f = open(s_file, "w")
+    try:
+        json.dump(d_trace, f)
+    finally:
+        f.close()
+    print "profile trace written to", s_file
+
+# remove --profile <file.json> (or --profile=<file.json>) from argv and turn
+# profiling on; the rest of argv is returned for the script's own options
+def profile_argv(argv):
+    ls_rest = []
+    s_file = None
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--profile' and i + 1 < len(argv):
+            s_file = argv[i + 1]
+            i += 2
+            continue
+        if argv[i].startswith('--profile='):
+            s_file = argv[i][len('--profile='):]
+        else:
+            ls_rest.append(argv[i])
+        i += 1
+    if s_file is not None:
+        enable(s_file)
+    return ls_rest
@@ -0,0 +1,118 @@
+'''
+File:   state_check.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: One-day RollingBands updates against the batch Bollinger bands
+
+Builds a bollinger_state.RollingBands state from the first -r days of a
+stock list, then adds the remaining days one at a time the way nightly
+bollinger_state.py runs do (raw closes of the one day, missing bars carried
+forward from the state), and compares every day's price, mean, std and
+Bollinger value with bollinger_bands.calc_bands() over the filled history.
+The symbols with a missing bar after the first day are reported
+separately, since those are where a one-day read differs from the batch.
+Days before a symbol's first close are left out: the batch back fills them
+with a price from the future that a nightly update cannot know.
+
+state_check.py -b 2008 -e 2009 -s sp5002012 -r 300
+'''
+
+import datetime as dt
+import numpy as np
+import stockdb
+import tradingcalendar as tc
+import bollinger_bands as bb
+import bollinger_state
+import sys, getopt
+
+LS_FIELDS = ['price', 'mean', 'std', 'value']
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2008, 1, 1]
+    end   = [2009, 12, 31]
+    stocks = 'sp5002012'
+    i_rows = 300
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:r:",["begin=","end=","stock=","rows="])
+    except getopt.GetoptError:
+        print "state_check.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -r <state_rows>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "state_check.py -b <begin_year> -e <end_year> -s <stock_list|stocks> -r <state_rows>"
+            print "state_check.py -b 2008 -e 2009 -s sp5002012 -r 300"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg)
+        elif opt in ('-r','--rows'):
+            i_rows = int(arg)
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"rows=",i_rows
+    return dt_begin,dt_end,stocks,i_rows
+
+# largest |a - b| over the cells where both are finite, and the number of
+# cells where only one of them is
+def max_difference(na_a, na_b):
+    na_finite = np.isfinite(na_a) & np.isfinite(na_b)
+    f_max = np.abs(na_a - na_b)[na_finite].max() if na_finite.any() else 0.0
+    return f_max, int((np.isfinite(na_a) != np.isfinite(na_b)).sum())
+
+def main(argv):
+    print "state_check.py main routine\n"
+    dt_begin, dt_end, stocks, i_rows = get_cmdline_options(argv)
+
+    if "," in stocks:
+        ls_symbols = stocks.split(",")
+    else:
+        ls_symbols = stockdb.get_symbols_from_list(stocks)
+    if 'SPY' not in ls_symbols:
+        ls_symbols.append('SPY')
+    ldt_timestamps = tc.nyse_days(dt_begin, dt_end + dt.timedelta(days=1), dt.timedelta(hours=16))
+    i_market = ls_symbols.index('SPY')
+
+    # batch bands over the filled history, and the raw closes the updates read
+    df_raw = stockdb.read_files(stockdb.get_dataobj(), ldt_timestamps, ls_symbols, ['close'])['close']
+    df_close = stockdb.fill_data({ 'close' : df_raw }, ['close'])['close']
+    d_batch = bb.calc_bands(df_close)
+
+    state = bollinger_state.RollingBands(ls_symbols)
+    na_price, na_real = bollinger_state.carry_prices(state, df_raw.iloc[:i_rows])
+    for i in range(i_rows):
+        state.update(na_price[i], bollinger_state.date_key(ldt_timestamps[i]), na_real=na_real[i])
+
+    d_update = dict((s_field, np.empty((len(ldt_timestamps) - i_rows, len(ls_symbols)))) for s_field in LS_FIELDS)
+    for i in range(i_rows, len(ldt_timestamps)):
+        na_day, na_real = bollinger_state.carry_prices(state, df_raw.iloc[i:i + 1])
+        d_bands = state.update(na_day[0], bollinger_state.date_key(ldt_timestamps[i]), i_market, na_real=na_real[0])
+        for s_field in LS_FIELDS:
+            d_update[s_field][i - i_rows] = d_bands[s_field]
+
+    # symbols with a missing bar after the first day, where the one-day reads
+    # carry the price forward or back fill the window at the first close;
+    # the days before a symbol's first close are left out, the batch back
+    # fills them from the future
+    na_raw = df_raw.values
+    na_gap = np.isnan(na_raw[1:]).any(axis=0) & ~np.isnan(na_raw).all(axis=0)
+    na_after = np.maximum.accumulate(~np.isnan(na_raw), axis=0)[i_rows:]
+    print
+    print "%d days in the state, %d one-day updates, %d symbols with a missing bar, %d cells before a first close" % \
+          (i_rows, len(ldt_timestamps) - i_rows, na_gap.sum(), (~na_after[:, ~np.isnan(na_raw).all(axis=0)]).sum())
+    print "%-6s %16s %10s %16s %10s" % ("field", "max diff", "nonfinite", "max diff (gaps)", "nonfinite")
+    for s_field in LS_FIELDS:
+        na_update = np.where(na_after, d_update[s_field], d_batch[s_field][i_rows:])
+        na_batch = d_batch[s_field][i_rows:]
+        f_all, i_all = max_difference(na_update, na_batch)
+        f_gap, i_gap = max_difference(na_update[:, na_gap], na_batch[:, na_gap])
+        print "%-6s %16.3g %10d %16.3g %10d" % (s_field, f_all, i_all, f_gap, i_gap)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,410 @@
+'''
+File:   stockdb.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Shared stock database loader with an in-process price cache
+
+Every script reads the Yahoo database the same way: the csv files for
+the six ls_keys, then ffill, bfill and 1.0 for missing values.  get_data()
+does that once and keeps the raw and filled panels in an LRU cache bounded
+by bytes.  A request for fewer symbols, fewer keys or a narrower date range
+is served by slicing a cached superset; the slice is filled again so the
+result is the same as a fresh read.  An entry is dropped as soon as the
+source file of one of its symbols changes.
+
+get_data() returns a LazyData mapping: a field is read and filled the first
+time it is looked up, so a script that only uses 'close' never holds the
+other five.  QSTK parses a symbol's whole csv file on every read, so a
+script that needs several fields should load them together with
+d_data.load(ls_keys) (or get_data(..., b_lazy=False)).
+
+The 'float32' storage mode (s_dtype='float32' or QSDTYPE=float32 in the
+environment) keeps prices as float32 and volume as int32, half the memory of
+the default float64.  float32 has a 24 bit mantissa, so a stored price is
+within 6e-8 of the float64 price relative to its value (about 0.00001 on a
+$200 price); volumes are exact below 2**31 and are kept as int64 when a
+volume does not fit.  Computed from float32 prices, daily returns differ
+by up to about 1e-7 and Bollinger values by up to about 4e-5 standard
+deviations, which flips an event only when its value is that close to a
+threshold; Sharpe ratios differ by about 2e-5 relative.  On sp5002012
+2008-2009 no Bollinger event changed and the strategy's fund values differed
+by under a cent.  precision_check.py measures the differences for a stock
+list.
+
+When pricepanel.py has ingested the database into a panel (~/.qstk/panel or
+$QSPANEL), a cache miss is served from the memory-mapped panel instead of
+the csv files, as long as the panel has every symbol and day and no source
+file changed since the ingestion; otherwise the read falls back to QSTK.
+fill_mask() tells which filled cells of a field were synthesized (no row,
+or no value of the field, in the symbol's file), from the panel's bitmask
+of that field or a raw read.
+
+Otherwise the csv files are read by read_files() instead of
+DataAccess.get_data, which parses a file once per field row by row.  A
+bounded pool of threads (QSTHREADS, default 8) reads and parses one file
+each and writes its rows straight into a preallocated (keys x days x
+symbols) array, with the same values DataAccess returns: rows matched to
+timestamps at 16:00, NaN where a file has no row or no file exists.  Every
+file's read time, row count and status ('ok', 'missing' or the error of a
+file that could not be parsed) is kept in load_report() and, when
+profiling, written to the trace as a 'read symbol' event on its thread;
+loadtimes.py prints the slowest and failed files of a symbol list.
+'''
+
+import lazyimport
+import stagetimer as st
+import tradingcalendar as tc
+import pricepanel
+import numpy as np
+import multiprocessing.pool as mpp
+import time
+import os
+import collections
+
+pd = lazyimport.module('pandas')
+da = lazyimport.module('QSTK.qstkutil.DataAccess')
+
+LS_KEYS = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
+
+# default cache size, override with the QSCACHEBYTES environment variable
+CACHE_BYTES = int(os.environ.get('QSCACHEBYTES', 512 * 1024 * 1024))
+
+# default storage mode, 'float64' or 'float32', override with the QSDTYPE
+# environment variable
+STORAGE_DTYPE = os.environ.get('QSDTYPE', 'float64')
+DTYPES = ('float64', 'float32')
+
+# csv reader threads, override with the QSTHREADS environment variable
+LOAD_THREADS = int(os.environ.get('QSTHREADS', 8))
+
+_dataobj = None
+
+# one DataAccess object per process; QSTK's own pickle cache is disabled
+# (cachestalltime=0) so file changes are seen through the mtime check below
+def get_dataobj():
+    global _dataobj
+    if _dataobj is None:
+        _dataobj = da.DataAccess('Yahoo', cachestalltime=0)
+    return _dataobj
+
+def get_symbols_from_list(s_list):
+    return get_dataobj().get_symbols_from_list(s_list)
+
+# modification time of the file behind a symbol, None if there is no file
+def symbol_mtime(dataobj, s_sym):
+    for s_path in dataobj.folderList:
+        for s_ext in ('.csv', '.pkl'):
+            s_file = str(s_path) + str(s_sym) + s_ext
+            if os.path.exists(s_file):
+                return os.path.getmtime(s_file)
+    return None
+
+# function from day numbers to rows of ldt_timestamps, -1 for no row; like
+# DataAccess only the timestamps at 16:00 get a file's rows
+def timestamp_rows(ldt_timestamps):
+    na_at_close = np.array([(ts.hour, ts.minute, ts.second, ts.microsecond) == (16, 0, 0, 0)
+                            for ts in ldt_timestamps], dtype=bool)
+    if na_at_close.all():
+        return tc.day_index(ldt_timestamps).rows
+    na_close_rows = np.append(np.nonzero(na_at_close)[0], -1)
+    index = tc.day_index([ldt_timestamps[i] for i in na_close_rows[:-1]])
+    def rows(na_days):
+        return na_close_rows[index.rows(na_days)]
+    return rows
+
+_load_report = []
+
+# (symbol, seconds, rows, status) of every file of the last read_files()
+def load_report():
+    return list(_load_report)
+
+# the raw (unfilled) frames of ls_keys, read from the symbols' csv files by
+# i_threads threads into one preallocated array; a file that is missing or
+# cannot be parsed leaves its symbol's column NaN
+def read_files(dataobj, ldt_timestamps, ls_symbols, ls_keys, i_threads=None):
+    global _load_report
+    if i_threads is None:
+        i_threads = LOAD_THREADS
+    li_columns = [pricepanel.LS_KEYS.index(s_key) for s_key in ls_keys]
+    f_rows = timestamp_rows(ldt_timestamps)
+    na_raw = np.empty((len(ls_keys), len(ldt_timestamps), len(ls_symbols)))
+    na_raw[:] = np.NAN
+
+    # one file into column j of na_raw; the threads write disjoint columns
+    def read_symbol(task):
+        j, s_sym = task
+        f_start = time.time()
+        with st.stage('read symbol', 'symbol', symbol=s_sym) as span:
+            i_rows = 0
+            s_file = dataobj.getPathOfCSVFile(s_sym)
+            if s_file is None:
+                s_status = 'missing'
+            else:
+                try:
+                    na_days, na_values = pricepanel.read_symbol(s_file)
+                    na_rows = f_rows(na_days)
+                    na_in = na_rows >= 0
+                    na_raw[:, na_rows[na_in], j] = na_values[na_in][:, li_columns].T
+                    i_rows = int(na_in.sum())
+                    s_status = 'ok'
+                except Exception as e:
+                    s_status = "%s: %s" % (type(e).__name__, e)
+            span['rows'] = i_rows
+            span['status'] = s_status
+        return s_sym, time.time() - f_start, i_rows, s_status
+
+    tasks = list(enumerate(ls_symbols))
+    if i_threads > 1 and len(tasks) > 1:
+        pool = mpp.ThreadPool(min(i_threads, len(tasks)))
+        try:
+            l_report = pool.map(read_symbol, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        l_report = [read_symbol(task) for task in tasks]
+    _load_report = l_report
+
+    for s_sym, f_seconds, i_rows, s_status in l_report:
+        if s_status not in ('ok', 'missing'):
+            print "stockdb: could not read %s, %s" % (s_sym, s_status)
+    return dict((s_key, pd.DataFrame(na_raw[k], index=ldt_timestamps, columns=ls_symbols, copy=False))
+                for k, s_key in enumerate(ls_keys))
+
+# ffill, bfill and 1.0 for the remaining gaps
+def fill_data(d_raw, ls_keys):
+    d_data = {}
+    for s_key in ls_keys:
+        d_data[s_key] = d_raw[s_key].fillna(method='ffill')
+        d_data[s_key] = d_data[s_key].fillna(method='bfill')
+        d_data[s_key] = d_data[s_key].fillna(1.0)
+    return d_data
+
+# frames in the storage mode: float32 prices and, once filled, int32 volume
+# (int64 if a volume does not fit); the raw volume keeps its NaN gaps as float64
+def store_frames(d_frames, s_dtype, b_filled=True):
+    if s_dtype == 'float64':
+        return d_frames
+    d_store = {}
+    for s_key, df_frame in d_frames.items():
+        if s_key != 'volume':
+            d_store[s_key] = df_frame.astype(np.float32)
+        elif b_filled:
+            na_volume = df_frame.values
+            if na_volume.size == 0 or np.abs(na_volume).max() <= np.iinfo(np.int32).max:
+                d_store[s_key] = df_frame.round().astype(np.int32)
+            else:
+                d_store[s_key] = df_frame.round().astype(np.int64)
+        else:
+            d_store[s_key] = df_frame
+    return d_store
+
+class PanelEntry(object):
+    def __init__(self, ls_symbols, ls_keys, d_raw, d_data, d_mtime, s_dtype='float64'):
+        self.ls_symbols = list(ls_symbols)
+        self.ls_keys = list(ls_keys)
+        self.s_dtype = s_dtype
+        self.d_raw = d_raw
+        self.d_data = d_data
+        self.d_mtime = d_mtime
+        self.index = d_raw[ls_keys[0]].index
+        self.nbytes = sum(d_raw[k].values.nbytes + d_data[k].values.nbytes for k in ls_keys)
+
+    # row slice of the cached index covering ldt_timestamps, None if not covered
+    def rows(self, ldt_timestamps):
+        if len(ldt_timestamps) == 0 or len(self.index) == 0:
+            return None
+        i_begin = self.index.searchsorted(ldt_timestamps[0])
+        i_end = i_begin + len(ldt_timestamps)
+        if i_end > len(self.index):
+            return None
+        if self.index[i_begin] != ldt_timestamps[0] or self.index[i_end - 1] != ldt_timestamps[-1]:
+            return None
+        return slice(i_begin, i_end)
+
+    def covers(self, ls_symbols, ls_keys, s_dtype='float64'):
+        return s_dtype == self.s_dtype and set(ls_symbols) <= set(self.ls_symbols) and set(ls_keys) <= set(self.ls_keys)
+
+    # True if any symbol file changed since the entry was loaded
+    def stale(self, dataobj, ls_symbols):
+        for s_sym in ls_symbols:
+            if symbol_mtime(dataobj, s_sym) != self.d_mtime.get(s_sym):
+                return True
+        return False
+
+class PanelCache(object):
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = collections.OrderedDict()
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def _key(self, ldt_timestamps, ls_symbols, ls_keys, s_dtype='float64'):
+        return (tuple(ls_symbols), ldt_timestamps[0], ldt_timestamps[-1],
+                len(ldt_timestamps), tuple(ls_keys), s_dtype)
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.nbytes -= entry.nbytes
+
+    def _add(self, key, entry):
+        if key in self.entries:
+            self._drop(key)
+        if entry.nbytes > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        while self.nbytes > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+
+    # return d_data from the cache, or None on a miss
+    def lookup(self, dataobj, ldt_timestamps, ls_symbols, ls_keys, s_dtype='float64'):
+        key = self._key(ldt_timestamps, ls_symbols, ls_keys, s_dtype)
+
+        # exact hit, the filled frames are returned as they are
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry.stale(dataobj, ls_symbols):
+                self._drop(key)
+            else:
+                self.entries[key] = self.entries.pop(key)
+                self.hits += 1
+                return dict((k, entry.d_data[k]) for k in ls_keys)
+
+        # subset hit, slice the raw superset and fill it again
+        for key_super in reversed(self.entries.keys()):
+            entry = self.entries[key_super]
+            if not entry.covers(ls_symbols, ls_keys, s_dtype):
+                continue
+            rows = entry.rows(ldt_timestamps)
+            if rows is None:
+                continue
+            if entry.stale(dataobj, ls_symbols):
+                self._drop(key_super)
+                continue
+            self.entries[key_super] = self.entries.pop(key_super)
+            d_raw = dict((k, entry.d_raw[k].iloc[rows][ls_symbols]) for k in ls_keys)
+            d_data = store_frames(fill_data(d_raw, ls_keys), s_dtype)
+            d_mtime = dict((s, entry.d_mtime.get(s)) for s in ls_symbols)
+            self._add(key, PanelEntry(ls_symbols, ls_keys, d_raw, d_data, d_mtime, s_dtype))
+            self.hits += 1
+            return d_data
+
+        self.misses += 1
+        return None
+
+    def store(self, ldt_timestamps, ls_symbols, ls_keys, d_raw, d_data, d_mtime, s_dtype='float64'):
+        key = self._key(ldt_timestamps, ls_symbols, ls_keys, s_dtype)
+        self._add(key, PanelEntry(ls_symbols, ls_keys, d_raw, d_data, d_mtime, s_dtype))
+
+PANEL_CACHE = PanelCache()
+
+# the filled fields of a stock database read, each one read on first lookup;
+# the mapping iterates over every field it can load
+class LazyData(collections.Mapping):
+    def __init__(self, ldt_timestamps, ls_symbols, ls_keys, cache, s_dtype):
+        self.ldt_timestamps = list(ldt_timestamps)
+        self.ls_symbols = list(ls_symbols)
+        self.ls_keys = list(ls_keys)
+        self.cache = cache
+        self.s_dtype = s_dtype
+        self.d_frames = {}
+
+    def __getitem__(self, s_key):
+        if s_key not in self.d_frames:
+            if s_key not in self.ls_keys:
+                raise KeyError(s_key)
+            self.load([s_key])
+        return self.d_frames[s_key]
+
+    def __iter__(self):
+        return iter(self.ls_keys)
+
+    def __len__(self):
+        return len(self.ls_keys)
+
+    # read the fields of ls_keys that are not loaded yet, in one pass
+    def load(self, ls_keys):
+        ls_missing = [s_key for s_key in ls_keys if s_key not in self.d_frames]
+        if ls_missing:
+            self.d_frames.update(load_data(self.ldt_timestamps, self.ls_symbols, ls_missing, self.cache, self.s_dtype))
+        return self
+
+    def loaded(self):
+        return [s_key for s_key in self.ls_keys if s_key in self.d_frames]
+
+    # True where a filled value of s_key was synthesized
+    def fill_mask(self, s_key='close'):
+        return fill_mask(self.ldt_timestamps, self.ls_symbols, s_key)
+
+# read stock database from Yahoo and return the filled data dictionary, as a
+# LazyData mapping unless b_lazy is False; s_dtype is the storage mode.
+# The frames may be shared with the cache, callers must not modify them in place.
+def get_data(ldt_timestamps, ls_symbols, ls_keys=LS_KEYS, cache=PANEL_CACHE, b_lazy=True, s_dtype=None):
+    if s_dtype is None:
+        s_dtype = STORAGE_DTYPE
+    if s_dtype not in DTYPES:
+        raise ValueError("storage mode must be one of %s, not %s" % (", ".join(DTYPES), s_dtype))
+    if b_lazy:
+        return LazyData(ldt_timestamps, ls_symbols, ls_keys, cache, s_dtype)
+    return load_data(ldt_timestamps, ls_symbols, ls_keys, cache, s_dtype)
+
+# read and fill ls_keys now, through the cache
+def load_data(ldt_timestamps, ls_symbols, ls_keys=LS_KEYS, cache=PANEL_CACHE, s_dtype='float64'):
+    dataobj = get_dataobj()
+    ldt_timestamps = list(ldt_timestamps)
+    ls_symbols = list(ls_symbols)
+    ls_keys = list(ls_keys)
+
+    if len(ldt_timestamps) == 0:
+        cache = None
+
+    i_cells = len(ldt_timestamps) * len(ls_symbols)
+    if cache is not None:
+        with st.stage('cache lookup', rows=i_cells, keys=len(ls_keys), cache='hit') as span:
+            d_data = cache.lookup(dataobj, ldt_timestamps, ls_symbols, ls_keys, s_dtype)
+            if d_data is not None:
+                return d_data
+            span['cache'] = 'miss'
+
+    panel = pricepanel.get_panel()
+    if panel is not None and len(ldt_timestamps) > 0:
+        with st.stage('panel', rows=i_cells, keys=len(ls_keys), panel='hit') as span:
+            d_data = None
+            if not panel.stale(ls_symbols, lambda s_sym: symbol_mtime(dataobj, s_sym)):
+                d_data = panel.frames(ldt_timestamps, ls_symbols, ls_keys)
+            if d_data is not None:
+                return store_frames(d_data, s_dtype)
+            span['panel'] = 'miss'
+
+    with st.stage('load', rows=i_cells, symbols=len(ls_symbols), keys=len(ls_keys)) as span:
+        d_mtime = dict((s_sym, symbol_mtime(dataobj, s_sym)) for s_sym in ls_symbols)
+        d_raw = store_frames(read_files(dataobj, ldt_timestamps, ls_symbols, ls_keys), s_dtype, b_filled=False)
+        span['bytes'] = st.data_bytes(d_raw)
+    with st.stage('fill', rows=i_cells, keys=len(ls_keys)):
+        d_data = store_frames(fill_data(d_raw, ls_keys), s_dtype)
+
+    if cache is not None:
+        cache.store(ldt_timestamps, ls_symbols, ls_keys, d_raw, d_data, d_mtime, s_dtype)
+    return d_data
+
+# (days x symbols) bool array, True where the filled s_key of a symbol is
+# synthesized (ffill, bfill or 1.0) because its file has no value for the day
+def fill_mask(ldt_timestamps, ls_symbols, s_key='close'):
+    dataobj = get_dataobj()
+    ldt_timestamps = list(ldt_timestamps)
+    ls_symbols = list(ls_symbols)
+    panel = pricepanel.get_panel()
+    if panel is not None and not panel.stale(ls_symbols, lambda s_sym: symbol_mtime(dataobj, s_sym)):
+        rows = panel.rows(ldt_timestamps)
+        columns = panel.columns(ls_symbols)
+        if rows is not None and columns is not None and s_key in panel.ls_masks:
+            return panel.fill_mask(rows, columns, s_key)
+    df_raw = read_files(dataobj, ldt_timestamps, ls_symbols, [s_key])[s_key]
+    return df_raw.isnull().values
@@ -0,0 +1,90 @@
+'''
+File:   synthetic.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Deterministic synthetic prices and orders
+
+price_panel() returns the same d_data dictionary as stockdb.get_data():
+one (days x symbols) DataFrame per key in stockdb.LS_KEYS, indexed by
+weekday timestamps at 16:00, with SPY as the last symbol.  Closes are
+geometric random walks with a common market factor, so SPY is correlated
+with the other symbols the way the scripts expect.  The same seed always
+gives the same panel and orders, and nothing is read from the QSTK data
+directory.
+'''
+
+import datetime as dt
+import pandas as pd
+import numpy as np
+import csv
+
+# i_days weekdays at 16:00 starting at dt_begin
+def trading_days(i_days, dt_begin=dt.datetime(2000, 1, 3)):
+    return list(pd.bdate_range(dt_begin, periods=i_days) + pd.DateOffset(hours=16))
+
+def symbol_names(i_symbols):
+    return ["S%04d" % i for i in range(i_symbols)]
+
+# d_data for i_symbols synthetic symbols plus SPY over i_days days; returns
+# (ldt_timestamps, ls_symbols, d_data)
+def price_panel(i_symbols, i_days, i_seed=0, dt_begin=dt.datetime(2000, 1, 3)):
+    rng = np.random.RandomState(i_seed)
+    ldt_timestamps = trading_days(i_days, dt_begin)
+    ls_symbols = symbol_names(i_symbols) + ['SPY']
+
+    # daily log returns: market factor, per-symbol beta and noise
+    na_market = rng.normal(0.0003, 0.012, size=(i_days, 1))
+    na_beta = rng.uniform(0.5, 1.5, size=(1, i_symbols + 1))
+    na_beta[0, -1] = 1.0
+    na_noise = rng.normal(0.0, 0.02, size=(i_days, i_symbols + 1))
+    na_noise[:, -1] = 0.0
+    na_log_rets = na_market * na_beta + na_noise
+    na_log_rets[0, :] = 0.0
+
+    na_start = rng.uniform(5.0, 150.0, size=(1, i_symbols + 1))
+    na_actual_close = na_start * np.exp(np.cumsum(na_log_rets, axis=0))
+    na_range = np.abs(rng.normal(0.0, 0.01, size=na_actual_close.shape))
+    na_open = na_actual_close * (1.0 + rng.normal(0.0, 0.005, size=na_actual_close.shape))
+    na_high = np.maximum(na_open, na_actual_close) * (1.0 + na_range)
+    na_low = np.minimum(na_open, na_actual_close) * (1.0 - na_range)
+    na_volume = np.floor(rng.lognormal(13.0, 1.0, size=na_actual_close.shape))
+
+    # adjusted close: a dividend adjustment factor drifting up to 1.0
+    na_adjust = np.linspace(0.9, 1.0, i_days)[:, np.newaxis]
+    na_close = na_actual_close * na_adjust
+
+    d_arrays = { 'open' : na_open, 'high' : na_high, 'low' : na_low, 'close' : na_close,
+                 'volume' : na_volume, 'actual_close' : na_actual_close }
+    d_data = {}
+    for s_key, na_values in d_arrays.items():
+        d_data[s_key] = pd.DataFrame(na_values, index=ldt_timestamps, columns=ls_symbols)
+    return ldt_timestamps, ls_symbols, d_data
+
+# i_orders random Buy/Sell orders of ls_symbols on ldt_timestamps, as
+# [year, month, day, symbol, order, shares] string rows in date order like
+# marketsim.read_csvfile()
+def order_rows(ldt_timestamps, ls_symbols, i_orders, i_seed=0):
+    rng = np.random.RandomState(i_seed)
+    na_days = np.sort(rng.randint(0, len(ldt_timestamps), size=i_orders))
+    na_syms = rng.randint(0, len(ls_symbols), size=i_orders)
+    na_buy = rng.rand(i_orders) < 0.5
+    na_shares = rng.randint(1, 50, size=i_orders) * 10
+
+    ls_dates = [[str(ts.year), str(ts.month), str(ts.day)] for ts in ldt_timestamps]
+    ls_types = ["Sell", "Buy"]
+    return [ls_dates[i] + [ls_symbols[j], ls_types[b], str(n)]
+            for i, j, b, n in zip(na_days.tolist(), na_syms.tolist(), na_buy.tolist(), na_shares.tolist())]
+
+# string ndarray of the orders, the shape marketsim.read_csvfile() returns
+def order_array(ldt_timestamps, ls_symbols, i_orders, i_seed=0):
+    return np.asarray(order_rows(ldt_timestamps, ls_symbols, i_orders, i_seed))
+
+def write_orders(outfile, rows):
+    f = open(outfile,"wb")
+    try:
+        writer = csv.writer(f,delimiter=',')
+        for row in rows:
+            writer.writerow(row)
+    finally:
+        f.close()
@@ -5,15 +5,11 @@ Author: Boris Litinsky
 Description: Find market trades and generated order list
 '''
 
-import pandas as pd
-import numpy as np
-import math
-import copy
-import QSTK.qstkutil.qsdateutil as du
+import tradingcalendar as tc
 import datetime as dt
-import QSTK.qstkutil.DataAccess as da
-import QSTK.qstkutil.tsutil as tsu
-import QSTK.qstkstudy.EventProfiler as ep
+import stockdb
+import stagetimer as st
+import event_engine as ee
 import sys
 import csv
 
@@ -49,64 +45,37 @@ def place_stock_order(timestamp,stock, order_type, shares):
 
 def find_events(ls_symbols, d_data):
     ''' Finding the event dataframe '''
-    df_close = d_data['actual_close']
-    ts_market = df_close['SPY']
+    df_close = d_data['actual_close'][ls_symbols]
 
     print "Finding Events"
 
-    # Creating an empty dataframe
-    df_events = copy.deepcopy(df_close)
-    df_events = df_events * np.NAN
-
     # Time stamps for the event range
     ldt_timestamps = df_close.index
-    
-    trades = []
 
-    for s_sym in ls_symbols:
-        for i in range(1, len(ldt_timestamps)):
-            # Calculating the returns for this timestamp
-            f_symprice_today = df_close[s_sym].ix[ldt_timestamps[i]]
-            f_symprice_yest = df_close[s_sym].ix[ldt_timestamps[i - 1]]
-            f_marketprice_today = ts_market.ix[ldt_timestamps[i]]
-            f_marketprice_yest = ts_market.ix[ldt_timestamps[i - 1]]
-            f_symreturn_today = (f_symprice_today / f_symprice_yest) - 1
-            f_marketreturn_today = (f_marketprice_today / f_marketprice_yest) - 1
-
-            # Event is found if the symbol is down more then 3% while the
-            # market is up more then 2%
-            #if f_symreturn_today <= -0.03 and f_marketreturn_today >= 0.02:
-            #    df_events[s_sym].ix[ldt_timestamps[i]] = 1
-            if f_symprice_today < 7.00 and f_symprice_yest >= 7.00:
-                buy_trade = place_stock_order(ldt_timestamps[i],s_sym,"Buy",100)
-                sell_trade= place_stock_order(ldt_timestamps[i+5],s_sym,"Sell",100)
-                trades.append(buy_trade)
-                trades.append(sell_trade)
+    # buy 100 shares when the price closes below $7 after closing at or above
+    # it the day before, sell them 5 days later or on the last day
+    na_mask = ee.cross_below(df_close.values, 7.00)
+    trades = ee.paired_orders(ldt_timestamps, ls_symbols, na_mask, i_shares=100, i_hold=5)
     return trades
    
 def main():
     print "trades.py main routine\n"
+    sys.argv = sys.argv[:1] + st.profile_argv(sys.argv[1:])
     dt_start = dt.datetime(2008, 1, 1)
     dt_end   = dt.datetime(2009, 12, 31)
-    ldt_timestamps = du.getNYSEdays(dt_start, dt_end, dt.timedelta(hours=16))
+    ldt_timestamps = tc.nyse_days(dt_start, dt_end, dt.timedelta(hours=16))
     
-    dataobj = da.DataAccess('Yahoo')
-    #ls_symbols = dataobj.get_symbols_from_list('sp5002008')
-    ls_symbols = dataobj.get_symbols_from_list('sp5002012')
+    #ls_symbols = stockdb.get_symbols_from_list('sp5002008')
+    ls_symbols = stockdb.get_symbols_from_list('sp5002012')
 
     ls_symbols.append('SPY')
 
-    ls_keys = ['open', 'high', 'low', 'close', 'volume', 'actual_close']
-    ldf_data = dataobj.get_data(ldt_timestamps, ls_symbols, ls_keys)
-    d_data = dict(zip(ls_keys, ldf_data))
-
-    for s_key in ls_keys:
-        d_data[s_key] = d_data[s_key].fillna(method='ffill')
-        d_data[s_key] = d_data[s_key].fillna(method='bfill')
-        d_data[s_key] = d_data[s_key].fillna(1.0)
+    d_data = stockdb.get_data(ldt_timestamps, ls_symbols)
 
-    trades = find_events(ls_symbols, d_data)
-    write_trades_csvfile("orders.csv",trades)
+    with st.stage('compute', rows=len(ldt_timestamps) * len(ls_symbols)):
+        trades = find_events(ls_symbols, d_data)
+    with st.stage('write', rows=len(trades)):
+        write_trades_csvfile("orders.csv",trades)
     print "trades.py done\n"
     
 
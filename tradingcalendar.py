@@ -0,0 +1,247 @@
+'''
+File:   tradingcalendar.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Precomputed NYSE trading calendar index
+
+QSTK's NYSE_dates.txt is parsed once into two arrays saved in the calendar
+directory (~/.qstk, override with the QSCALENDAR environment variable):
+
+    nyse_days.npy   int64  session dates as days since 1970-01-01, sorted
+    nyse_rows.npy   int32  for every day from the first session to the last,
+                           the row of that day's session, -1 if closed
+
+Later runs memory-map both files as long as the size and mtime of
+NYSE_dates.txt recorded in nyse_calendar.json still match.  A date range is
+two bisects of the session dates; a date maps to its row with one lookup in
+the dense table, so matching N order dates to days is O(N) array indexing
+instead of comparing datetime objects.
+
+nyse_days() is a drop-in for du.getNYSEdays(); day_index(ldt_timestamps)
+maps day numbers (orderstore's 'day' column, ymd_days() of csv date
+columns) to rows of ldt_timestamps.  When ldt_timestamps is a run of NYSE
+sessions the index is a window of the calendar itself, otherwise (weekday
+timestamps of synthetic.py) a dense table is built for those timestamps.
+'''
+
+import lazyimport
+import numpy as np
+import datetime as dt
+import bisect
+import json
+import os
+
+pd = lazyimport.module('pandas')
+
+EPOCH = dt.date(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# day number of a date that does not exist (2009-02-30), outside any calendar
+INVALID_DAY = np.iinfo(np.int64).min
+
+# default calendar directory, override with the QSCALENDAR environment variable
+CALENDAR_DIR = os.environ.get('QSCALENDAR', os.path.join(os.path.expanduser('~'), '.qstk'))
+
+# NYSE_dates.txt of the installed QSTK, found without importing qsdateutil
+def source_path():
+    import QSTK
+    return os.path.join(QSTK.__path__[0], 'qstkutil', 'NYSE_dates.txt')
+
+def calendar_paths(s_dir):
+    return (os.path.join(s_dir, 'nyse_days.npy'), os.path.join(s_dir, 'nyse_rows.npy'),
+            os.path.join(s_dir, 'nyse_calendar.json'))
+
+# days since 1970-01-01 of a date or timestamp, and back
+def day_number(date):
+    return date.toordinal() - EPOCH_ORDINAL
+
+def day_date(i_day):
+    return EPOCH + dt.timedelta(days=int(i_day))
+
+# int64 day numbers of a list of timestamps
+def timestamp_days(ldt_timestamps):
+    return np.fromiter((ts.toordinal() for ts in ldt_timestamps), np.int64, len(ldt_timestamps)) - EPOCH_ORDINAL
+
+# int64 day numbers of year, month and day columns; INVALID_DAY where the
+# day does not exist in its month
+def ymd_days(na_year, na_month, na_day):
+    na_year = np.asarray(na_year, dtype=np.int64)
+    na_month = np.asarray(na_month, dtype=np.int64)
+    na_day = np.asarray(na_day, dtype=np.int64)
+    na_first = (na_year - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (na_month - 1)
+    na_date = na_first.astype('datetime64[D]') + (na_day - 1)
+    na_valid = (na_month >= 1) & (na_month <= 12) & (na_day >= 1) & (na_date.astype('datetime64[M]') == na_first)
+    return np.where(na_valid, na_date.astype(np.int64), INVALID_DAY)
+
+# dense day -> row table over the first to the last of the sorted day numbers
+def dense_rows(na_days):
+    if len(na_days) == 0:
+        return np.zeros(0, dtype=np.int32)
+    na_rows = np.empty(int(na_days[-1] - na_days[0]) + 1, dtype=np.int32)
+    na_rows[:] = -1
+    na_rows[na_days - na_days[0]] = np.arange(len(na_days), dtype=np.int32)
+    return na_rows
+
+class DayIndex(object):
+    # na_days sorted day numbers and their dense row table; i_offset and
+    # i_count make the index a window of rows i_offset .. i_offset+i_count-1
+    def __init__(self, na_days, na_rows=None, i_offset=0, i_count=None):
+        if na_rows is None:
+            na_rows = dense_rows(na_days)
+        if i_count is None:
+            i_count = len(na_days) - i_offset
+        self.na_all = na_days
+        self.na_rows = na_rows
+        self.i_offset = i_offset
+        self.i_count = i_count
+        self.i_first = int(na_days[0]) if len(na_days) > 0 else 0
+
+    def __len__(self):
+        return self.i_count
+
+    # the window's day numbers
+    @property
+    def na_days(self):
+        return self.na_all[self.i_offset:self.i_offset + self.i_count]
+
+    # row of a day number, -1 if it is not in the index: one table lookup
+    def row(self, i_day):
+        i_pos = i_day - self.i_first
+        if i_pos < 0 or i_pos >= len(self.na_rows):
+            return -1
+        i_row = int(self.na_rows[i_pos]) - self.i_offset
+        if i_row < 0 or i_row >= self.i_count:
+            return -1
+        return i_row
+
+    # rows of an array of day numbers, -1 for the days not in the index
+    def rows(self, na_day):
+        na_day = np.asarray(na_day, dtype=np.int64)
+        na_result = np.empty(na_day.shape, dtype=np.int64)
+        na_result[:] = -1
+        na_in = (na_day >= self.i_first) & (na_day < self.i_first + len(self.na_rows))
+        na_row = self.na_rows[na_day[na_in] - self.i_first] - self.i_offset
+        na_row[(na_row < 0) | (na_row >= self.i_count)] = -1
+        na_result[na_in] = na_row
+        return na_result
+
+    # half open row range of the days from i_begin_day to i_end_day inclusive
+    def day_range(self, i_begin_day, i_end_day):
+        na_days = self.na_days
+        return bisect.bisect_left(na_days, i_begin_day), bisect.bisect_right(na_days, i_end_day)
+
+    # rows i_begin .. i_end-1 as an index of their own
+    def window(self, i_begin, i_end):
+        return DayIndex(self.na_all, self.na_rows, self.i_offset + i_begin, i_end - i_begin)
+
+# parse NYSE_dates.txt (m/d/yyyy per line) into sorted int64 day numbers
+def parse_dates(s_source):
+    l_ymd = []
+    f = open(s_source, "rU")
+    try:
+        for s_line in f:
+            s_line = s_line.strip()
+            if s_line:
+                i_month, i_day, i_year = [int(s) for s in s_line.split("/")]
+                l_ymd.append((i_year, i_month, i_day))
+    finally:
+        f.close()
+    na_ymd = np.array(l_ymd, dtype=np.int64).reshape(-1, 3)
+    return np.unique(ymd_days(na_ymd[:,0], na_ymd[:,1], na_ymd[:,2]))
+
+# source file stamp recorded with the saved calendar
+def source_stamp(s_source):
+    st_source = os.stat(s_source)
+    return { 'source' : os.path.abspath(s_source), 'size' : st_source.st_size, 'mtime' : st_source.st_mtime }
+
+# parse the source and save the calendar arrays; files are written under a
+# temporary name and renamed, so a concurrent reader never sees half a file
+def build_calendar(s_source, s_dir):
+    na_days = parse_dates(s_source)
+    na_rows = dense_rows(na_days)
+    if not os.path.isdir(s_dir):
+        os.makedirs(s_dir)
+    s_days, s_rows, s_meta = calendar_paths(s_dir)
+    for s_file, na_array in ((s_days, na_days), (s_rows, na_rows)):
+        f = open(s_file + ".tmp", "wb")
+        try:
+            np.save(f, na_array)
+        finally:
+            f.close()
+        os.rename(s_file + ".tmp", s_file)
+    f = open(s_meta + ".tmp", "w")
+    try:
+        json.dump(source_stamp(s_source), f)
+    finally:
+        f.close()
+    os.rename(s_meta + ".tmp", s_meta)
+    return na_days, na_rows
+
+# the saved calendar arrays, memory-mapped, or None if missing or stale
+def load_calendar(s_source, s_dir):
+    s_days, s_rows, s_meta = calendar_paths(s_dir)
+    try:
+        f = open(s_meta, "r")
+        try:
+            d_meta = json.load(f)
+        finally:
+            f.close()
+        if d_meta != json.loads(json.dumps(source_stamp(s_source))):
+            return None
+        return np.load(s_days, mmap_mode='r'), np.load(s_rows, mmap_mode='r')
+    except (IOError, OSError, ValueError):
+        return None
+
+_calendar = None
+
+# the NYSE calendar index, loaded once per process; built and saved the
+# first time, or kept in memory only when the directory is not writable
+def get_calendar(s_source=None, s_dir=CALENDAR_DIR):
+    global _calendar
+    if _calendar is None:
+        if s_source is None:
+            s_source = source_path()
+        t_arrays = load_calendar(s_source, s_dir)
+        if t_arrays is None:
+            try:
+                t_arrays = build_calendar(s_source, s_dir)
+            except (IOError, OSError):
+                na_days = parse_dates(s_source)
+                t_arrays = na_days, dense_rows(na_days)
+        _calendar = DayIndex(*t_arrays)
+    return _calendar
+
+# first and last day number of getNYSEdays(dt_begin, dt_end, timeofday):
+# sessions whose timestamp (session date + timeofday) is in [dt_begin, dt_end]
+def timestamp_day_range(dt_begin, dt_end, timeofday):
+    dt_low = dt_begin - timeofday
+    dt_high = dt_end - timeofday
+    i_begin_day = day_number(dt_low)
+    if (dt_low.hour, dt_low.minute, dt_low.second, dt_low.microsecond) != (0, 0, 0, 0):
+        i_begin_day += 1
+    return i_begin_day, day_number(dt_high)
+
+# pandas timestamps at timeofday on the given day numbers
+def day_timestamps(na_days, timeofday=dt.timedelta(0)):
+    if len(na_days) == 0:
+        return []
+    return list(pd.to_datetime(np.asarray(na_days, dtype=np.int64), unit='D') + pd.Timedelta(timeofday))
+
+# NYSE trading days from dt_begin to dt_end (inclusive) as timestamps at
+# timeofday, the same list as du.getNYSEdays()
+def nyse_days(dt_begin, dt_end, timeofday=dt.timedelta(0)):
+    calendar = get_calendar()
+    i_begin, i_end = calendar.day_range(*timestamp_day_range(dt_begin, dt_end, timeofday))
+    return day_timestamps(calendar.na_days[i_begin:i_end], timeofday)
+
+# index from day numbers to rows of ldt_timestamps: a window of the NYSE
+# calendar when the timestamps are consecutive sessions, its own table if not
+def day_index(ldt_timestamps):
+    na_days = timestamp_days(ldt_timestamps)
+    if len(na_days) > 0:
+        calendar = get_calendar()
+        i_begin = calendar.row(int(na_days[0]))
+        if i_begin >= 0 and np.array_equal(calendar.na_days[i_begin:i_begin + len(na_days)], na_days):
+            return calendar.window(i_begin, i_begin + len(na_days))
+    return DayIndex(na_days)
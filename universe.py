@@ -0,0 +1,177 @@
+'''
+File:   universe.py
+Class:  Computational Investing - Georgia Tech
+Author: Boris Litinsky
+Date:   10/18/2026
+Description: Search every k-symbol basket of a universe for the best
+             Sharpe ratio allocation
+
+Prices are loaded once into shared memory; worker processes evaluate
+chunks of baskets against the same allocation matrix (every basket of size
+k has the same candidate allocations) and return their local top N, which
+are merged into the global top N.
+
+universe.py -b 2012 -e 2012 -s SPY,IBM,GLD,AAA,RSP,QQQ -k 4 -n 10
+'''
+
+import datetime as dt
+import numpy as np
+import itertools as it
+import multiprocessing as mp
+import multiprocessing.sharedctypes as mps
+import heapq
+import time
+import math
+import sys, getopt
+import optimize
+import stagetimer as st
+import allocations as al
+
+# get command line options
+def get_cmdline_options(argv):
+    begin = [2012, 1, 1]
+    end   = [2012, 12, 31]
+    stocks = ['SPY','IBM','GLD','AAA','RSP','QQQ']
+    i_size = 4
+    i_top = 10
+    i_procs = mp.cpu_count()
+    f_step = 0.1
+
+    try:
+        opts, args = getopt.getopt(argv,"hb:e:s:k:n:p:",["begin=","end=","stock=","size=","top=","procs=","step="])
+    except getopt.GetoptError:
+        print "universe.py -b <begin_year> -e <end_year> -s <stocks> -k <basket_size> -n <top> -p <processes> --step <step>"
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print "universe.py -b <begin_year> -e <end_year> -s <stocks> -k <basket_size> -n <top> -p <processes> --step <step>"
+            print "universe.py -b 2012 -e 2012 -s SPY,IBM,GLD,AAA,RSP,QQQ -k 4 -n 10"
+            sys.exit()
+        elif opt in ('-b','--begin'):
+            begin = [int(arg), 1, 1]
+        elif opt in ('-e','--end'):
+            end = [int(arg), 12, 31]
+        elif opt in ('-s','--stock'):
+            stocks = str(arg).split(",")
+        elif opt in ('-k','--size'):
+            i_size = int(arg)
+        elif opt in ('-n','--top'):
+            i_top = int(arg)
+        elif opt in ('-p','--procs'):
+            i_procs = int(arg)
+        elif opt == '--step':
+            f_step = float(arg)
+
+    dt_begin = dt.datetime(int(begin[0]),int(begin[1]),int(begin[2]))
+    dt_end   = dt.datetime(int(end[0]),int(end[1]),int(end[2]))
+
+    if dt_begin > dt_end:
+        print "Error: begining date must be before ending date"
+        sys.exit(2)
+    if i_size < 1 or i_size > len(stocks):
+        print "Error: basket size must be between 1 and the number of stocks"
+        sys.exit(2)
+    print "cmdline options: begin=",dt_begin," end=",dt_end,"stocks=",stocks,"size=",i_size,"top=",i_top,"procs=",i_procs
+    return dt_begin,dt_end,stocks,i_size,i_top,i_procs,f_step
+
+# worker state: the shared price matrix and the allocation matrix
+_na_price = None
+_na_weights = None
+
+def init_worker(raw_price, t_shape, na_weights):
+    global _na_price, _na_weights
+    _na_price = np.frombuffer(raw_price).reshape(t_shape)
+    _na_weights = na_weights
+
+# Sharpe ratio of every column of a (days x portfolios) value matrix, the same
+# as metrics.calc_metrics but without the other statistics; the first day's
+# zero return still counts toward the mean and std
+def calc_sharpe(na_price_tp):
+    i_days = na_price_tp.shape[0]
+    na_rets = na_price_tp[1:] / na_price_tp[:-1]
+    na_rets -= 1.0
+    na_avg = na_rets.sum(axis=0) / i_days
+    na_rets -= na_avg
+    na_rets *= na_rets
+    na_var = (na_rets.sum(axis=0) + na_avg * na_avg) / i_days
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return math.sqrt(252) * na_avg / np.sqrt(na_var)
+
+# evaluate every allocation of every basket in a chunk; returns the chunk's
+# top i_top baskets as (sharpe, basket, allocation row)
+def search_baskets(task):
+    ll_baskets, i_top = task
+    na_baskets = np.array(ll_baskets, dtype=int)
+    i_baskets, i_allocs = len(na_baskets), len(_na_weights)
+
+    # (days x baskets, k) prices against (allocations x k) weights
+    i_days, i_size = len(_na_price), na_baskets.shape[1]
+    na_price = _na_price[:, na_baskets].reshape(i_days * i_baskets, i_size)
+    na_price_tp = np.dot(na_price, _na_weights.T).reshape(i_days, i_baskets * i_allocs)
+    na_sharpe = calc_sharpe(na_price_tp).reshape(i_baskets, i_allocs)
+    na_sharpe = np.where(np.isnan(na_sharpe), -np.inf, na_sharpe)
+
+    na_best = na_sharpe.argmax(axis=1)
+    na_best_sharpe = na_sharpe[np.arange(i_baskets), na_best]
+    return heapq.nlargest(i_top, zip(na_best_sharpe.tolist(), ll_baskets, na_best.tolist()))
+
+# chunks of k-index baskets, sized so a chunk's value matrix stays near 4M cells
+def basket_chunks(i_symbols, i_size, i_chunk):
+    baskets = it.combinations(range(i_symbols), i_size)
+    while True:
+        ll_chunk = list(it.islice(baskets, i_chunk))
+        if len(ll_chunk) == 0:
+            return
+        yield ll_chunk
+
+# best allocation for every i_size basket of ls_symbols, fanned out over
+# i_procs processes; returns the global top i_top rows
+# [sharpe, basket symbols, allocation]
+def search(dt_begin, dt_end, ls_symbols, i_size, i_top=10, i_procs=None, f_step=0.1):
+    ldt_timestamps, d_data = optimize.read_stock_database(dt_begin, dt_end, ls_symbols)
+    na_price = np.ascontiguousarray(d_data['close'].values, dtype=float)
+
+    # load the prices once into shared memory for all workers
+    raw_price = mps.RawArray('d', na_price.size)
+    np.frombuffer(raw_price).reshape(na_price.shape)[:] = na_price
+    na_weights = np.vstack(list(al.iter_allocations(i_size, f_step)))
+
+    i_chunk = max(1, int(4e6 // (na_price.shape[0] * len(na_weights))))
+    tasks = ((ll_chunk, i_top) for ll_chunk in basket_chunks(len(ls_symbols), i_size, i_chunk))
+
+    if i_procs is None:
+        i_procs = mp.cpu_count()
+    if i_procs > 1:
+        pool = mp.Pool(i_procs, init_worker, (raw_price, na_price.shape, na_weights))
+        try:
+            results = pool.imap_unordered(search_baskets, tasks)
+            best = heapq.nlargest(i_top, it.chain.from_iterable(results))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        init_worker(raw_price, na_price.shape, na_weights)
+        best = heapq.nlargest(i_top, it.chain.from_iterable(it.imap(search_baskets, tasks)))
+
+    table = []
+    for f_sharpe, l_basket, i_alloc in best:
+        table.append([f_sharpe, [ls_symbols[i] for i in l_basket], tuple(na_weights[i_alloc])])
+    return table
+
+def main(argv):
+    dt_begin, dt_end, stocks, i_size, i_top, i_procs, f_step = get_cmdline_options(st.profile_argv(argv))
+
+    t_start = time.time()
+    with st.stage('compute', symbols=len(stocks), size=i_size, procs=i_procs):
+        table = search(dt_begin, dt_end, stocks, i_size, i_top, i_procs, f_step)
+    t_elapsed = time.time() - t_start
+
+    i_baskets = len(list(it.combinations(range(len(stocks)), i_size)))
+    print
+    print "%d baskets of %d in %0.2f s (%0.0f baskets/s)" % (i_baskets, i_size, t_elapsed, i_baskets / t_elapsed)
+    print "%12s  %-30s %s" % ("Sharpe", "Basket", "Allocation")
+    for f_sharpe, ls_basket, allocation in table:
+        print "%12.6f  %-30s %s" % (f_sharpe, ",".join(ls_basket), allocation)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])